@@ -1,21 +1,36 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import plotly.express as px
-import plotly.graph_objects as go
-from datetime import datetime, timedelta
 import io
-import base64
-from utils.chart_factory import *
-from utils.ai_insights import *
-from pptx import Presentation
-from pptx.util import Inches, Pt
-from pptx.dml.color import RGBColor
-import tempfile
-import os
-import re
-from fpdf import FPDF
 import json
+from utils.chart_factory import (
+    create_faturamento_chart,
+    create_heatmap,
+    create_line_chart,
+    create_margem_canal_chart,
+    create_margem_chart,
+    create_scatter_chart,
+    create_ticket_categoria_chart,
+    create_ticket_chart
+)
+from utils.ai_insights import (
+    generate_advanced_insights,
+    generate_narrative,
+    generate_strategic_recommendations,
+    generate_ticket_insights
+)
+from utils.chart_theme import (
+    BRANCO, CIANO, CORES_CANAIS, CORES_CATEGORIAS, ESCALA_LARANJA, ESCALA_MARGEM, GRADE_CIANO, LARANJA,
+    LEGENDA_ABAIXO, PRETO, TAMANHO_TITULO_COLUNA, build_figure, neon_axis
+)
+from utils.bitmap_index import get_bitmap_index
+from utils.data_loader import BACKEND_SQL, MODO_STREAMING, load_vendas_incremental, load_vendas_sql, load_vendas_streaming
+from utils.export_jobs import ESTADOS_ATIVOS, cancel_export, submit_export
+from utils.filter_engine import get_filter_result, normalize_filters
+from utils.olap_cube import NOMES_DIAS_SEMANA, get_cube, get_daily_aggregates, rollup_marginals, rollup_vendas
+from utils.profiler import PERFIL_ATIVO, finish_profile, profiled, span, start_profile
+from utils.single_flight import single_flight_stats
+from utils.star_schema import get_star_schema, period_targets
 
 # Configuração da página
 st.set_page_config(
@@ -29,258 +44,150 @@ st.set_page_config(
 with open('assets/css/style.css') as f:
     st.markdown(f'<style>{f.read()}</style>', unsafe_allow_html=True)
 
-# Função para criar link de download
-def get_download_link(df, filename, link_text):
-    csv = df.to_csv(index=False)
-    b64 = base64.b64encode(csv.encode()).decode()
-    href = f'<a href="data:file/csv;base64,{b64}" download="{filename}" class="download-link">{link_text}</a>'
-    return href
+# Medição de desempenho desta execução (DASHBOARD_PERFIL=1 ou ?perfil=1 na URL): tempo e memória de
+# cada gráfico, insight, agregação e exportação, exibidos na sidebar e gravados como Chrome Trace
+perfil = start_profile('rerun', PERFIL_ATIVO or st.query_params.get('perfil') == '1')
 
-# Função para exportar para PDF
-def export_to_pdf(vendas, metas, insights_data, filtro_periodo=None, filtro_categorias=None, filtro_canais=None):
-    pdf = FPDF()
-    pdf.add_page()
-    
-    # Configurar fonte
-    pdf.add_font('Montserrat', '', 'assets/fonts/Montserrat-Regular.ttf', uni=True)
-    pdf.add_font('Montserrat', 'B', 'assets/fonts/Montserrat-Bold.ttf', uni=True)
-    
-    # Título
-    pdf.set_font('Montserrat', 'B', 24)
-    pdf.set_text_color(0, 255, 255)
-    pdf.cell(0, 20, 'Dashboard Analítico de Vendas de Veículos', 0, 1, 'C')
-    
-    # Subtítulo
-    pdf.set_font('Montserrat', '', 14)
-    pdf.set_text_color(255, 95, 31)
-    
-    # Período
-    if filtro_periodo:
-        data_inicio, data_fim = filtro_periodo
-        periodo_texto = f"Período: {data_inicio.strftime('%d/%m/%Y')} a {data_fim.strftime('%d/%m/%Y')}"
-    else:
-        periodo_texto = "Período: Todos os dados"
-    
-    pdf.cell(0, 10, periodo_texto, 0, 1, 'C')
-    
-    # Filtros aplicados
-    pdf.set_font('Montserrat', '', 10)
-    pdf.set_text_color(248, 248, 255)
-    
-    if filtro_categorias:
-        categorias_texto = f"Categorias: {', '.join(filtro_categorias)}"
-    else:
-        categorias_texto = "Categorias: Todas"
-    
-    if filtro_canais:
-        canais_texto = f"Canais: {', '.join(filtro_canais)}"
-    else:
-        canais_texto = "Canais: Todos"
-    
-    pdf.cell(0, 8, categorias_texto, 0, 1, 'C')
-    pdf.cell(0, 8, canais_texto, 0, 1, 'C')
-    
-    pdf.ln(10)
-    
-    # Resumo dos dados
-    pdf.set_font('Montserrat', 'B', 16)
-    pdf.set_text_color(0, 255, 255)
-    pdf.cell(0, 10, 'Resumo dos Dados', 0, 1, 'L')
-    
-    pdf.set_font('Montserrat', '', 12)
-    pdf.set_text_color(248, 248, 255)
-    
-    # Criar tabela de resumo
-    resumo = [
-        ["Faturamento Total", f"R$ {insights_data['resumo_geral']['faturamento_total']:,.2f}"],
-        ["Total de Vendas", f"{insights_data['resumo_geral']['total_vendas']:,}"],
-        ["Lucro Total", f"R$ {insights_data['resumo_geral']['lucro_total']:,.2f}"],
-        ["Margem Média", f"{insights_data['resumo_geral']['margem_media']:.2f}%"],
-        ["Atingimento de Metas", f"{insights_data['metas']['atingimento_medio']:.1f}%"]
-    ]
-    
-    col_width = 95
-    row_height = 10
-    
-    for row in resumo:
-        pdf.cell(col_width, row_height, row[0], 1, 0, 'L')
-        pdf.cell(col_width, row_height, row[1], 1, 1, 'R')
-    
-    pdf.ln(10)
-    
-    # Insights principais
-    pdf.set_font('Montserrat', 'B', 16)
-    pdf.set_text_color(0, 255, 255)
-    pdf.cell(0, 10, 'Insights Principais', 0, 1, 'L')
-    
-    pdf.set_font('Montserrat', '', 12)
-    pdf.set_text_color(248, 248, 255)
-    
-    # Extrair texto limpo dos insights (remover tags HTML)
-    narrativa = generate_narrative(insights_data)
-    narrativa_limpa = re.sub('<.*?>', '', narrativa)
-    
-    # Quebrar texto em linhas
-    pdf.multi_cell(0, 8, narrativa_limpa)
-    
-    pdf.ln(10)
-    
-    # Recomendações estratégicas
-    pdf.set_font('Montserrat', 'B', 16)
-    pdf.set_text_color(0, 255, 255)
-    pdf.cell(0, 10, 'Recomendações Estratégicas', 0, 1, 'L')
-    
-    pdf.set_font('Montserrat', '', 12)
-    pdf.set_text_color(248, 248, 255)
-    
-    # Extrair texto limpo das recomendações (remover tags HTML)
-    recomendacoes = generate_strategic_recommendations(insights_data)
-    recomendacoes_limpas = re.sub('<.*?>', '', recomendacoes)
-    
-    # Quebrar texto em linhas
-    pdf.multi_cell(0, 8, recomendacoes_limpas)
+# Função para gerar o CSV de um DataFrame, escrito em blocos direto no buffer de bytes
+@profiled('exportacao')
+def dataframe_to_csv_bytes(df, linhas_por_bloco=50_000):
+    buffer = io.BytesIO()
+    df.to_csv(buffer, index=False, encoding='utf-8', chunksize=linhas_por_bloco)
+    return buffer.getvalue()
+
+# Função para exibir um gráfico Plotly (com a medição ativa, a serialização da figura aparece como etapa própria)
+# O visual vem do template "neon" da figura; com theme="streamlit", o Streamlit o sobrescreveria
+@profiled('serializacao', 'st.plotly_chart')
+def render_chart(fig):
+    st.plotly_chart(fig, use_container_width=True, theme=None)
+
+# Função para marcar um download como solicitado para a combinação de filtros atual
+def solicitar_download(chave, filtros):
+    st.session_state[chave] = filtros
+
+# Função para exibir o download de um DataFrame em CSV
+# O CSV só é gerado depois que o usuário o solicita (e fica em cache por combinação de filtros e
+# granularidade); o arquivo é servido pelo st.download_button em vez de embutido em base64 no HTML da página
+def render_download(df, filename, link_text):
+    chave = f'download_{granularidade}_' + filename.replace('.', '_')
+    filtros = normalize_filters(filtro_periodo, filtro_categorias, filtro_canais)
+    
+    if st.session_state.get(chave) != filtros:
+        st.button(link_text, key=f'{chave}_preparar', type='tertiary', on_click=solicitar_download, args=(chave, filtros))
+        return
+    
+    dados = get_filter_result(
+        vendas,
+        ('csv', granularidade, filename),
+        lambda: dataframe_to_csv_bytes(df),
+        filtro_periodo,
+        filtro_categorias,
+        filtro_canais
+    )
+    st.download_button(link_text, data=dados, file_name=filename, mime='text/csv', key=f'{chave}_baixar', type='tertiary')
+
+# Função para acompanhar uma exportação em andamento
+# Roda como fragmento atualizado a cada segundo: só este trecho é reexecutado enquanto o arquivo é gerado
+def acompanhar_exportacao(chave, botao):
+    job = st.session_state.get(chave)
     
-    # Rodapé
-    pdf.set_y(-15)
-    pdf.set_font('Montserrat', 'I', 8)
-    pdf.set_text_color(248, 248, 255)
-    pdf.cell(0, 10, f'Gerado em {datetime.now().strftime("%d/%m/%Y %H:%M:%S")}', 0, 0, 'C')
+    # Exportação encerrada: uma execução completa troca o progresso pelo resultado
+    if job is None or job.estado not in ESTADOS_ATIVOS:
+        st.rerun()
     
-    # Retornar PDF como buffer
-    pdf_buffer = io.BytesIO()
-    pdf.output(pdf_buffer)
-    pdf_buffer.seek(0)
+    st.progress(job.progresso, text=job.etapa)
     
-    return pdf_buffer
+    if st.button("Cancelar", key=f'{botao}_cancelar'):
+        cancel_export(job)
+        del st.session_state[chave]
+        st.rerun()
 
-# Função para exportar para PowerPoint
-def export_to_ppt(vendas, metas, insights_data, filtro_periodo=None, filtro_categorias=None, filtro_canais=None):
-    # Criar apresentação
-    prs = Presentation()
-    
-    # Slide de título
-    slide_layout = prs.slide_layouts[0]  # Layout de título
-    slide = prs.slides.add_slide(slide_layout)
-    
-    # Configurar título
-    title = slide.shapes.title
-    title.text = "Dashboard Analítico de Vendas de Veículos"
-    title.text_frame.paragraphs[0].font.color.rgb = RGBColor(0, 255, 255)
-    title.text_frame.paragraphs[0].font.size = Pt(44)
-    
-    # Configurar subtítulo
-    subtitle = slide.placeholders[1]
-    
-    # Período
-    if filtro_periodo:
-        data_inicio, data_fim = filtro_periodo
-        periodo_texto = f"Período: {data_inicio.strftime('%d/%m/%Y')} a {data_fim.strftime('%d/%m/%Y')}"
-    else:
-        periodo_texto = "Período: Todos os dados"
-    
-    # Filtros aplicados
-    if filtro_categorias:
-        categorias_texto = f"Categorias: {', '.join(filtro_categorias)}"
-    else:
-        categorias_texto = "Categorias: Todas"
-    
-    if filtro_canais:
-        canais_texto = f"Canais: {', '.join(filtro_canais)}"
+# Função para pedir uma exportação em segundo plano e oferecer o arquivo quando ela terminar
+def render_export(formato, rotulo_botao, rotulo_download, nome_arquivo):
+    chave = f'exportacao_{formato}'
+    botao = 'ppt_button' if formato == 'pptx' else f'{formato}_button'
+    filtros = normalize_filters(filtro_periodo, filtro_categorias, filtro_canais)
+    job = st.session_state.get(chave)
+    
+    if st.button(rotulo_botao, key=botao):
+        if job is not None:
+            cancel_export(job)
+        job = submit_export(formato, get_insights_data(), filtro_periodo, filtro_categorias, filtro_canais)
+        st.session_state[chave] = job
+    
+    # Exportações de outra combinação de filtros não são oferecidas
+    if job is None or job.filtros != filtros:
+        return
+    
+    if job.estado in ESTADOS_ATIVOS:
+        st.fragment(acompanhar_exportacao, run_every=1)(chave, botao)
+    elif job.estado == 'concluido':
+        st.download_button(rotulo_download, data=job.read_bytes(), file_name=nome_arquivo, mime=job.mime, key=f'{botao}_baixar')
+    elif job.estado == 'erro':
+        st.error(f"Não foi possível gerar o arquivo: {job.erro}")
     else:
-        canais_texto = "Canais: Todos"
-    
-    subtitle.text = f"{periodo_texto}\n{categorias_texto}\n{canais_texto}"
-    subtitle.text_frame.paragraphs[0].font.color.rgb = RGBColor(255, 95, 31)
-    subtitle.text_frame.paragraphs[0].font.size = Pt(24)
-    
-    # Slide de resumo
-    slide_layout = prs.slide_layouts[1]  # Layout de título e conteúdo
-    slide = prs.slides.add_slide(slide_layout)
-    
-    # Configurar título
-    title = slide.shapes.title
-    title.text = "Resumo dos Dados"
-    title.text_frame.paragraphs[0].font.color.rgb = RGBColor(0, 255, 255)
-    title.text_frame.paragraphs[0].font.size = Pt(40)
-    
-    # Criar tabela de resumo
-    x, y, cx, cy = Inches(1), Inches(2), Inches(8), Inches(3)
-    shape = slide.shapes.add_table(6, 2, x, y, cx, cy)
-    table = shape.table
-    
-    # Cabeçalho
-    table.cell(0, 0).text = "Métrica"
-    table.cell(0, 1).text = "Valor"
-    
-    # Dados
-    table.cell(1, 0).text = "Faturamento Total"
-    table.cell(1, 1).text = f"R$ {insights_data['resumo_geral']['faturamento_total']:,.2f}"
-    
-    table.cell(2, 0).text = "Total de Vendas"
-    table.cell(2, 1).text = f"{insights_data['resumo_geral']['total_vendas']:,}"
-    
-    table.cell(3, 0).text = "Lucro Total"
-    table.cell(3, 1).text = f"R$ {insights_data['resumo_geral']['lucro_total']:,.2f}"
-    
-    table.cell(4, 0).text = "Margem Média"
-    table.cell(4, 1).text = f"{insights_data['resumo_geral']['margem_media']:.2f}%"
-    
-    table.cell(5, 0).text = "Atingimento de Metas"
-    table.cell(5, 1).text = f"{insights_data['metas']['atingimento_medio']:.1f}%"
-    
-    # Slide de insights
-    slide_layout = prs.slide_layouts[1]  # Layout de título e conteúdo
-    slide = prs.slides.add_slide(slide_layout)
-    
-    # Configurar título
-    title = slide.shapes.title
-    title.text = "Insights Principais"
-    title.text_frame.paragraphs[0].font.color.rgb = RGBColor(0, 255, 255)
-    title.text_frame.paragraphs[0].font.size = Pt(40)
-    
-    # Extrair texto limpo dos insights (remover tags HTML)
-    narrativa = generate_narrative(insights_data)
-    narrativa_limpa = re.sub('<.*?>', '', narrativa)
-    
-    # Adicionar texto
-    content = slide.placeholders[1]
-    content.text = narrativa_limpa
-    
-    # Slide de recomendações
-    slide_layout = prs.slide_layouts[1]  # Layout de título e conteúdo
-    slide = prs.slides.add_slide(slide_layout)
-    
-    # Configurar título
-    title = slide.shapes.title
-    title.text = "Recomendações Estratégicas"
-    title.text_frame.paragraphs[0].font.color.rgb = RGBColor(0, 255, 255)
-    title.text_frame.paragraphs[0].font.size = Pt(40)
-    
-    # Extrair texto limpo das recomendações (remover tags HTML)
-    recomendacoes = generate_strategic_recommendations(insights_data)
-    recomendacoes_limpas = re.sub('<.*?>', '', recomendacoes)
-    
-    # Adicionar texto
-    content = slide.placeholders[1]
-    content.text = recomendacoes_limpas
+        st.info("Exportação cancelada.")
+
+# Função para exibir na sidebar o painel de desempenho da execução (só com a medição ativa)
+def render_profile_panel(perfil):
+    caminho_trace = perfil.write_trace()
+    resumo = pd.DataFrame(perfil.summary())
     
-    # Retornar PPT como buffer
-    ppt_buffer = io.BytesIO()
-    prs.save(ppt_buffer)
-    ppt_buffer.seek(0)
+    # Tempo fora das etapas medidas: layout, markdown e figuras montadas direto no app
+    fora_das_etapas = perfil.duracao - sum(etapa.duracao for etapa in perfil.spans if etapa.profundidade == 0)
     
-    return ppt_buffer
+    with st.sidebar:
+        with st.expander("⏱️ Desempenho da execução", expanded=True):
+            st.markdown(f"**{perfil.nome}**: {perfil.duracao * 1000:,.0f} ms ({fora_das_etapas * 1000:,.0f} ms fora das etapas medidas)")
+            
+            if not resumo.empty:
+                por_categoria = resumo.groupby('categoria')['proprio_ms'].sum().sort_values(ascending=False)
+                st.dataframe(por_categoria.round(1).rename('ms').to_frame(), use_container_width=True)
+                st.dataframe(resumo.round({'total_ms': 1, 'proprio_ms': 1, 'pico_mb': 2}), hide_index=True, use_container_width=True)
+            
+            # Exportações medidas desta sessão (rodam em segundo plano, com trace próprio)
+            for formato in ('pdf', 'pptx'):
+                job = st.session_state.get(f'exportacao_{formato}')
+                if job is not None and job.perfil is not None:
+                    st.markdown(f"Exportação {formato.upper()}: {job.perfil.duracao * 1000:,.0f} ms — trace em `{job.caminho_trace}`")
+            
+            # Acertos, cálculos e esperas por cálculos em andamento (acumulados neste processo)
+            voos = pd.DataFrame.from_dict(single_flight_stats(), orient='index')
+            if not voos.empty:
+                st.markdown("**Cálculos compartilhados** (desde o início do servidor)")
+                st.dataframe(voos.round({'espera_s': 3}), use_container_width=True)
+            
+            if caminho_trace:
+                st.caption(f"Trace em `{caminho_trace}` (abra em ui.perfetto.dev, chrome://tracing ou speedscope)")
+            st.download_button(
+                "Baixar trace",
+                data=json.dumps(perfil.to_chrome_trace(), ensure_ascii=False),
+                file_name='trace_dashboard.json',
+                mime='application/json',
+                key='perfil_baixar_trace'
+            )
 
 # Função para carregar dados
-@st.cache_data
+# cache_resource devolve sempre o mesmo objeto (cache_data desserializaria uma cópia a cada
+# rerun): os resultados por filtro (get_filter_result), o cache de gráficos e os pré-agregados
+# são indexados pela identidade do DataFrame e continuam válidos entre reruns; sessões
+# simultâneas esperam pela mesma execução (e, entre processos, pela mesma reconstrução do cache)
+@st.cache_resource
 def load_data():
-    # Carregar dados de vendas
-    vendas = pd.read_csv('data/vendas.csv')
-    vendas['data_venda'] = pd.to_datetime(vendas['data_venda'])
-    vendas['periodo'] = vendas['data_venda'].dt.strftime('%Y-%m')
-    
-    # Extrair hora da data_venda para análise por horário
-    vendas['hora'] = vendas['data_venda'].dt.hour
+    # Carregar dados de vendas já preparados (período, hora e dia da semana derivados),
+    # a partir do cache colunar em data/.cache sempre que o CSV não tiver mudado.
+    # No modo streaming, só os agregados (e uma amostra opcional) ficam em memória;
+    # com o backend SQL, nenhuma linha fica em memória e as consultas vão ao banco
+    if BACKEND_SQL:
+        vendas = load_vendas_sql()
+    else:
+        vendas = load_vendas_streaming() if MODO_STREAMING else load_vendas_incremental()
+        
+        # Pré-agregar o cubo e as agregações diárias usados pelos agrupamentos das abas, e montar os
+        # bitmaps de categoria, canal, modelo e campanha usados pelos filtros sobre as linhas
+        get_cube(vendas)
+        get_daily_aggregates(vendas)
+        get_bitmap_index(vendas)
     
     # Carregar dados de metas
     metas = pd.read_csv('data/metas.csv')
@@ -291,13 +198,31 @@ def load_data():
     return vendas, metas, modelos
 
 # Carregar dados
-vendas, metas, modelos = load_data()
+with span('load_data', 'carga'):
+    vendas, metas, modelos = load_data()
+
+# Incorporar as vendas acrescentadas ao CSV desde o último rerun: só as linhas novas são lidas
+# (sem mudanças, é o mesmo DataFrame e os caches por filtro continuam válidos)
+if BACKEND_SQL:
+    vendas = load_vendas_sql()
+elif not MODO_STREAMING:
+    vendas = load_vendas_incremental()
+    # Montado só na primeira carga; as linhas novas estendem o índice do DataFrame anterior
+    get_bitmap_index(vendas)
+
+# Categorias, canais e dias com vendas (dos pré-agregados ou, com o backend SQL, do banco)
+disponiveis = rollup_marginals(vendas, ['categoria', 'canal_venda', 'dia'])
 
 # Verificar se os dados foram carregados corretamente
-if vendas.empty or metas.empty or modelos.empty:
+if disponiveis['dia'].empty or metas.empty or modelos.empty:
     st.error("Erro ao carregar os dados. Verifique os arquivos CSV.")
+    if perfil is not None:
+        finish_profile(perfil)
     st.stop()
 
+# Opções de granularidade das séries temporais (rótulo -> dimensão dos pré-agregados)
+GRANULARIDADES = {'Mensal': 'periodo', 'Diária': 'dia'}
+
 # Sidebar para filtros
 with st.sidebar:
     st.markdown('<div class="sidebar-title">Filtros de Análise</div>', unsafe_allow_html=True)
@@ -310,8 +235,9 @@ with st.sidebar:
     col1, col2 = st.columns(2)
     
     with col1:
-        data_min = vendas['data_venda'].min().date()
-        data_max = vendas['data_venda'].max().date()
+        dias = disponiveis['dia']['dia']
+        data_min = dias.iloc[0].date()
+        data_max = dias.iloc[-1].date()
         
         data_inicio = st.date_input(
             "De",
@@ -337,7 +263,7 @@ with st.sidebar:
     # Filtro de categorias
     st.markdown('<div class="filter-title">Categorias de Veículos</div>', unsafe_allow_html=True)
     
-    categorias = sorted(vendas['categoria'].unique())
+    categorias = sorted(disponiveis['categoria']['categoria'].unique())
     
     categorias_selecionadas = st.multiselect(
         "Selecione as categorias",
@@ -348,7 +274,7 @@ with st.sidebar:
     # Filtro de canais de venda
     st.markdown('<div class="filter-title">Canais de Venda</div>', unsafe_allow_html=True)
     
-    canais = sorted(vendas['canal_venda'].unique())
+    canais = sorted(disponiveis['canal_venda']['canal_venda'].unique())
     
     canais_selecionados = st.multiselect(
         "Selecione os canais",
@@ -356,6 +282,16 @@ with st.sidebar:
         default=canais[:3] if len(canais) > 3 else canais
     )
     
+    # Granularidade das séries temporais (a visão diária é reamostrada no servidor quando é muito longa)
+    st.markdown('<div class="filter-title">Granularidade</div>', unsafe_allow_html=True)
+    
+    granularidade = GRANULARIDADES[st.radio(
+        "Agrupar as séries por",
+        options=list(GRANULARIDADES),
+        horizontal=True,
+        key='granularidade'
+    )]
+    
     # Botão para aplicar filtros
     filtros_aplicados = st.button("Aplicar Filtros", type="primary")
     
@@ -404,21 +340,43 @@ st.markdown(
     unsafe_allow_html=True
 )
 
-# Tabs para navegação
-tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs([
+# Seções do dashboard. Diferente de st.tabs (que executa o conteúdo de todas as abas a cada
+# rerun), a navegação por seção só executa a seção visível
+SECOES = [
     "📊 Faturamento", 
     "💰 Margem de Lucro", 
     "💵 Ticket Médio", 
     "📅 Análise Mensal", 
     "🕒 Análise por Horário", 
     "🧠 IA Insights"
-])
+]
+
+secao_ativa = st.radio(
+    "Seção",
+    options=SECOES,
+    horizontal=True,
+    key="secao_ativa",
+    label_visibility="collapsed"
+)
+
+if perfil is not None:
+    perfil.nome = f'rerun {secao_ativa}'
 
-# Gerar insights avançados
-insights_data = generate_advanced_insights(vendas, metas, modelos, filtro_periodo, filtro_categorias, filtro_canais)
+# Gerar insights avançados (só nas seções que os usam, memorizados por combinação de filtros)
+def get_insights_data():
+    return get_filter_result(
+        vendas,
+        'insights',
+        lambda: generate_advanced_insights(vendas, metas, modelos, filtro_periodo, filtro_categorias, filtro_canais),
+        filtro_periodo,
+        filtro_categorias,
+        filtro_canais
+    )
 
-# Tab 1: Faturamento
-with tab1:
+# Seção 1: Faturamento
+if secao_ativa == SECOES[0]:
+    insights_data = get_insights_data()
+    
     st.markdown('<div class="tab-title">Análise de Faturamento</div>', unsafe_allow_html=True)
     
     # KPIs
@@ -491,8 +449,8 @@ with tab1:
     # Gráfico de faturamento
     st.markdown('<div class="chart-container">', unsafe_allow_html=True)
     
-    fig_faturamento, faturamento_mensal = create_faturamento_chart(vendas, metas, filtro_periodo, filtro_categorias, filtro_canais)
-    st.plotly_chart(fig_faturamento, use_container_width=True)
+    fig_faturamento, faturamento_mensal = create_faturamento_chart(vendas, metas, filtro_periodo, filtro_categorias, filtro_canais, granularidade)
+    render_chart(fig_faturamento)
     
     st.markdown('</div>', unsafe_allow_html=True)
     
@@ -503,22 +461,8 @@ with tab1:
     
     with col1:
         # Agrupar por categoria
-        categoria_stats = vendas.copy()
-        if filtro_periodo:
-            data_inicio, data_fim = filtro_periodo
-            categoria_stats = categoria_stats[(categoria_stats['data_venda'] >= data_inicio) & (categoria_stats['data_venda'] <= data_fim)]
-        
-        if filtro_categorias:
-            categoria_stats = categoria_stats[categoria_stats['categoria'].isin(filtro_categorias)]
-        
-        if filtro_canais:
-            categoria_stats = categoria_stats[categoria_stats['canal_venda'].isin(filtro_canais)]
-        
-        categoria_stats = categoria_stats.groupby('categoria').agg({
-            'id_venda': 'count',
-            'preco_venda': 'sum',
-            'lucro': 'sum'
-        }).reset_index()
+        categoria_stats = rollup_vendas(vendas, ['categoria'], filtro_periodo, filtro_categorias, filtro_canais)
+        categoria_stats = categoria_stats[['categoria', 'id_venda', 'preco_venda', 'lucro']]
         
         categoria_stats['margem'] = (categoria_stats['lucro'] / categoria_stats['preco_venda']) * 100
         categoria_stats['ticket_medio'] = categoria_stats['preco_venda'] / categoria_stats['id_venda']
@@ -526,112 +470,49 @@ with tab1:
         # Ordenar por faturamento
         categoria_stats = categoria_stats.sort_values('preco_venda', ascending=False)
         
-        # Criar gráfico de barras
-        fig = go.Figure()
-        
-        # Cores para cada categoria
-        cores = {
-            'SUV': '#00FFFF',
-            'Sedan': '#FF5F1F',
-            'Hatch': '#F8F8FF',
-            'Pickup': '#9933FF',
-            'Elétrico': '#33FF99'
-        }
-        
-        # Adicionar barras para cada categoria
-        fig.add_trace(
-            go.Bar(
+        # Barras de faturamento, uma cor por categoria
+        fig = build_figure(
+            [dict(
+                type='bar',
                 x=categoria_stats['categoria'],
                 y=categoria_stats['preco_venda'],
                 name="Faturamento",
-                marker=dict(color=[cores.get(cat, '#F8F8FF') for cat in categoria_stats['categoria']]),
+                marker=dict(color=[CORES_CATEGORIAS.get(cat, BRANCO) for cat in categoria_stats['categoria']]),
                 hovertemplate='<b>%{x}</b><br>Faturamento: R$ %{y:,.2f}<br>Quantidade: %{customdata[0]:,}<br>Margem: %{customdata[1]:.2f}%<extra></extra>',
                 customdata=np.column_stack((categoria_stats['id_venda'], categoria_stats['margem'])),
                 text=categoria_stats['preco_venda'].apply(lambda x: f'R$ {x:,.0f}'),
                 textposition='inside'
-            )
+            )],
+            titulo="Faturamento por Categoria",
+            altura=400,
+            tamanho_titulo=TAMANHO_TITULO_COLUNA,
+            xaxis=neon_axis("Categoria", grade=False),
+            yaxis=neon_axis("Faturamento (R$)")
         )
         
-        # Personalizar layout
-        fig.update_layout(
-            title={
-                'text': "Faturamento por Categoria",
-                'y':0.95,
-                'x':0.5,
-                'xanchor': 'center',
-                'yanchor': 'top',
-                'font': dict(family="Orbitron", size=20, color="#F8F8FF")
-            },
-            paper_bgcolor='rgba(13, 13, 13, 0.0)',
-            plot_bgcolor='rgba(13, 13, 13, 0.0)',
-            margin=dict(l=20, r=20, t=80, b=20),
-            height=400,
-            xaxis=dict(
-                title=dict(
-                    text="Categoria",
-                    font=dict(family="Montserrat", color="#F8F8FF")
-                ),
-                tickfont=dict(family="Montserrat", color="#F8F8FF"),
-                showgrid=False,
-                zeroline=False
-            ),
-            yaxis=dict(
-                title=dict(
-                    text="Faturamento (R$)",
-                    font=dict(family="Montserrat", color="#F8F8FF")
-                ),
-                tickfont=dict(family="Montserrat", color="#F8F8FF"),
-                showgrid=True,
-                gridcolor='rgba(248, 248, 255, 0.1)',
-                zeroline=False
-            )
-        )
-        
-        st.plotly_chart(fig, use_container_width=True)
+        render_chart(fig)
     
     with col2:
         # Criar gráfico de pizza para distribuição de vendas por categoria
-        fig = go.Figure()
-        
-        # Adicionar pizza
-        fig.add_trace(
-            go.Pie(
+        fig = build_figure(
+            [dict(
+                type='pie',
                 labels=categoria_stats['categoria'],
                 values=categoria_stats['id_venda'],
                 hole=0.5,
-                marker=dict(colors=[cores.get(cat, '#F8F8FF') for cat in categoria_stats['categoria']]),
+                marker=dict(colors=[CORES_CATEGORIAS.get(cat, BRANCO) for cat in categoria_stats['categoria']]),
                 textinfo='label+percent',
                 hovertemplate='<b>%{label}</b><br>Quantidade: %{value:,}<br>Percentual: %{percent}<extra></extra>',
-                textfont=dict(family="Montserrat", color="#0D0D0D", size=12),
+                textfont=dict(color=PRETO, size=12),
                 insidetextorientation='radial'
-            )
+            )],
+            titulo="Distribuição de Vendas por Categoria",
+            altura=400,
+            tamanho_titulo=TAMANHO_TITULO_COLUNA,
+            legend=LEGENDA_ABAIXO
         )
         
-        # Personalizar layout
-        fig.update_layout(
-            title={
-                'text': "Distribuição de Vendas por Categoria",
-                'y':0.95,
-                'x':0.5,
-                'xanchor': 'center',
-                'yanchor': 'top',
-                'font': dict(family="Orbitron", size=20, color="#F8F8FF")
-            },
-            paper_bgcolor='rgba(13, 13, 13, 0.0)',
-            plot_bgcolor='rgba(13, 13, 13, 0.0)',
-            margin=dict(l=20, r=20, t=80, b=20),
-            height=400,
-            legend=dict(
-                orientation="h",
-                yanchor="bottom",
-                y=-0.2,
-                xanchor="center",
-                x=0.5,
-                font=dict(family="Montserrat", color="#F8F8FF")
-            )
-        )
-        
-        st.plotly_chart(fig, use_container_width=True)
+        render_chart(fig)
     
     # Análise por canal
     st.markdown('<div class="section-title">Análise por Canal de Venda</div>', unsafe_allow_html=True)
@@ -640,22 +521,8 @@ with tab1:
     
     with col1:
         # Agrupar por canal
-        canal_stats = vendas.copy()
-        if filtro_periodo:
-            data_inicio, data_fim = filtro_periodo
-            canal_stats = canal_stats[(canal_stats['data_venda'] >= data_inicio) & (canal_stats['data_venda'] <= data_fim)]
-        
-        if filtro_categorias:
-            canal_stats = canal_stats[canal_stats['categoria'].isin(filtro_categorias)]
-        
-        if filtro_canais:
-            canal_stats = canal_stats[canal_stats['canal_venda'].isin(filtro_canais)]
-        
-        canal_stats = canal_stats.groupby('canal_venda').agg({
-            'id_venda': 'count',
-            'preco_venda': 'sum',
-            'lucro': 'sum'
-        }).reset_index()
+        canal_stats = rollup_vendas(vendas, ['canal_venda'], filtro_periodo, filtro_categorias, filtro_canais)
+        canal_stats = canal_stats[['canal_venda', 'id_venda', 'preco_venda', 'lucro']]
         
         canal_stats['margem'] = (canal_stats['lucro'] / canal_stats['preco_venda']) * 100
         canal_stats['ticket_medio'] = canal_stats['preco_venda'] / canal_stats['id_venda']
@@ -663,111 +530,49 @@ with tab1:
         # Ordenar por faturamento
         canal_stats = canal_stats.sort_values('preco_venda', ascending=False)
         
-        # Criar gráfico de barras
-        fig = go.Figure()
-        
-        # Cores para cada canal
-        cores_canal = {
-            'Showroom': '#00FFFF',
-            'Online': '#FF5F1F',
-            'Concessionária': '#F8F8FF',
-            'Parceiro': '#9933FF'
-        }
-        
-        # Adicionar barras para cada canal
-        fig.add_trace(
-            go.Bar(
+        # Barras de faturamento, uma cor por canal
+        fig = build_figure(
+            [dict(
+                type='bar',
                 x=canal_stats['canal_venda'],
                 y=canal_stats['preco_venda'],
                 name="Faturamento",
-                marker=dict(color=[cores_canal.get(canal, '#F8F8FF') for canal in canal_stats['canal_venda']]),
+                marker=dict(color=[CORES_CANAIS.get(canal, BRANCO) for canal in canal_stats['canal_venda']]),
                 hovertemplate='<b>%{x}</b><br>Faturamento: R$ %{y:,.2f}<br>Quantidade: %{customdata[0]:,}<br>Margem: %{customdata[1]:.2f}%<extra></extra>',
                 customdata=np.column_stack((canal_stats['id_venda'], canal_stats['margem'])),
                 text=canal_stats['preco_venda'].apply(lambda x: f'R$ {x:,.0f}'),
                 textposition='inside'
-            )
-        )
-        
-        # Personalizar layout
-        fig.update_layout(
-            title={
-                'text': "Faturamento por Canal de Venda",
-                'y':0.95,
-                'x':0.5,
-                'xanchor': 'center',
-                'yanchor': 'top',
-                'font': dict(family="Orbitron", size=20, color="#F8F8FF")
-            },
-            paper_bgcolor='rgba(13, 13, 13, 0.0)',
-            plot_bgcolor='rgba(13, 13, 13, 0.0)',
-            margin=dict(l=20, r=20, t=80, b=20),
-            height=400,
-            xaxis=dict(
-                title=dict(
-                    text="Canal de Venda",
-                    font=dict(family="Montserrat", color="#F8F8FF")
-                ),
-                tickfont=dict(family="Montserrat", color="#F8F8FF"),
-                showgrid=False,
-                zeroline=False
-            ),
-            yaxis=dict(
-                title=dict(
-                    text="Faturamento (R$)",
-                    font=dict(family="Montserrat", color="#F8F8FF")
-                ),
-                tickfont=dict(family="Montserrat", color="#F8F8FF"),
-                showgrid=True,
-                gridcolor='rgba(248, 248, 255, 0.1)',
-                zeroline=False
-            )
+            )],
+            titulo="Faturamento por Canal de Venda",
+            altura=400,
+            tamanho_titulo=TAMANHO_TITULO_COLUNA,
+            xaxis=neon_axis("Canal de Venda", grade=False),
+            yaxis=neon_axis("Faturamento (R$)")
         )
         
-        st.plotly_chart(fig, use_container_width=True)
+        render_chart(fig)
     
     with col2:
         # Criar gráfico de pizza para distribuição de vendas por canal
-        fig = go.Figure()
-        
-        # Adicionar pizza
-        fig.add_trace(
-            go.Pie(
+        fig = build_figure(
+            [dict(
+                type='pie',
                 labels=canal_stats['canal_venda'],
                 values=canal_stats['id_venda'],
                 hole=0.5,
-                marker=dict(colors=[cores_canal.get(canal, '#F8F8FF') for canal in canal_stats['canal_venda']]),
+                marker=dict(colors=[CORES_CANAIS.get(canal, BRANCO) for canal in canal_stats['canal_venda']]),
                 textinfo='label+percent',
                 hovertemplate='<b>%{label}</b><br>Quantidade: %{value:,}<br>Percentual: %{percent}<extra></extra>',
-                textfont=dict(family="Montserrat", color="#0D0D0D", size=12),
+                textfont=dict(color=PRETO, size=12),
                 insidetextorientation='radial'
-            )
-        )
-        
-        # Personalizar layout
-        fig.update_layout(
-            title={
-                'text': "Distribuição de Vendas por Canal",
-                'y':0.95,
-                'x':0.5,
-                'xanchor': 'center',
-                'yanchor': 'top',
-                'font': dict(family="Orbitron", size=20, color="#F8F8FF")
-            },
-            paper_bgcolor='rgba(13, 13, 13, 0.0)',
-            plot_bgcolor='rgba(13, 13, 13, 0.0)',
-            margin=dict(l=20, r=20, t=80, b=20),
-            height=400,
-            legend=dict(
-                orientation="h",
-                yanchor="bottom",
-                y=-0.2,
-                xanchor="center",
-                x=0.5,
-                font=dict(family="Montserrat", color="#F8F8FF")
-            )
+            )],
+            titulo="Distribuição de Vendas por Canal",
+            altura=400,
+            tamanho_titulo=TAMANHO_TITULO_COLUNA,
+            legend=LEGENDA_ABAIXO
         )
         
-        st.plotly_chart(fig, use_container_width=True)
+        render_chart(fig)
     
     # Download de dados
     st.markdown('<div class="download-section">', unsafe_allow_html=True)
@@ -775,18 +580,20 @@ with tab1:
     col1, col2, col3 = st.columns(3)
     
     with col1:
-        st.markdown(get_download_link(faturamento_mensal, "faturamento_mensal.csv", "📥 Baixar Dados de Faturamento"), unsafe_allow_html=True)
+        render_download(faturamento_mensal, "faturamento_mensal.csv", "📥 Baixar Dados de Faturamento")
     
     with col2:
-        st.markdown(get_download_link(categoria_stats, "categoria_stats.csv", "📥 Baixar Dados por Categoria"), unsafe_allow_html=True)
+        render_download(categoria_stats, "categoria_stats.csv", "📥 Baixar Dados por Categoria")
     
     with col3:
-        st.markdown(get_download_link(canal_stats, "canal_stats.csv", "📥 Baixar Dados por Canal"), unsafe_allow_html=True)
+        render_download(canal_stats, "canal_stats.csv", "📥 Baixar Dados por Canal")
     
     st.markdown('</div>', unsafe_allow_html=True)
 
-# Tab 2: Margem de Lucro
-with tab2:
+# Seção 2: Margem de Lucro
+if secao_ativa == SECOES[1]:
+    insights_data = get_insights_data()
+    
     st.markdown('<div class="tab-title">Análise de Margem de Lucro</div>', unsafe_allow_html=True)
     
     # KPIs
@@ -847,7 +654,7 @@ with tab2:
     st.markdown('<div class="chart-container">', unsafe_allow_html=True)
     
     fig_margem, margem_categoria = create_margem_chart(vendas, filtro_periodo, filtro_categorias, filtro_canais)
-    st.plotly_chart(fig_margem, use_container_width=True)
+    render_chart(fig_margem)
     
     st.markdown('</div>', unsafe_allow_html=True)
     
@@ -855,96 +662,48 @@ with tab2:
     st.markdown('<div class="section-title">Margem de Lucro por Canal de Vendas</div>', unsafe_allow_html=True)
     
     fig_margem_canal, margem_canal = create_margem_canal_chart(vendas, filtro_periodo, filtro_categorias, filtro_canais)
-    st.plotly_chart(fig_margem_canal, use_container_width=True)
+    render_chart(fig_margem_canal)
     
     # Análise detalhada por modelo
     st.markdown('<div class="section-title">Análise Detalhada por Modelo</div>', unsafe_allow_html=True)
     
     # Agrupar por modelo
-    modelo_stats = vendas.copy()
-    if filtro_periodo:
-        data_inicio, data_fim = filtro_periodo
-        modelo_stats = modelo_stats[(modelo_stats['data_venda'] >= data_inicio) & (modelo_stats['data_venda'] <= data_fim)]
-    
-    if filtro_categorias:
-        modelo_stats = modelo_stats[modelo_stats['categoria'].isin(filtro_categorias)]
-    
-    if filtro_canais:
-        modelo_stats = modelo_stats[modelo_stats['canal_venda'].isin(filtro_canais)]
-    
-    modelo_stats = modelo_stats.groupby('modelo').agg({
-        'id_venda': 'count',
-        'preco_venda': 'sum',
-        'custo': 'sum',
-        'lucro': 'sum'
-    }).reset_index()
+    modelo_stats = rollup_vendas(vendas, ['modelo'], filtro_periodo, filtro_categorias, filtro_canais)
+    modelo_stats = modelo_stats[['modelo', 'id_venda', 'preco_venda', 'custo', 'lucro']]
     
     modelo_stats['margem'] = (modelo_stats['lucro'] / modelo_stats['preco_venda']) * 100
     modelo_stats['ticket_medio'] = modelo_stats['preco_venda'] / modelo_stats['id_venda']
     
+    # Modelo do catálogo e preço de referência da dimensão de modelo do modelo estrela, pelo valor do
+    # modelo (no modo streaming, os códigos da amostra não são os dos pré-agregados)
+    dimensao_modelo = get_star_schema(vendas, metas, modelos)['modelo']
+    catalogo = dimensao_modelo.set_index('modelo').reindex(modelo_stats['modelo'].astype(object))
+    modelo_stats['nome_catalogo'] = catalogo['nome_catalogo'].to_numpy()
+    modelo_stats['preco_base'] = catalogo['preco_base'].to_numpy()
+    modelo_stats['ticket_vs_preco_base'] = (modelo_stats['ticket_medio'] / modelo_stats['preco_base'] - 1) * 100
+    
     # Ordenar por margem
     modelo_stats = modelo_stats.sort_values('margem', ascending=False)
     
-    # Criar gráfico de barras
-    fig = go.Figure()
-    
-    # Adicionar barras para cada modelo
-    fig.add_trace(
-        go.Bar(
+    # Barras de margem, com a cor pela própria margem
+    fig = build_figure(
+        [dict(
+            type='bar',
             x=modelo_stats['modelo'],
             y=modelo_stats['margem'],
             name="Margem (%)",
-            marker=dict(
-                color=modelo_stats['margem'],
-                colorscale=[
-                    [0, 'rgba(255, 95, 31, 0.7)'],
-                    [0.5, 'rgba(248, 248, 255, 0.7)'],
-                    [1, 'rgba(0, 255, 255, 0.7)']
-                ]
-            ),
-            hovertemplate='<b>%{x}</b><br>Margem: %{y:.2f}%<br>Lucro: R$ %{customdata[0]:,.2f}<br>Vendas: %{customdata[1]:,}<extra></extra>',
-            customdata=np.column_stack((modelo_stats['lucro'], modelo_stats['id_venda'])),
+            marker=dict(color=modelo_stats['margem'], colorscale=ESCALA_MARGEM),
+            hovertemplate='<b>%{x}</b><br>Modelo do catálogo (estimado pelo preço): %{customdata[2]}<br>Margem: %{y:.2f}%<br>Lucro: R$ %{customdata[0]:,.2f}<br>Vendas: %{customdata[1]:,}<br>Ticket vs. preço base: %{customdata[3]:+.1f}%<extra></extra>',
+            customdata=np.column_stack((modelo_stats['lucro'], modelo_stats['id_venda'], modelo_stats['nome_catalogo'].fillna('-'), modelo_stats['ticket_vs_preco_base'])),
             text=modelo_stats['margem'].apply(lambda x: f'{x:.2f}%'),
             textposition='inside'
-        )
-    )
-    
-    # Personalizar layout
-    fig.update_layout(
-        title={
-            'text': "Margem de Lucro por Modelo",
-            'y':0.95,
-            'x':0.5,
-            'xanchor': 'center',
-            'yanchor': 'top',
-            'font': dict(family="Orbitron", size=24, color="#F8F8FF")
-        },
-        paper_bgcolor='rgba(13, 13, 13, 0.0)',
-        plot_bgcolor='rgba(13, 13, 13, 0.0)',
-        margin=dict(l=20, r=20, t=80, b=20),
-        height=500,
-        xaxis=dict(
-            title=dict(
-                text="Modelo",
-                font=dict(family="Montserrat", color="#F8F8FF")
-            ),
-            tickfont=dict(family="Montserrat", color="#F8F8FF"),
-            showgrid=False,
-            zeroline=False
-        ),
-        yaxis=dict(
-            title=dict(
-                text="Margem (%)",
-                font=dict(family="Montserrat", color="#F8F8FF")
-            ),
-            tickfont=dict(family="Montserrat", color="#F8F8FF"),
-            showgrid=True,
-            gridcolor='rgba(248, 248, 255, 0.1)',
-            zeroline=False
-        )
+        )],
+        titulo="Margem de Lucro por Modelo",
+        xaxis=neon_axis("Modelo", grade=False),
+        yaxis=neon_axis("Margem (%)")
     )
     
-    st.plotly_chart(fig, use_container_width=True)
+    render_chart(fig)
     
     # Download de dados
     st.markdown('<div class="download-section">', unsafe_allow_html=True)
@@ -952,27 +711,27 @@ with tab2:
     col1, col2, col3 = st.columns(3)
     
     with col1:
-        st.markdown(get_download_link(margem_categoria, "margem_categoria.csv", "📥 Baixar Dados de Margem por Categoria"), unsafe_allow_html=True)
+        render_download(margem_categoria, "margem_categoria.csv", "📥 Baixar Dados de Margem por Categoria")
     
     with col2:
-        st.markdown(get_download_link(margem_canal, "margem_canal.csv", "📥 Baixar Dados de Margem por Canal"), unsafe_allow_html=True)
+        render_download(margem_canal, "margem_canal.csv", "📥 Baixar Dados de Margem por Canal")
     
     with col3:
-        st.markdown(get_download_link(modelo_stats, "modelo_stats.csv", "📥 Baixar Dados por Modelo"), unsafe_allow_html=True)
+        render_download(modelo_stats, "modelo_stats.csv", "📥 Baixar Dados por Modelo")
     
     st.markdown('</div>', unsafe_allow_html=True)
 
-# Tab 3: Ticket Médio
-with tab3:
+# Seção 3: Ticket Médio
+if secao_ativa == SECOES[2]:
     st.markdown('<div class="tab-title">Análise de Ticket Médio</div>', unsafe_allow_html=True)
     
     # Gráficos de ticket médio
-    fig_gauge, fig_line, ticket_medio = create_ticket_chart(vendas, metas, filtro_periodo, filtro_categorias, filtro_canais)
+    fig_gauge, fig_line, ticket_medio = create_ticket_chart(vendas, metas, filtro_periodo, filtro_categorias, filtro_canais, granularidade)
     
     col1, col2 = st.columns(2)
     
     with col1:
-        st.plotly_chart(fig_gauge, use_container_width=True)
+        render_chart(fig_gauge)
     
     with col2:
         # Insights de ticket médio
@@ -985,100 +744,46 @@ with tab3:
         st.markdown('</div>', unsafe_allow_html=True)
     
     # Evolução do ticket médio
-    st.plotly_chart(fig_line, use_container_width=True)
+    render_chart(fig_line)
     
     # Ticket médio por categoria
     st.markdown('<div class="section-title">Ticket Médio por Categoria</div>', unsafe_allow_html=True)
     
     fig_ticket_categoria, ticket_categoria = create_ticket_categoria_chart(vendas, filtro_periodo, filtro_categorias, filtro_canais)
-    st.plotly_chart(fig_ticket_categoria, use_container_width=True)
+    render_chart(fig_ticket_categoria)
     
     # Ticket médio por canal
     st.markdown('<div class="section-title">Ticket Médio por Canal de Venda</div>', unsafe_allow_html=True)
     
     # Agrupar por canal
-    canal_ticket = vendas.copy()
-    if filtro_periodo:
-        data_inicio, data_fim = filtro_periodo
-        canal_ticket = canal_ticket[(canal_ticket['data_venda'] >= data_inicio) & (canal_ticket['data_venda'] <= data_fim)]
-    
-    if filtro_categorias:
-        canal_ticket = canal_ticket[canal_ticket['categoria'].isin(filtro_categorias)]
-    
-    if filtro_canais:
-        canal_ticket = canal_ticket[canal_ticket['canal_venda'].isin(filtro_canais)]
-    
-    canal_ticket = canal_ticket.groupby('canal_venda').agg({
-        'id_venda': 'count',
-        'preco_venda': 'sum'
-    }).reset_index()
+    canal_ticket = rollup_vendas(vendas, ['canal_venda'], filtro_periodo, filtro_categorias, filtro_canais)
+    canal_ticket = canal_ticket[['canal_venda', 'id_venda', 'preco_venda']]
     
     canal_ticket['ticket_medio'] = canal_ticket['preco_venda'] / canal_ticket['id_venda']
     
     # Ordenar por ticket médio
     canal_ticket = canal_ticket.sort_values('ticket_medio', ascending=False)
     
-    # Criar gráfico de barras
-    fig = go.Figure()
-    
-    # Cores para cada canal
-    cores_canal = {
-        'Showroom': '#00FFFF',
-        'Online': '#FF5F1F',
-        'Concessionária': '#F8F8FF',
-        'Parceiro': '#9933FF'
-    }
-    
-    # Adicionar barras para cada canal
-    fig.add_trace(
-        go.Bar(
+    # Barras de ticket médio, uma cor por canal
+    fig = build_figure(
+        [dict(
+            type='bar',
             x=canal_ticket['canal_venda'],
             y=canal_ticket['ticket_medio'],
             name="Ticket Médio",
-            marker=dict(color=[cores_canal.get(canal, '#F8F8FF') for canal in canal_ticket['canal_venda']]),
+            marker=dict(color=[CORES_CANAIS.get(canal, BRANCO) for canal in canal_ticket['canal_venda']]),
             hovertemplate='<b>%{x}</b><br>Ticket Médio: R$ %{y:,.2f}<br>Quantidade: %{customdata:,}<extra></extra>',
             customdata=canal_ticket['id_venda'],
             text=canal_ticket['ticket_medio'].apply(lambda x: f'R$ {x:,.2f}'),
             textposition='inside'
-        )
-    )
-    
-    # Personalizar layout
-    fig.update_layout(
-        title={
-            'text': "Ticket Médio por Canal de Venda",
-            'y':0.95,
-            'x':0.5,
-            'xanchor': 'center',
-            'yanchor': 'top',
-            'font': dict(family="Orbitron", size=24, color="#F8F8FF")
-        },
-        paper_bgcolor='rgba(13, 13, 13, 0.0)',
-        plot_bgcolor='rgba(13, 13, 13, 0.0)',
-        margin=dict(l=20, r=20, t=80, b=20),
-        height=400,
-        xaxis=dict(
-            title=dict(
-                text="Canal de Venda",
-                font=dict(family="Montserrat", color="#F8F8FF")
-            ),
-            tickfont=dict(family="Montserrat", color="#F8F8FF"),
-            showgrid=False,
-            zeroline=False
-        ),
-        yaxis=dict(
-            title=dict(
-                text="Ticket Médio (R$)",
-                font=dict(family="Montserrat", color="#F8F8FF")
-            ),
-            tickfont=dict(family="Montserrat", color="#F8F8FF"),
-            showgrid=True,
-            gridcolor='rgba(248, 248, 255, 0.1)',
-            zeroline=False
-        )
+        )],
+        titulo="Ticket Médio por Canal de Venda",
+        altura=400,
+        xaxis=neon_axis("Canal de Venda", grade=False),
+        yaxis=neon_axis("Ticket Médio (R$)")
     )
     
-    st.plotly_chart(fig, use_container_width=True)
+    render_chart(fig)
     
     # Download de dados
     st.markdown('<div class="download-section">', unsafe_allow_html=True)
@@ -1086,25 +791,25 @@ with tab3:
     col1, col2, col3 = st.columns(3)
     
     with col1:
-        st.markdown(get_download_link(ticket_medio, "ticket_medio.csv", "📥 Baixar Dados de Ticket Médio"), unsafe_allow_html=True)
+        render_download(ticket_medio, "ticket_medio.csv", "📥 Baixar Dados de Ticket Médio")
     
     with col2:
-        st.markdown(get_download_link(ticket_categoria, "ticket_categoria.csv", "📥 Baixar Dados de Ticket por Categoria"), unsafe_allow_html=True)
+        render_download(ticket_categoria, "ticket_categoria.csv", "📥 Baixar Dados de Ticket por Categoria")
     
     with col3:
-        st.markdown(get_download_link(canal_ticket, "canal_ticket.csv", "📥 Baixar Dados de Ticket por Canal"), unsafe_allow_html=True)
+        render_download(canal_ticket, "canal_ticket.csv", "📥 Baixar Dados de Ticket por Canal")
     
     st.markdown('</div>', unsafe_allow_html=True)
 
-# Tab 4: Análise Mensal
-with tab4:
+# Seção 4: Análise Mensal
+if secao_ativa == SECOES[3]:
     st.markdown('<div class="tab-title">Análise Mensal</div>', unsafe_allow_html=True)
     
     # Heatmap de vendas por modelo e período
     st.markdown('<div class="chart-container">', unsafe_allow_html=True)
     
     fig_heatmap, matriz_vendas = create_heatmap(vendas, filtro_periodo, filtro_categorias, filtro_canais)
-    st.plotly_chart(fig_heatmap, use_container_width=True)
+    render_chart(fig_heatmap)
     
     st.markdown('</div>', unsafe_allow_html=True)
     
@@ -1112,227 +817,100 @@ with tab4:
     st.markdown('<div class="section-title">Atingimento de Metas</div>', unsafe_allow_html=True)
     
     # Agrupar por período
-    periodo_stats = vendas.copy()
-    if filtro_periodo:
-        data_inicio, data_fim = filtro_periodo
-        periodo_stats = periodo_stats[(periodo_stats['data_venda'] >= data_inicio) & (periodo_stats['data_venda'] <= data_fim)]
-    
-    if filtro_categorias:
-        periodo_stats = periodo_stats[periodo_stats['categoria'].isin(filtro_categorias)]
-    
-    if filtro_canais:
-        periodo_stats = periodo_stats[periodo_stats['canal_venda'].isin(filtro_canais)]
+    periodo_stats = rollup_vendas(vendas, ['periodo'], filtro_periodo, filtro_categorias, filtro_canais)
+    periodo_stats = periodo_stats[['periodo', 'id_venda', 'preco_venda']]
     
-    periodo_stats = periodo_stats.groupby('periodo').agg({
-        'id_venda': 'count',
-        'preco_venda': 'sum'
-    }).reset_index()
-    
-    # Mesclar com metas
-    metas_periodo = metas.copy()
-    metas_periodo = pd.merge(periodo_stats, metas_periodo[['periodo', 'meta_faturamento']], on='periodo', how='left')
+    # Meta de cada período pela chave inteira do período no modelo estrela
+    metas_periodo = periodo_stats.copy()
+    metas_periodo['meta_faturamento'] = period_targets(get_star_schema(vendas, metas, modelos), periodo_stats['periodo'])['meta_faturamento'].to_numpy()
     
     # Calcular atingimento
     metas_periodo['atingimento'] = (metas_periodo['preco_venda'] / metas_periodo['meta_faturamento']) * 100
     
-    # Criar gráfico de barras e linha
-    fig = go.Figure()
-    
-    # Adicionar barras para faturamento
-    fig.add_trace(
-        go.Bar(
+    # Barras de faturamento, linha da meta e linha de atingimento (eixo secundário)
+    tracos = [
+        dict(
+            type='bar',
             x=metas_periodo['periodo'],
             y=metas_periodo['preco_venda'],
             name="Faturamento",
-            marker=dict(color="#00FFFF"),
+            marker=dict(color=CIANO),
             hovertemplate='<b>%{x}</b><br>Faturamento: R$ %{y:,.2f}<br>Atingimento: %{customdata:.1f}%<extra></extra>',
             customdata=metas_periodo['atingimento'],
             text=metas_periodo['preco_venda'].apply(lambda x: f'R$ {x:,.0f}'),
             textposition='inside'
-        )
-    )
-    
-    # Adicionar linha para meta
-    fig.add_trace(
-        go.Scatter(
+        ),
+        dict(
+            type='scatter',
             x=metas_periodo['periodo'],
             y=metas_periodo['meta_faturamento'],
             name="Meta",
-            line=dict(color="#FF5F1F", width=3, dash='dash'),
+            line=dict(color=LARANJA, width=3, dash='dash'),
             mode='lines+markers',
-            marker=dict(size=8, symbol='diamond', color="#FF5F1F"),
+            marker=dict(size=8, symbol='diamond', color=LARANJA),
             hovertemplate='<b>%{x}</b><br>Meta: R$ %{y:,.2f}<extra></extra>'
-        )
-    )
-    
-    # Adicionar linha para atingimento
-    fig.add_trace(
-        go.Scatter(
+        ),
+        dict(
+            type='scatter',
             x=metas_periodo['periodo'],
             y=metas_periodo['atingimento'],
             name="Atingimento (%)",
-            line=dict(color="#F8F8FF", width=3),
+            line=dict(color=BRANCO, width=3),
             mode='lines+markers+text',
-            marker=dict(size=8, symbol='circle', color="#F8F8FF"),
+            marker=dict(size=8, symbol='circle', color=BRANCO),
             text=metas_periodo['atingimento'].apply(lambda x: f'{x:.1f}%'),
             textposition='top center',
             yaxis="y2",
             hovertemplate='<b>%{x}</b><br>Atingimento: %{y:.1f}%<extra></extra>'
         )
-    )
+    ]
     
-    # Personalizar layout
-    fig.update_layout(
-        title={
-            'text': "Atingimento de Metas por Período",
-            'y':0.95,
-            'x':0.5,
-            'xanchor': 'center',
-            'yanchor': 'top',
-            'font': dict(family="Orbitron", size=24, color="#F8F8FF")
-        },
-        paper_bgcolor='rgba(13, 13, 13, 0.0)',
-        plot_bgcolor='rgba(13, 13, 13, 0.0)',
-        legend=dict(
-            orientation="h",
-            yanchor="bottom",
-            y=1.02,
-            xanchor="right",
-            x=1,
-            font=dict(family="Montserrat", color="#F8F8FF")
-        ),
-        margin=dict(l=20, r=20, t=80, b=20),
-        height=500,
+    fig = build_figure(
+        tracos,
+        titulo="Atingimento de Metas por Período",
         hovermode="x unified",
-        yaxis=dict(
-            title=dict(
-                text="Faturamento (R$)",
-                font=dict(family="Montserrat", color="#00FFFF")
-            ),
-            tickfont=dict(family="Montserrat", color="#00FFFF"),
-            showgrid=True,
-            gridcolor='rgba(0, 255, 255, 0.1)',
-            zeroline=False
-        ),
-        yaxis2=dict(
-            title=dict(
-                text="Atingimento (%)",
-                font=dict(family="Montserrat", color="#F8F8FF")
-            ),
-            tickfont=dict(family="Montserrat", color="#F8F8FF"),
-            overlaying="y",
-            side="right",
-            showgrid=False,
-            zeroline=False,
+        xaxis=neon_axis("Período"),
+        yaxis=neon_axis("Faturamento (R$)", cor=CIANO, cor_grade=GRADE_CIANO),
+        yaxis2=neon_axis(
+            "Atingimento (%)", grade=False, overlaying="y", side="right",
             range=[0, max(metas_periodo['atingimento']) * 1.2]
-        ),
-        xaxis=dict(
-            title=dict(
-                text="Período",
-                font=dict(family="Montserrat", color="#F8F8FF")
-            ),
-            tickfont=dict(family="Montserrat", color="#F8F8FF"),
-            showgrid=True,
-            gridcolor='rgba(248, 248, 255, 0.1)',
-            zeroline=False
         )
     )
     
-    st.plotly_chart(fig, use_container_width=True)
+    render_chart(fig)
     
     # Análise de tendência mensal
     st.markdown('<div class="section-title">Tendência Mensal por Categoria</div>', unsafe_allow_html=True)
     
-    # Agrupar por categoria e período
-    categoria_periodo = vendas.copy()
-    if filtro_periodo:
-        data_inicio, data_fim = filtro_periodo
-        categoria_periodo = categoria_periodo[(categoria_periodo['data_venda'] >= data_inicio) & (categoria_periodo['data_venda'] <= data_fim)]
-    
-    if filtro_categorias:
-        categoria_periodo = categoria_periodo[categoria_periodo['categoria'].isin(filtro_categorias)]
-    
-    if filtro_canais:
-        categoria_periodo = categoria_periodo[categoria_periodo['canal_venda'].isin(filtro_canais)]
-    
-    categoria_periodo = categoria_periodo.groupby(['categoria', 'periodo']).agg({
-        'id_venda': 'count'
-    }).reset_index()
-    
-    # Criar gráfico de linha
-    fig = go.Figure()
-    
-    # Cores para cada categoria
-    cores = {
-        'SUV': '#00FFFF',
-        'Sedan': '#FF5F1F',
-        'Hatch': '#F8F8FF',
-        'Pickup': '#9933FF',
-        'Elétrico': '#33FF99'
-    }
+    # Agrupar por categoria e período (ou dia, na visão diária)
+    categoria_periodo = rollup_vendas(vendas, ['categoria', granularidade], filtro_periodo, filtro_categorias, filtro_canais)
+    categoria_periodo = categoria_periodo[['categoria', granularidade, 'id_venda']]
     
-    # Adicionar linha para cada categoria
+    # Uma linha por categoria
+    tracos = []
     for categoria in sorted(categoria_periodo['categoria'].unique()):
         df_cat = categoria_periodo[categoria_periodo['categoria'] == categoria]
         
-        fig.add_trace(
-            go.Scatter(
-                x=df_cat['periodo'],
-                y=df_cat['id_venda'],
-                name=categoria,
-                line=dict(color=cores.get(categoria, '#F8F8FF'), width=3),
-                mode='lines+markers',
-                marker=dict(size=8, symbol='circle', color=cores.get(categoria, '#F8F8FF')),
-                hovertemplate='<b>%{x}</b><br>Categoria: ' + categoria + '<br>Vendas: %{y:,}<extra></extra>'
-            )
-        )
-    
-    # Personalizar layout
-    fig.update_layout(
-        title={
-            'text': "Evolução de Vendas por Categoria",
-            'y':0.95,
-            'x':0.5,
-            'xanchor': 'center',
-            'yanchor': 'top',
-            'font': dict(family="Orbitron", size=24, color="#F8F8FF")
-        },
-        paper_bgcolor='rgba(13, 13, 13, 0.0)',
-        plot_bgcolor='rgba(13, 13, 13, 0.0)',
-        legend=dict(
-            orientation="h",
-            yanchor="bottom",
-            y=1.02,
-            xanchor="right",
-            x=1,
-            font=dict(family="Montserrat", color="#F8F8FF")
-        ),
-        margin=dict(l=20, r=20, t=80, b=20),
-        height=500,
+        tracos.append(dict(
+            type='scatter',
+            x=df_cat[granularidade],
+            y=df_cat['id_venda'],
+            name=categoria,
+            line=dict(color=CORES_CATEGORIAS.get(categoria, BRANCO), width=3),
+            mode='lines+markers' if granularidade == 'periodo' else 'lines',
+            marker=dict(size=8, symbol='circle', color=CORES_CATEGORIAS.get(categoria, BRANCO)),
+            hovertemplate='<b>%{x}</b><br>Categoria: ' + categoria + '<br>Vendas: %{y:,}<extra></extra>'
+        ))
+    
+    fig = build_figure(
+        tracos,
+        titulo="Evolução de Vendas por Categoria",
         hovermode="x unified",
-        yaxis=dict(
-            title=dict(
-                text="Quantidade de Vendas",
-                font=dict(family="Montserrat", color="#F8F8FF")
-            ),
-            tickfont=dict(family="Montserrat", color="#F8F8FF"),
-            showgrid=True,
-            gridcolor='rgba(248, 248, 255, 0.1)',
-            zeroline=False
-        ),
-        xaxis=dict(
-            title=dict(
-                text="Período",
-                font=dict(family="Montserrat", color="#F8F8FF")
-            ),
-            tickfont=dict(family="Montserrat", color="#F8F8FF"),
-            showgrid=True,
-            gridcolor='rgba(248, 248, 255, 0.1)',
-            zeroline=False
-        )
+        xaxis=neon_axis("Período"),
+        yaxis=neon_axis("Quantidade de Vendas")
     )
     
-    st.plotly_chart(fig, use_container_width=True)
+    render_chart(fig)
     
     # Download de dados
     st.markdown('<div class="download-section">', unsafe_allow_html=True)
@@ -1340,25 +918,25 @@ with tab4:
     col1, col2, col3 = st.columns(3)
     
     with col1:
-        st.markdown(get_download_link(matriz_vendas.reset_index(), "matriz_vendas.csv", "📥 Baixar Dados de Vendas por Modelo"), unsafe_allow_html=True)
+        render_download(matriz_vendas.reset_index(), "matriz_vendas.csv", "📥 Baixar Dados de Vendas por Modelo")
     
     with col2:
-        st.markdown(get_download_link(metas_periodo, "metas_periodo.csv", "📥 Baixar Dados de Atingimento"), unsafe_allow_html=True)
+        render_download(metas_periodo, "metas_periodo.csv", "📥 Baixar Dados de Atingimento")
     
     with col3:
-        st.markdown(get_download_link(categoria_periodo, "categoria_periodo.csv", "📥 Baixar Dados de Tendência"), unsafe_allow_html=True)
+        render_download(categoria_periodo, "categoria_periodo.csv", "📥 Baixar Dados de Tendência")
     
     st.markdown('</div>', unsafe_allow_html=True)
 
-# Tab 5: Análise por Horário
-with tab5:
+# Seção 5: Análise por Horário
+if secao_ativa == SECOES[4]:
     st.markdown('<div class="tab-title">Análise por Horário</div>', unsafe_allow_html=True)
     
     # Gráfico de dispersão por hora
     st.markdown('<div class="chart-container">', unsafe_allow_html=True)
     
     fig_scatter, vendas_hora = create_scatter_chart(vendas, filtro_periodo, filtro_categorias, filtro_canais)
-    st.plotly_chart(fig_scatter, use_container_width=True)
+    render_chart(fig_scatter)
     
     st.markdown('</div>', unsafe_allow_html=True)
     
@@ -1366,46 +944,17 @@ with tab5:
     st.markdown('<div class="section-title">Análise por Dia da Semana</div>', unsafe_allow_html=True)
     
     fig_line, vendas_dia = create_line_chart(vendas, filtro_periodo, filtro_categorias, filtro_canais)
-    st.plotly_chart(fig_line, use_container_width=True)
+    render_chart(fig_line)
     
     # Análise cruzada: Dia da Semana x Hora
     st.markdown('<div class="section-title">Análise Cruzada: Dia da Semana x Hora</div>', unsafe_allow_html=True)
     
     # Agrupar por dia da semana e hora
-    dia_hora = vendas.copy()
-    if filtro_periodo:
-        data_inicio, data_fim = filtro_periodo
-        dia_hora = dia_hora[(dia_hora['data_venda'] >= data_inicio) & (dia_hora['data_venda'] <= data_fim)]
-    
-    if filtro_categorias:
-        dia_hora = dia_hora[dia_hora['categoria'].isin(filtro_categorias)]
-    
-    if filtro_canais:
-        dia_hora = dia_hora[dia_hora['canal_venda'].isin(filtro_canais)]
-    
-    # Adicionar dia da semana
-    dia_hora['dia_semana'] = dia_hora['data_venda'].dt.dayofweek
-    dia_hora['dia_semana_nome'] = dia_hora['data_venda'].dt.day_name()
-    
-    # Mapeamento para nomes em português
-    mapa_dias = {
-        'Monday': 'Segunda-feira',
-        'Tuesday': 'Terça-feira',
-        'Wednesday': 'Quarta-feira',
-        'Thursday': 'Quinta-feira',
-        'Friday': 'Sexta-feira',
-        'Saturday': 'Sábado',
-        'Sunday': 'Domingo'
-    }
-    
-    dia_hora['dia_semana_nome'] = dia_hora['dia_semana_nome'].map(mapa_dias)
+    dia_hora_stats = rollup_vendas(vendas, ['dia_semana', 'hora'], filtro_periodo, filtro_categorias, filtro_canais)
     
-    # Agrupar por dia da semana e hora
-    dia_hora_stats = dia_hora.groupby(['dia_semana', 'dia_semana_nome', 'hora']).agg({
-        'id_venda': 'count',
-        'preco_venda': 'sum',
-        'lucro': 'sum'
-    }).reset_index()
+    # Nomes em português
+    dia_hora_stats['dia_semana_nome'] = dia_hora_stats['dia_semana'].map(dict(enumerate(NOMES_DIAS_SEMANA)))
+    dia_hora_stats = dia_hora_stats[['dia_semana', 'dia_semana_nome', 'hora', 'id_venda', 'preco_venda', 'lucro']]
     
     # Calcular margem
     dia_hora_stats['margem'] = (dia_hora_stats['lucro'] / dia_hora_stats['preco_venda']) * 100
@@ -1419,66 +968,30 @@ with tab5:
     ).fillna(0)
     
     # Ordenar por dia da semana
-    ordem_dias = [mapa_dias[dia] for dia in ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']]
-    matriz_dia_hora = matriz_dia_hora.reindex(ordem_dias)
+    matriz_dia_hora = matriz_dia_hora.reindex(NOMES_DIAS_SEMANA)
     
     # Criar heatmap
-    fig = go.Figure(data=go.Heatmap(
-        z=matriz_dia_hora.values,
-        x=matriz_dia_hora.columns,
-        y=matriz_dia_hora.index,
-        colorscale=[
-            [0, 'rgba(13, 13, 13, 0.7)'],
-            [0.2, 'rgba(255, 95, 31, 0.3)'],
-            [0.4, 'rgba(255, 95, 31, 0.5)'],
-            [0.6, 'rgba(255, 95, 31, 0.7)'],
-            [0.8, 'rgba(255, 95, 31, 0.9)'],
-            [1, '#FF5F1F']
-        ],
-        hovertemplate='<b>Dia:</b> %{y}<br><b>Hora:</b> %{x}:00<br><b>Vendas:</b> %{z}<extra></extra>',
-        text=matriz_dia_hora.values.astype(int),
-        texttemplate="%{text}",
-        textfont={"family": "Montserrat", "size": 12, "color": "#F8F8FF"}
-    ))
-    
-    # Personalizar layout
-    fig.update_layout(
-        title={
-            'text': "Mapa de Calor: Vendas por Dia da Semana e Hora",
-            'y':0.95,
-            'x':0.5,
-            'xanchor': 'center',
-            'yanchor': 'top',
-            'font': dict(family="Orbitron", size=24, color="#F8F8FF")
-        },
-        paper_bgcolor='rgba(13, 13, 13, 0.0)',
-        plot_bgcolor='rgba(13, 13, 13, 0.0)',
-        margin=dict(l=20, r=20, t=80, b=20),
-        height=500,
-        xaxis=dict(
-            title=dict(
-                text="Hora do Dia",
-                font=dict(family="Montserrat", color="#F8F8FF")
-            ),
-            tickfont=dict(family="Montserrat", color="#F8F8FF"),
-            showgrid=False,
-            zeroline=False,
-            tickmode='array',
-            tickvals=list(range(0, 24)),
+    fig = build_figure(
+        [dict(
+            type='heatmap',
+            z=matriz_dia_hora.values,
+            x=matriz_dia_hora.columns,
+            y=matriz_dia_hora.index,
+            colorscale=ESCALA_LARANJA,
+            hovertemplate='<b>Dia:</b> %{y}<br><b>Hora:</b> %{x}:00<br><b>Vendas:</b> %{z}<extra></extra>',
+            text=matriz_dia_hora.values.astype(int),
+            texttemplate="%{text}",
+            textfont={"size": 12}
+        )],
+        titulo="Mapa de Calor: Vendas por Dia da Semana e Hora",
+        xaxis=neon_axis(
+            "Hora do Dia", grade=False, tickmode='array', tickvals=list(range(0, 24)),
             ticktext=[f'{h}:00' for h in range(0, 24)]
         ),
-        yaxis=dict(
-            title=dict(
-                text="Dia da Semana",
-                font=dict(family="Montserrat", color="#F8F8FF")
-            ),
-            tickfont=dict(family="Montserrat", color="#F8F8FF"),
-            showgrid=False,
-            zeroline=False
-        )
+        yaxis=neon_axis("Dia da Semana", grade=False)
     )
     
-    st.plotly_chart(fig, use_container_width=True)
+    render_chart(fig)
     
     # Download de dados
     st.markdown('<div class="download-section">', unsafe_allow_html=True)
@@ -1486,18 +999,20 @@ with tab5:
     col1, col2, col3 = st.columns(3)
     
     with col1:
-        st.markdown(get_download_link(vendas_hora, "vendas_hora.csv", "📥 Baixar Dados por Hora"), unsafe_allow_html=True)
+        render_download(vendas_hora, "vendas_hora.csv", "📥 Baixar Dados por Hora")
     
     with col2:
-        st.markdown(get_download_link(vendas_dia, "vendas_dia.csv", "📥 Baixar Dados por Dia da Semana"), unsafe_allow_html=True)
+        render_download(vendas_dia, "vendas_dia.csv", "📥 Baixar Dados por Dia da Semana")
     
     with col3:
-        st.markdown(get_download_link(dia_hora_stats, "dia_hora_stats.csv", "📥 Baixar Dados Cruzados"), unsafe_allow_html=True)
+        render_download(dia_hora_stats, "dia_hora_stats.csv", "📥 Baixar Dados Cruzados")
     
     st.markdown('</div>', unsafe_allow_html=True)
 
-# Tab 6: IA Insights
-with tab6:
+# Seção 6: IA Insights
+if secao_ativa == SECOES[5]:
+    insights_data = get_insights_data()
+    
     st.markdown('<div class="tab-title">Análise Inteligente com IA</div>', unsafe_allow_html=True)
     
     # Insights gerados por IA
@@ -1522,14 +1037,7 @@ with tab6:
         st.markdown('<div class="export-title">Exportar para PDF</div>', unsafe_allow_html=True)
         st.markdown('<div class="export-description">Gere um relatório completo em PDF com todos os insights e recomendações.</div>', unsafe_allow_html=True)
         
-        if st.button("Gerar PDF", key="pdf_button"):
-            with st.spinner("Gerando relatório em PDF..."):
-                pdf_buffer = export_to_pdf(vendas, metas, insights_data, filtro_periodo, filtro_categorias, filtro_canais)
-                
-                # Converter para base64 para download
-                b64_pdf = base64.b64encode(pdf_buffer.read()).decode()
-                href = f'<a href="data:application/pdf;base64,{b64_pdf}" download="relatorio_vendas.pdf" class="download-button">📥 Baixar Relatório PDF</a>'
-                st.markdown(href, unsafe_allow_html=True)
+        render_export('pdf', "Gerar PDF", "📥 Baixar Relatório PDF", "relatorio_vendas.pdf")
         
         st.markdown('</div>', unsafe_allow_html=True)
     
@@ -1538,13 +1046,11 @@ with tab6:
         st.markdown('<div class="export-title">Exportar para PowerPoint</div>', unsafe_allow_html=True)
         st.markdown('<div class="export-description">Crie uma apresentação em PowerPoint com os principais insights e gráficos.</div>', unsafe_allow_html=True)
         
-        if st.button("Gerar PowerPoint", key="ppt_button"):
-            with st.spinner("Gerando apresentação em PowerPoint..."):
-                ppt_buffer = export_to_ppt(vendas, metas, insights_data, filtro_periodo, filtro_categorias, filtro_canais)
-                
-                # Converter para base64 para download
-                b64_ppt = base64.b64encode(ppt_buffer.read()).decode()
-                href = f'<a href="data:application/vnd.openxmlformats-officedocument.presentationml.presentation;base64,{b64_ppt}" download="apresentacao_vendas.pptx" class="download-button">📥 Baixar Apresentação PowerPoint</a>'
-                st.markdown(href, unsafe_allow_html=True)
+        render_export('pptx', "Gerar PowerPoint", "📥 Baixar Apresentação PowerPoint", "apresentacao_vendas.pptx")
         
         st.markdown('</div>', unsafe_allow_html=True)
+
+# Encerrar a medição desta execução e exibir o painel de desempenho
+if perfil is not None:
+    finish_profile(perfil)
+    render_profile_panel(perfil)
@@ -0,0 +1,114 @@
+import argparse
+import inspect
+import json
+import os
+import statistics
+import sys
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if RAIZ not in sys.path:
+    sys.path.insert(0, RAIZ)
+
+# As medições são das agregações e insights calculados, não dos acertos no cache de resultados em disco
+os.environ.setdefault('DASHBOARD_CACHE_RESULTADOS_MB', '0')
+
+import pandas as pd
+import plotly.io as pio
+
+# Mede, para cada gráfico de `chart_factory`, o tempo de construção da figura (sem o cache de
+# gráficos) e o tamanho do JSON enviado ao navegador (o mesmo `plotly.io.to_json` do st.plotly_chart).
+#
+# Os pré-agregados são construídos antes das medições, então o tempo é o da consulta já pronta mais
+# o da montagem da figura. Como no dashboard, o Streamlit é importado e registra o seu template
+# como padrão do Plotly.
+#
+# Uso: python benchmarks/figuras.py [--repeticoes 20] [--saida benchmarks/figuras.json]
+
+REPETICOES = 20
+
+FILTROS_BENCHMARK = (
+    (pd.Timestamp('2024-03-10'), pd.Timestamp('2024-09-20')),
+    ['SUV', 'Sedan'],
+    ['Online', 'Showroom']
+)
+
+
+def _graficos(vendas, metas):
+    from utils import chart_factory
+
+    # Cada função sem o cache de gráficos (nem a medição por etapa), só a construção
+    def sem_cache(nome):
+        return inspect.unwrap(getattr(chart_factory, nome))
+
+    return {
+        'faturamento': lambda *filtros: sem_cache('create_faturamento_chart')(vendas, metas, *filtros),
+        'faturamento_diario': lambda *filtros: sem_cache('create_faturamento_chart')(vendas, metas, *filtros, 'dia'),
+        'margem': lambda *filtros: sem_cache('create_margem_chart')(vendas, *filtros),
+        'ticket': lambda *filtros: sem_cache('create_ticket_chart')(vendas, metas, *filtros),
+        'heatmap': lambda *filtros: sem_cache('create_heatmap')(vendas, *filtros),
+        'margem_canal': lambda *filtros: sem_cache('create_margem_canal_chart')(vendas, *filtros),
+        'ticket_categoria': lambda *filtros: sem_cache('create_ticket_categoria_chart')(vendas, *filtros),
+        'dispersao_hora': lambda *filtros: sem_cache('create_scatter_chart')(vendas, *filtros),
+        'dia_semana': lambda *filtros: sem_cache('create_line_chart')(vendas, *filtros)
+    }
+
+
+def measure_figures(repeticoes=REPETICOES, filtros=FILTROS_BENCHMARK):
+    """
+    Retorna, por gráfico, a mediana do tempo de construção (ms) e o tamanho em bytes do JSON de
+    cada figura retornada.
+    """
+    import streamlit  # noqa: F401 (registra o template do Streamlit como padrão, como no dashboard)
+    from utils.chart_factory import load_data
+    from utils.olap_cube import get_cube, get_daily_aggregates
+
+    vendas, metas, _ = load_data()
+    get_cube(vendas)
+    get_daily_aggregates(vendas)
+
+    resultados = {}
+    for nome, construir in _graficos(vendas, metas).items():
+        retorno = construir(*filtros)
+        figuras = [item for item in retorno if hasattr(item, 'to_plotly_json')]
+
+        tempos = []
+        for _ in range(repeticoes):
+            inicio = time.perf_counter()
+            construir(*filtros)
+            tempos.append(time.perf_counter() - inicio)
+
+        resultados[nome] = {
+            'construcao_ms': round(statistics.median(tempos) * 1000, 2),
+            'bytes_json': [len(pio.to_json(figura, validate=False)) for figura in figuras]
+        }
+
+    return resultados
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Mede o tempo de construção e o tamanho do JSON de cada gráfico.')
+    parser.add_argument('--repeticoes', type=int, default=REPETICOES)
+    parser.add_argument('--saida', help='Arquivo JSON de resultados (opcional)')
+    argumentos = parser.parse_args(argv)
+
+    saida = os.path.abspath(argumentos.saida) if argumentos.saida else None
+    os.chdir(RAIZ)
+
+    resultados = measure_figures(argumentos.repeticoes)
+
+    for nome, resultado in resultados.items():
+        print(f"{nome:<20} {resultado['construcao_ms']:>9.2f} ms  {sum(resultado['bytes_json']):>9} bytes")
+    print(f"{'total':<20} {sum(r['construcao_ms'] for r in resultados.values()):>9.2f} ms  "
+          f"{sum(sum(r['bytes_json']) for r in resultados.values()):>9} bytes")
+
+    if saida:
+        with open(saida, 'w', encoding='utf-8') as arquivo:
+            json.dump(resultados, arquivo, indent=2, ensure_ascii=False)
+        print(f'Resultados gravados em {saida}')
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
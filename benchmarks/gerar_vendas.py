@@ -0,0 +1,192 @@
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+# Gera um CSV sintético de vendas com o mesmo esquema de `data/vendas.csv`, em qualquer escala
+# (de milhares a dezenas de milhões de linhas), para medir o dashboard em volumes reais.
+#
+# O perfil vem dos dados do repositório:
+#   - vendas.csv: participação de cada modelo, categoria de cada modelo, canais por modelo, preço
+#     médio e dispersão por modelo, horários e dias da semana;
+#   - metas.csv: meses cobertos, sazonalidade (proporcional à meta de faturamento) e campanha de cada mês;
+#   - modelos.csv: razão custo/preço base por categoria (os nomes de modelo do catálogo não são os
+#     mesmos de vendas.csv, então ele não define os modelos gerados).
+#
+# A saída é determinística para a mesma semente e quantidade de linhas, e fica ordenada por data.
+#
+# Uso: python benchmarks/gerar_vendas.py 1000000 --saida benchmarks/dados/vendas_1000000.csv [--semente 42]
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+COLUNAS_VENDAS = ['id_venda', 'data_venda', 'modelo', 'categoria', 'preco_venda', 'custo', 'lucro', 'canal_venda', 'campanha']
+
+# Linhas aproximadas por bloco gerado; os blocos contêm sempre dias inteiros
+LINHAS_POR_BLOCO = 1_000_000
+
+# Limites da razão custo/preço sorteada (os extremos observados em vendas.csv)
+RAZAO_CUSTO_MIN = 0.6
+RAZAO_CUSTO_MAX = 0.95
+
+
+def build_profile(caminho_vendas=os.path.join(RAIZ, 'data', 'vendas.csv'),
+                  caminho_metas=os.path.join(RAIZ, 'data', 'metas.csv'),
+                  caminho_modelos=os.path.join(RAIZ, 'data', 'modelos.csv')):
+    """
+    Extrai dos CSVs do repositório as distribuições usadas pelo gerador.
+    """
+    vendas = pd.read_csv(caminho_vendas, parse_dates=['data_venda'])
+    metas = pd.read_csv(caminho_metas)
+    modelos = pd.read_csv(caminho_modelos)
+
+    por_modelo = vendas.groupby('modelo')
+    nomes_modelos = sorted(vendas['modelo'].unique())
+    canais = sorted(vendas['canal_venda'].unique())
+    categorias = por_modelo['categoria'].first()[nomes_modelos]
+
+    # Canais por modelo: probabilidades acumuladas para o sorteio vetorizado
+    canais_por_modelo = pd.crosstab(vendas['modelo'], vendas['canal_venda']).loc[nomes_modelos, canais]
+    canais_por_modelo = canais_por_modelo.div(canais_por_modelo.sum(axis=1), axis=0)
+
+    # Dias da semana: vendas por dia de calendário de cada dia da semana no intervalo
+    calendario = pd.date_range(vendas['data_venda'].min().normalize(), vendas['data_venda'].max().normalize())
+    dias_semana = vendas['data_venda'].dt.dayofweek.value_counts().sort_index()
+    dias_semana = dias_semana / pd.Series(calendario.dayofweek).value_counts().sort_index()
+
+    horas = vendas['data_venda'].dt.hour.value_counts(normalize=True).sort_index()
+
+    razao_custo = vendas['custo'] / vendas['preco_venda']
+    razao_base = (modelos['custo_base'] / modelos['preco_base']).groupby(modelos['categoria']).mean()
+
+    # Fração das vendas dos meses com campanha que pertencem à campanha
+    meses_campanha = vendas['data_venda'].dt.strftime('%Y-%m').isin(metas.loc[metas['campanhas_ativas'].notna(), 'periodo'])
+    fracao_campanha = vendas.loc[meses_campanha, 'campanha'].notna().mean()
+
+    return {
+        'modelos': np.array(nomes_modelos, dtype=object),
+        'categorias': categorias.to_numpy(dtype=object),
+        'pesos_modelos': por_modelo.size()[nomes_modelos].to_numpy() / len(vendas),
+        'preco_medio': por_modelo['preco_venda'].mean()[nomes_modelos].to_numpy(),
+        'preco_desvio_relativo': (por_modelo['preco_venda'].std() / por_modelo['preco_venda'].mean())[nomes_modelos].to_numpy(),
+        'canais': np.array(canais, dtype=object),
+        'canais_acumulados': canais_por_modelo.cumsum(axis=1).to_numpy(),
+        'razao_custo_media': razao_base.reindex(categorias).fillna(razao_custo.mean()).to_numpy(),
+        'razao_custo_desvio': razao_custo.groupby(vendas['categoria']).std().reindex(categorias).to_numpy(),
+        'horas': horas.index.to_numpy(),
+        'pesos_horas': horas.to_numpy(),
+        'pesos_dias_semana': (dias_semana / dias_semana.mean()).reindex(range(7), fill_value=0).to_numpy(),
+        'periodos': metas['periodo'].to_numpy(dtype=object),
+        'pesos_periodos': (metas['meta_faturamento'] / metas['meta_faturamento'].sum()).to_numpy(),
+        'campanhas': metas['campanhas_ativas'].to_numpy(dtype=object),
+        'fracao_campanha': float(fracao_campanha)
+    }
+
+
+def _vendas_por_dia(perfil, linhas, semente):
+    # Distribui as linhas entre os dias: peso do mês (meta) dividido pelos seus dias, vezes o peso do dia da semana
+    dias = pd.date_range(pd.Period(perfil['periodos'][0]).start_time, pd.Period(perfil['periodos'][-1]).end_time.normalize())
+    posicao_periodo = pd.Index(perfil['periodos']).get_indexer(dias.strftime('%Y-%m'))
+
+    pesos = perfil['pesos_periodos'][posicao_periodo] / dias.days_in_month.to_numpy() * perfil['pesos_dias_semana'][dias.dayofweek]
+    contagens = np.random.default_rng([semente, 0]).multinomial(linhas, pesos / pesos.sum())
+
+    return dias, posicao_periodo, contagens
+
+
+def _gerar_bloco(perfil, dias, posicao_periodo, contagens, primeiro_id, gerador):
+    n = int(contagens.sum())
+
+    # Horário: hora pelo perfil, minutos e segundos uniformes; ordenado dentro do bloco
+    hora = gerador.choice(perfil['horas'], n, p=perfil['pesos_horas'])
+    segundos = hora.astype('int64') * 3600 + gerador.integers(0, 3600, n)
+    data_venda = np.repeat(dias.to_numpy().astype('datetime64[s]'), contagens) + segundos.astype('timedelta64[s]')
+    data_venda.sort()
+
+    modelo = gerador.choice(len(perfil['modelos']), n, p=perfil['pesos_modelos'])
+    canal = (gerador.random(n)[:, None] > perfil['canais_acumulados'][modelo]).sum(axis=1)
+    canal = np.minimum(canal, len(perfil['canais']) - 1)
+
+    preco = perfil['preco_medio'][modelo] * (1 + perfil['preco_desvio_relativo'][modelo] * gerador.standard_normal(n))
+    razao = perfil['razao_custo_media'][modelo] + perfil['razao_custo_desvio'][modelo] * gerador.standard_normal(n)
+    preco = np.round(preco, 2)
+    custo = np.round(preco * np.clip(razao, RAZAO_CUSTO_MIN, RAZAO_CUSTO_MAX), 2)
+
+    campanha = np.repeat(perfil['campanhas'][posicao_periodo], contagens)
+    campanha[gerador.random(n) >= perfil['fracao_campanha']] = np.nan
+
+    return pd.DataFrame({
+        'id_venda': np.arange(primeiro_id, primeiro_id + n),
+        'data_venda': data_venda,
+        'modelo': perfil['modelos'][modelo],
+        'categoria': perfil['categorias'][modelo],
+        'preco_venda': preco,
+        'custo': custo,
+        'lucro': np.round(preco - custo, 2),
+        'canal_venda': perfil['canais'][canal],
+        'campanha': campanha
+    }, columns=COLUNAS_VENDAS)
+
+
+def generate_vendas(linhas, semente=42, linhas_por_bloco=LINHAS_POR_BLOCO, perfil=None):
+    """
+    Gera as vendas sintéticas em blocos de dias inteiros (DataFrames com as colunas de vendas.csv).
+
+    Cada bloco usa um gerador derivado da semente e do seu primeiro dia, então o resultado depende
+    só de `linhas`, `semente` e `linhas_por_bloco`.
+    """
+    perfil = perfil or build_profile()
+    dias, posicao_periodo, contagens = _vendas_por_dia(perfil, linhas, semente)
+    acumuladas = np.cumsum(contagens)
+
+    inicio = 0
+    while inicio < len(dias):
+        ja_geradas = int(acumuladas[inicio - 1]) if inicio else 0
+        fim = max(int(np.searchsorted(acumuladas, ja_geradas + linhas_por_bloco, side='right')), inicio + 1)
+        fim = min(fim, len(dias))
+
+        gerador = np.random.default_rng([semente, inicio + 1])
+        yield _gerar_bloco(
+            perfil, dias[inicio:fim], posicao_periodo[inicio:fim], contagens[inicio:fim], ja_geradas + 1, gerador
+        )
+        inicio = fim
+
+
+def write_vendas_csv(caminho, linhas, semente=42, linhas_por_bloco=LINHAS_POR_BLOCO, perfil=None):
+    """
+    Grava as vendas sintéticas em `caminho` (via arquivo temporário) e retorna o tamanho em bytes.
+    """
+    diretorio = os.path.dirname(caminho)
+    if diretorio:
+        os.makedirs(diretorio, exist_ok=True)
+
+    temporario = caminho + '.tmp'
+    with open(temporario, 'w', encoding='utf-8', newline='') as arquivo:
+        arquivo.write(','.join(COLUNAS_VENDAS) + '\n')
+        for bloco in generate_vendas(linhas, semente, linhas_por_bloco, perfil):
+            bloco.to_csv(arquivo, header=False, index=False, date_format='%Y-%m-%d %H:%M:%S')
+
+    os.replace(temporario, caminho)
+    return os.path.getsize(caminho)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Gera um CSV sintético de vendas no esquema de data/vendas.csv.')
+    parser.add_argument('linhas', type=int, help='Quantidade de vendas a gerar')
+    parser.add_argument('--saida', help='CSV de saída (padrão: benchmarks/dados/vendas_<linhas>.csv)')
+    parser.add_argument('--semente', type=int, default=42)
+    argumentos = parser.parse_args(argv)
+
+    caminho = argumentos.saida or os.path.join(RAIZ, 'benchmarks', 'dados', f'vendas_{argumentos.linhas}.csv')
+
+    inicio = time.perf_counter()
+    tamanho = write_vendas_csv(caminho, argumentos.linhas, argumentos.semente)
+    print(f'{argumentos.linhas} vendas gravadas em {caminho} ({tamanho / 1e6:.1f} MB, {time.perf_counter() - inicio:.1f}s)')
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
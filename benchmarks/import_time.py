@@ -0,0 +1,89 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+# Mede, em processos novos, o tempo de importação do núcleo analítico usado por scripts e workers
+# (carga, filtros, cubo e insights) e confere que ele não arrasta a interface nem os exportadores.
+#
+# Uso: python benchmarks/import_time.py [--repeticoes 5] [--orcamento 0.25] [--orcamento-total 2.0]
+
+MODULOS_NUCLEO = ['utils.data_loader', 'utils.filter_engine', 'utils.olap_cube', 'utils.result_cache',
+                  'utils.sql_backend', 'utils.star_schema', 'utils.bitmap_index', 'utils.single_flight',
+                  'utils.ai_insights']
+
+# Módulos que o núcleo não pode importar
+MODULOS_PROIBIDOS = ['streamlit', 'plotly', 'pptx', 'fpdf']
+
+# Orçamentos em segundos: importação do núcleo além de pandas/numpy, e total a partir do zero
+ORCAMENTO_NUCLEO_S = 0.25
+ORCAMENTO_TOTAL_S = 2.0
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CODIGO_MEDICAO = '''
+import json, sys, time
+inicio = time.perf_counter()
+import numpy, pandas
+meio = time.perf_counter()
+for modulo in {modulos!r}:
+    __import__(modulo)
+fim = time.perf_counter()
+print(json.dumps({{
+    'total': fim - inicio,
+    'nucleo': fim - meio,
+    'proibidos': sorted({{nome.split('.')[0] for nome in sys.modules}} & set({proibidos!r}))
+}}))
+'''
+
+
+def measure_import(repeticoes=5):
+    """
+    Importa o núcleo em `repeticoes` processos novos e retorna as medianas dos tempos e os módulos proibidos carregados.
+    """
+    codigo = CODIGO_MEDICAO.format(modulos=MODULOS_NUCLEO, proibidos=MODULOS_PROIBIDOS)
+    medicoes = []
+
+    for _ in range(repeticoes):
+        saida = subprocess.run(
+            [sys.executable, '-c', codigo], cwd=RAIZ, capture_output=True, text=True, check=True
+        ).stdout
+        medicoes.append(json.loads(saida))
+
+    return {
+        'total': statistics.median(medicao['total'] for medicao in medicoes),
+        'nucleo': statistics.median(medicao['nucleo'] for medicao in medicoes),
+        'proibidos': sorted({nome for medicao in medicoes for nome in medicao['proibidos']})
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Mede o tempo de importação do núcleo analítico.')
+    parser.add_argument('--repeticoes', type=int, default=5)
+    parser.add_argument('--orcamento', type=float, default=ORCAMENTO_NUCLEO_S, help='Segundos além de pandas/numpy')
+    parser.add_argument('--orcamento-total', type=float, default=ORCAMENTO_TOTAL_S, help='Segundos a partir do zero')
+    argumentos = parser.parse_args(argv)
+
+    resultado = measure_import(argumentos.repeticoes)
+
+    print(f"Núcleo: {resultado['nucleo'] * 1000:.1f} ms (orçamento {argumentos.orcamento * 1000:.0f} ms)")
+    print(f"Total com pandas/numpy: {resultado['total'] * 1000:.1f} ms (orçamento {argumentos.orcamento_total * 1000:.0f} ms)")
+
+    falhas = []
+    if resultado['nucleo'] > argumentos.orcamento:
+        falhas.append('importação do núcleo acima do orçamento')
+    if resultado['total'] > argumentos.orcamento_total:
+        falhas.append('importação total acima do orçamento')
+    if resultado['proibidos']:
+        falhas.append(f"o núcleo importou {', '.join(resultado['proibidos'])}")
+
+    for falha in falhas:
+        print(f'FALHA: {falha}')
+
+    return 1 if falhas else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,246 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if RAIZ not in sys.path:
+    sys.path.insert(0, RAIZ)
+
+# As medições são das agregações e insights calculados, não dos acertos no cache de resultados em disco
+os.environ.setdefault('DASHBOARD_CACHE_RESULTADOS_MB', '0')
+
+import numpy as np
+import pandas as pd
+
+from gerar_vendas import build_profile, write_vendas_csv
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# Mede cada etapa do pipeline do dashboard (carga, pré-agregados, gráficos e insights) sobre vendas
+# sintéticas em várias escalas e grava tempos e picos de memória em um arquivo JSON de referência.
+#
+# Cada escala roda em processos novos: um para os tempos e outro, com tracemalloc, para a memória
+# (o rastreamento deixaria os tempos mais lentos). Escalas acima de --max-linhas-memoria, que não
+# cabem na memória como tabela, medem só a leitura em blocos (DASHBOARD_STREAMING).
+#
+# Uso: python benchmarks/pipeline.py [--escalas 10000 100000 1000000] [--saida benchmarks/baseline.json]
+
+ESCALAS = [10_000, 100_000, 1_000_000, 10_000_000, 50_000_000]
+
+# Maior escala carregada inteira em memória; acima dela só o modo streaming é medido
+MAX_LINHAS_MEMORIA = 10_000_000
+
+DIRETORIO_DADOS = os.path.join(RAIZ, 'benchmarks', 'dados')
+CAMINHO_BASELINE = os.path.join(RAIZ, 'benchmarks', 'baseline.json')
+
+# Filtros das etapas filtradas: datas no meio dos meses, duas categorias e dois canais
+FILTROS_BENCHMARK = (
+    (pd.Timestamp('2024-03-10'), pd.Timestamp('2024-09-20')),
+    ['SUV', 'Sedan'],
+    ['Online', 'Showroom']
+)
+
+
+def _gerar_graficos(vendas, metas, filtros):
+    from utils.chart_factory import (
+        create_faturamento_chart, create_heatmap, create_line_chart, create_margem_canal_chart,
+        create_margem_chart, create_scatter_chart, create_ticket_categoria_chart, create_ticket_chart
+    )
+
+    create_faturamento_chart(vendas, metas, *filtros)
+    create_margem_chart(vendas, *filtros)
+    create_ticket_chart(vendas, metas, *filtros)
+    create_heatmap(vendas, *filtros)
+    create_margem_canal_chart(vendas, *filtros)
+    create_ticket_categoria_chart(vendas, *filtros)
+    create_scatter_chart(vendas, *filtros)
+    create_line_chart(vendas, *filtros)
+
+
+def run_pipeline(caminho, modo_streaming, medir_memoria):
+    """
+    Executa as etapas do pipeline em sequência sobre o CSV `caminho`; roda nos processos de trabalho.
+
+    Retorna, por etapa, os segundos gastos ou o pico de memória alocada (MB) e o erro, se houver.
+    """
+    from utils.ai_insights import generate_advanced_insights
+    from utils.chart_factory import load_data
+    from utils.data_loader import clear_vendas_cache
+    from utils.olap_cube import get_cube, get_daily_aggregates
+
+    estado = {}
+
+    def carregar():
+        estado['vendas'], estado['metas'], estado['modelos'] = load_data(modo_streaming, caminho)
+
+    def etapas():
+        if modo_streaming:
+            yield 'load_data_streaming', carregar
+        else:
+            clear_vendas_cache(caminho)
+            yield 'load_data_csv', carregar
+            yield 'load_data_cache', carregar
+            yield 'cubo', lambda: get_cube(estado['vendas'])
+            yield 'agregados_diarios', lambda: get_daily_aggregates(estado['vendas'])
+
+        yield 'graficos', lambda: _gerar_graficos(estado['vendas'], estado['metas'], (None, None, None))
+        yield 'graficos_filtrados', lambda: _gerar_graficos(estado['vendas'], estado['metas'], FILTROS_BENCHMARK)
+        yield 'insights', lambda: generate_advanced_insights(estado['vendas'], estado['metas'], estado['modelos'])
+        yield 'insights_filtrados', lambda: generate_advanced_insights(
+            estado['vendas'], estado['metas'], estado['modelos'], *FILTROS_BENCHMARK
+        )
+
+    if medir_memoria:
+        tracemalloc.start()
+
+    resultados = []
+    try:
+        for nome, etapa in etapas():
+            if medir_memoria:
+                tracemalloc.reset_peak()
+                base = tracemalloc.get_traced_memory()[0]
+
+            inicio = time.perf_counter()
+            try:
+                etapa()
+                erro = None
+            except Exception as excecao:
+                erro = f'{type(excecao).__name__}: {excecao}'
+            segundos = time.perf_counter() - inicio
+
+            resultado = {'etapa': nome, 'erro': erro}
+            if medir_memoria:
+                resultado['pico_memoria_mb'] = round((tracemalloc.get_traced_memory()[1] - base) / 1e6, 2)
+            else:
+                resultado['segundos'] = round(segundos, 4)
+            resultados.append(resultado)
+    finally:
+        if medir_memoria:
+            tracemalloc.stop()
+        if not modo_streaming:
+            clear_vendas_cache(caminho)
+
+    # Pico de memória residente do processo inteiro (Linux: KB)
+    rss_pico_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024 if resource else None
+
+    return resultados, rss_pico_mb
+
+
+def _medir(caminho, modo_streaming):
+    # Cada medição em um processo novo, para não herdar caches nem memória das anteriores
+    etapas = {}
+    rss_pico_mb = None
+
+    for medir_memoria in (False, True):
+        with ProcessPoolExecutor(max_workers=1, mp_context=get_context('spawn')) as executor:
+            try:
+                resultados, rss = executor.submit(run_pipeline, caminho, modo_streaming, medir_memoria).result()
+            except Exception as excecao:
+                return {'erro': f'{type(excecao).__name__}: {excecao}'}
+
+        if not medir_memoria:
+            rss_pico_mb = rss
+        for resultado in resultados:
+            etapa = etapas.setdefault(resultado['etapa'], {'erro': None})
+            etapa.update({chave: valor for chave, valor in resultado.items() if chave != 'etapa' and valor is not None})
+
+    return {'rss_pico_mb': round(rss_pico_mb, 1) if rss_pico_mb else None, 'etapas': etapas}
+
+
+def _ambiente():
+    try:
+        import pyarrow
+        versao_pyarrow = pyarrow.__version__
+    except ImportError:
+        versao_pyarrow = None
+
+    return {
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'pyarrow': versao_pyarrow,
+        'plataforma': platform.platform(),
+        'cpus': os.cpu_count()
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Mede tempo e memória de cada etapa do dashboard em várias escalas.')
+    parser.add_argument('--escalas', type=int, nargs='+', default=ESCALAS, help='Quantidades de vendas a medir')
+    parser.add_argument('--semente', type=int, default=42)
+    parser.add_argument('--dados', default=DIRETORIO_DADOS, help='Diretório dos CSVs sintéticos (reaproveitados entre execuções)')
+    parser.add_argument('--saida', default=CAMINHO_BASELINE, help='Arquivo JSON de resultados')
+    parser.add_argument('--max-linhas-memoria', type=int, default=MAX_LINHAS_MEMORIA)
+    argumentos = parser.parse_args(argv)
+
+    # Os caminhos do dashboard (data/...) são relativos à raiz do repositório
+    argumentos.dados, argumentos.saida = os.path.abspath(argumentos.dados), os.path.abspath(argumentos.saida)
+    os.chdir(RAIZ)
+    perfil = None
+    escalas = []
+
+    for linhas in sorted(argumentos.escalas):
+        caminho = os.path.join(argumentos.dados, f'vendas_{linhas}_s{argumentos.semente}.csv')
+        segundos_geracao = None
+
+        if not os.path.exists(caminho):
+            perfil = perfil or build_profile()
+            inicio = time.perf_counter()
+            write_vendas_csv(caminho, linhas, argumentos.semente, perfil=perfil)
+            segundos_geracao = round(time.perf_counter() - inicio, 2)
+
+        escala = {
+            'linhas': linhas,
+            'bytes_csv': os.path.getsize(caminho),
+            'segundos_geracao': segundos_geracao,
+            'em_memoria': (
+                _medir(caminho, False) if linhas <= argumentos.max_linhas_memoria
+                else {'ignorado': f'acima de {argumentos.max_linhas_memoria} linhas'}
+            ),
+            'streaming': _medir(caminho, True)
+        }
+        escalas.append(escala)
+
+        for modo in ('em_memoria', 'streaming'):
+            for nome, etapa in escala[modo].get('etapas', {}).items():
+                print(f"{linhas:>11} {modo:<10} {nome:<20} {etapa.get('segundos', float('nan')):>9.3f}s "
+                      f"{etapa.get('pico_memoria_mb', float('nan')):>9.1f} MB" + (f"  {etapa['erro']}" if etapa['erro'] else ''))
+            if 'erro' in escala[modo] or 'ignorado' in escala[modo]:
+                print(f"{linhas:>11} {modo:<10} {escala[modo].get('erro') or escala[modo]['ignorado']}")
+
+    resultado = {
+        'gerado_em': pd.Timestamp.now().isoformat(timespec='seconds'),
+        'semente': argumentos.semente,
+        'ambiente': _ambiente(),
+        'filtros': [[str(data) for data in FILTROS_BENCHMARK[0]], FILTROS_BENCHMARK[1], FILTROS_BENCHMARK[2]],
+        'escalas': escalas
+    }
+
+    diretorio = os.path.dirname(argumentos.saida)
+    if diretorio:
+        os.makedirs(diretorio, exist_ok=True)
+    with open(argumentos.saida, 'w', encoding='utf-8') as arquivo:
+        json.dump(resultado, arquivo, indent=2, ensure_ascii=False)
+
+    print(f'Resultados gravados em {argumentos.saida}')
+
+    falhas = sum(
+        bool(etapa['erro'])
+        for escala in escalas for modo in ('em_memoria', 'streaming')
+        for etapa in escala[modo].get('etapas', {}).values()
+    ) + sum('erro' in escala[modo] for escala in escalas for modo in ('em_memoria', 'streaming'))
+
+    return 1 if falhas else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,140 @@
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from utils.ai_insights import generate_advanced_insights
+from utils.data_loader import load_vendas
+from utils.export_jobs import FORMATOS_EXPORTACAO
+from utils.filter_engine import normalize_filters
+from utils.olap_cube import get_cube, get_daily_aggregates
+
+# Gera em lote os relatórios PDF/PowerPoint de uma lista de conjuntos de filtros, sem a interface.
+#
+# O arquivo de entrada é uma lista JSON de conjuntos de filtros (campos opcionais, ausentes = todos):
+#
+#   [
+#     {"nome": "suv_online_1s", "periodo": ["2024-01-01", "2024-06-30"],
+#      "categorias": ["SUV"], "canais": ["Online"]},
+#     {"nome": "geral"}
+#   ]
+#
+# Uso: python gerar_relatorios.py filtros.json --saida relatorios --formatos pdf pptx --processos 4
+
+
+def parse_filter_set(conjunto, posicao):
+    """
+    Converte um conjunto de filtros do arquivo de entrada em (nome, filtro_periodo, filtro_categorias, filtro_canais).
+    """
+    nome = conjunto.get('nome') or f'relatorio_{posicao + 1:03d}'
+    periodo = conjunto.get('periodo')
+    filtro_periodo = (pd.Timestamp(periodo[0]), pd.Timestamp(periodo[1])) if periodo else None
+
+    # O nome vira nome de arquivo
+    nome = re.sub(r'[^\w.-]+', '_', nome)
+
+    return nome, filtro_periodo, conjunto.get('categorias') or None, conjunto.get('canais') or None
+
+
+def render_report(formato, insights_data, filtros, caminho):
+    """
+    Gera um relatório e o grava em `caminho`; roda nos processos de trabalho.
+
+    Retorna o tempo gasto em segundos e a mensagem de erro (None em caso de sucesso).
+    """
+    inicio = time.perf_counter()
+
+    try:
+        buffer = FORMATOS_EXPORTACAO[formato][0](None, None, insights_data, *filtros)
+        with open(caminho, 'wb') as arquivo:
+            arquivo.write(buffer.getvalue())
+        erro = None
+    except Exception as excecao:
+        erro = f'{type(excecao).__name__}: {excecao}'
+
+    return time.perf_counter() - inicio, erro
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Gera em lote os relatórios do dashboard para vários conjuntos de filtros.')
+    parser.add_argument('filtros', help='Arquivo JSON com a lista de conjuntos de filtros')
+    parser.add_argument('--saida', default='relatorios', help='Diretório de saída (padrão: relatorios)')
+    parser.add_argument('--formatos', nargs='+', choices=sorted(FORMATOS_EXPORTACAO), default=sorted(FORMATOS_EXPORTACAO))
+    parser.add_argument('--processos', type=int, default=os.cpu_count(), help='Processos de renderização')
+    argumentos = parser.parse_args(argv)
+
+    with open(argumentos.filtros, encoding='utf-8') as arquivo:
+        conjuntos = [parse_filter_set(conjunto, posicao) for posicao, conjunto in enumerate(json.load(arquivo))]
+
+    os.makedirs(argumentos.saida, exist_ok=True)
+    inicio_total = time.perf_counter()
+
+    # Base pré-agregada compartilhada por todos os conjuntos de filtros
+    inicio = time.perf_counter()
+    vendas = load_vendas()
+    get_cube(vendas)
+    get_daily_aggregates(vendas)
+    metas = pd.read_csv('data/metas.csv')
+    modelos = pd.read_csv('data/modelos.csv')
+    segundos_carga = time.perf_counter() - inicio
+
+    relatorios = []
+    with ProcessPoolExecutor(max_workers=argumentos.processos) as executor:
+        for nome, filtro_periodo, filtro_categorias, filtro_canais in conjuntos:
+            inicio = time.perf_counter()
+            insights_data = generate_advanced_insights(vendas, metas, modelos, filtro_periodo, filtro_categorias, filtro_canais)
+            filtros = normalize_filters(filtro_periodo, filtro_categorias, filtro_canais)
+
+            relatorio = {
+                'nome': nome,
+                'filtros': {
+                    'periodo': [str(data) for data in filtros[0]] if filtros[0] else None,
+                    'categorias': list(filtros[1]) if filtros[1] else None,
+                    'canais': list(filtros[2]) if filtros[2] else None
+                },
+                'segundos_insights': round(time.perf_counter() - inicio, 4),
+                'arquivos': {}
+            }
+
+            for formato in argumentos.formatos:
+                caminho = os.path.join(argumentos.saida, f'{nome}.{FORMATOS_EXPORTACAO[formato][1]}')
+                futuro = executor.submit(render_report, formato, insights_data, filtros, caminho)
+                relatorio['arquivos'][formato] = (caminho, futuro)
+
+            relatorios.append(relatorio)
+
+        falhas = 0
+        for relatorio in relatorios:
+            for formato, (caminho, futuro) in relatorio['arquivos'].items():
+                segundos, erro = futuro.result()
+                falhas += erro is not None
+                relatorio['arquivos'][formato] = {
+                    'arquivo': os.path.basename(caminho) if erro is None else None,
+                    'segundos': round(segundos, 4),
+                    'erro': erro
+                }
+
+    manifesto = {
+        'gerado_em': pd.Timestamp.now().isoformat(timespec='seconds'),
+        'processos': argumentos.processos,
+        'segundos_carga': round(segundos_carga, 4),
+        'segundos_total': round(time.perf_counter() - inicio_total, 4),
+        'falhas': falhas,
+        'relatorios': relatorios
+    }
+    with open(os.path.join(argumentos.saida, 'manifesto.json'), 'w', encoding='utf-8') as arquivo:
+        json.dump(manifesto, arquivo, indent=2, ensure_ascii=False)
+
+    print(f"{len(relatorios)} conjuntos de filtros, {falhas} falha(s) em {manifesto['segundos_total']:.1f}s; "
+          f"manifesto em {os.path.join(argumentos.saida, 'manifesto.json')}")
+
+    return 1 if falhas else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
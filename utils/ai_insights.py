@@ -1,26 +1,26 @@
-import pandas as pd
 import numpy as np
-import plotly.express as px
-import plotly.graph_objects as go
-from datetime import datetime, timedelta
-import random
-import re
 
+from utils.olap_cube import NOMES_DIAS_SEMANA, rollup_marginals, rollup_vendas
+from utils.profiler import profiled
+from utils.result_cache import cache_result
+from utils.star_schema import get_star_schema, period_targets
+
+@profiled('insights')
+@cache_result
 def generate_advanced_insights(vendas, metas, modelos, filtro_periodo=None, filtro_categorias=None, filtro_canais=None):
     """
     Gera insights avançados com base nos dados de vendas, metas e modelos.
     """
-    # Filtrar dados
-    df_filtrado = vendas.copy()
-    if filtro_periodo:
-        data_inicio, data_fim = filtro_periodo
-        df_filtrado = df_filtrado[(df_filtrado['data_venda'] >= data_inicio) & (df_filtrado['data_venda'] <= data_fim)]
-    
-    if filtro_categorias:
-        df_filtrado = df_filtrado[df_filtrado['categoria'].isin(filtro_categorias)]
-    
-    if filtro_canais:
-        df_filtrado = df_filtrado[df_filtrado['canal_venda'].isin(filtro_canais)]
+    # Agregar por categoria, canal, modelo, período, dia da semana e hora em uma única passada
+    # sobre os pré-agregados (a categoria também fornece os totais do resumo geral)
+    marginais = rollup_marginals(
+        vendas,
+        ['categoria', 'canal_venda', 'modelo', 'periodo', 'dia_semana', 'hora'],
+        filtro_periodo,
+        filtro_categorias,
+        filtro_canais
+    )
+    categoria_stats = marginais['categoria'][['categoria', 'id_venda', 'preco_venda', 'lucro']]
     
     # Estrutura de dados para insights
     insights_data = {
@@ -35,15 +35,13 @@ def generate_advanced_insights(vendas, metas, modelos, filtro_periodo=None, filt
     }
     
     # Resumo geral
-    insights_data['resumo_geral']['faturamento_total'] = df_filtrado['preco_venda'].sum()
-    insights_data['resumo_geral']['total_vendas'] = len(df_filtrado)
-    insights_data['resumo_geral']['lucro_total'] = df_filtrado['lucro'].sum()
+    insights_data['resumo_geral']['faturamento_total'] = categoria_stats['preco_venda'].sum()
+    insights_data['resumo_geral']['total_vendas'] = int(categoria_stats['id_venda'].sum())
+    insights_data['resumo_geral']['lucro_total'] = categoria_stats['lucro'].sum()
     insights_data['resumo_geral']['margem_media'] = (insights_data['resumo_geral']['lucro_total'] / insights_data['resumo_geral']['faturamento_total']) * 100 if insights_data['resumo_geral']['faturamento_total'] > 0 else 0
     
     # Tendência de crescimento (últimos 3 períodos)
-    faturamento_periodo = df_filtrado.groupby('periodo').agg({
-        'preco_venda': 'sum'
-    }).reset_index()
+    faturamento_periodo = marginais['periodo'][['periodo', 'preco_venda']]
     
     if len(faturamento_periodo) >= 3:
         ultimos_periodos = faturamento_periodo.tail(3)
@@ -52,12 +50,6 @@ def generate_advanced_insights(vendas, metas, modelos, filtro_periodo=None, filt
         insights_data['resumo_geral']['tendencia_crescimento'] = None
     
     # Análise por categoria
-    categoria_stats = df_filtrado.groupby('categoria').agg({
-        'id_venda': 'count',
-        'preco_venda': 'sum',
-        'lucro': 'sum'
-    }).reset_index()
-    
     categoria_stats['margem'] = (categoria_stats['lucro'] / categoria_stats['preco_venda']) * 100
     
     if not categoria_stats.empty:
@@ -78,11 +70,7 @@ def generate_advanced_insights(vendas, metas, modelos, filtro_periodo=None, filt
         insights_data['categorias']['menor_margem'] = None
     
     # Análise por canal
-    canal_stats = df_filtrado.groupby('canal_venda').agg({
-        'id_venda': 'count',
-        'preco_venda': 'sum',
-        'lucro': 'sum'
-    }).reset_index()
+    canal_stats = marginais['canal_venda'][['canal_venda', 'id_venda', 'preco_venda', 'lucro']]
     
     canal_stats['margem'] = (canal_stats['lucro'] / canal_stats['preco_venda']) * 100
     
@@ -104,11 +92,7 @@ def generate_advanced_insights(vendas, metas, modelos, filtro_periodo=None, filt
         insights_data['canais']['menor_margem'] = None
     
     # Análise por modelo
-    modelo_stats = df_filtrado.groupby('modelo').agg({
-        'id_venda': 'count',
-        'preco_venda': 'sum',
-        'lucro': 'sum'
-    }).reset_index()
+    modelo_stats = marginais['modelo'][['modelo', 'id_venda', 'preco_venda', 'lucro']]
     
     modelo_stats['margem'] = (modelo_stats['lucro'] / modelo_stats['preco_venda']) * 100
     modelo_stats['ticket_medio'] = modelo_stats['preco_venda'] / modelo_stats['id_venda']
@@ -131,11 +115,7 @@ def generate_advanced_insights(vendas, metas, modelos, filtro_periodo=None, filt
         insights_data['modelos']['maior_ticket'] = None
     
     # Análise por período
-    periodo_stats = df_filtrado.groupby('periodo').agg({
-        'id_venda': 'count',
-        'preco_venda': 'sum',
-        'lucro': 'sum'
-    }).reset_index()
+    periodo_stats = marginais['periodo'][['periodo', 'id_venda', 'preco_venda', 'lucro']]
     
     periodo_stats['margem'] = (periodo_stats['lucro'] / periodo_stats['preco_venda']) * 100
     
@@ -156,24 +136,12 @@ def generate_advanced_insights(vendas, metas, modelos, filtro_periodo=None, filt
         insights_data['periodos']['melhor_faturamento'] = None
         insights_data['periodos']['pior_faturamento'] = None
     
-    # Análise de metas
-    metas_filtradas = metas.copy()
-    if filtro_periodo:
-        data_inicio, data_fim = filtro_periodo
-        # Converter datas para strings no formato 'YYYY-MM' para comparar com o período
-        data_inicio_str = data_inicio.strftime('%Y-%m')
-        data_fim_str = data_fim.strftime('%Y-%m')
-        # Filtrar metas por período
-        metas_filtradas = metas_filtradas[(metas_filtradas['periodo'] >= data_inicio_str) & (metas_filtradas['periodo'] <= data_fim_str)]
-    
-    # Juntar metas com faturamento
-    if not periodo_stats.empty and not metas_filtradas.empty:
-        metas_periodo = metas_filtradas.groupby('periodo').agg({
-            'meta_faturamento': 'sum'
-        }).reset_index()
-        
-        # Juntar com faturamento
-        metas_faturamento = pd.merge(periodo_stats, metas_periodo, on='periodo', how='left')
+    # Análise de metas: a meta de cada período vem da dimensão de período do modelo estrela, pela
+    # chave inteira (os períodos de `periodo_stats` já estão dentro do filtro)
+    metas_faturamento = periodo_stats.copy()
+    metas_faturamento['meta_faturamento'] = period_targets(get_star_schema(vendas, metas), periodo_stats['periodo'])['meta_faturamento'].to_numpy()
+    
+    if metas_faturamento['meta_faturamento'].notna().any():
         metas_faturamento['atingimento'] = (metas_faturamento['preco_venda'] / metas_faturamento['meta_faturamento']) * 100
         
         # Atingimento médio
@@ -213,28 +181,11 @@ def generate_advanced_insights(vendas, metas, modelos, filtro_periodo=None, filt
         insights_data['tendencias']['volume'] = None
         insights_data['tendencias']['margem'] = None
     
-    # Análise por dia da semana
-    df_filtrado['dia_semana'] = df_filtrado['data_venda'].dt.dayofweek
-    df_filtrado['dia_semana_nome'] = df_filtrado['data_venda'].dt.day_name()
-    
-    # Mapeamento para nomes em português
-    mapa_dias = {
-        'Monday': 'Segunda-feira',
-        'Tuesday': 'Terça-feira',
-        'Wednesday': 'Quarta-feira',
-        'Thursday': 'Quinta-feira',
-        'Friday': 'Sexta-feira',
-        'Saturday': 'Sábado',
-        'Sunday': 'Domingo'
-    }
-    
-    df_filtrado['dia_semana_nome'] = df_filtrado['dia_semana_nome'].map(mapa_dias)
-    
-    dia_stats = df_filtrado.groupby('dia_semana_nome').agg({
-        'id_venda': 'count',
-        'preco_venda': 'sum',
-        'lucro': 'sum'
-    }).reset_index()
+    # Análise por dia da semana (nomes em português, em ordem alfabética)
+    dia_stats = marginais['dia_semana']
+    dia_stats['dia_semana_nome'] = dia_stats['dia_semana'].map(dict(enumerate(NOMES_DIAS_SEMANA)))
+    dia_stats = dia_stats.sort_values('dia_semana_nome').reset_index(drop=True)
+    dia_stats = dia_stats[['dia_semana_nome', 'id_venda', 'preco_venda', 'lucro']]
     
     if not dia_stats.empty:
         # Dia com maior volume
@@ -249,11 +200,7 @@ def generate_advanced_insights(vendas, metas, modelos, filtro_periodo=None, filt
         insights_data['tendencias']['dia_menor_volume'] = None
     
     # Análise por hora
-    hora_stats = df_filtrado.groupby('hora').agg({
-        'id_venda': 'count',
-        'preco_venda': 'sum',
-        'lucro': 'sum'
-    }).reset_index()
+    hora_stats = marginais['hora'][['hora', 'id_venda', 'preco_venda', 'lucro']]
     
     if not hora_stats.empty:
         # Hora com maior volume
@@ -269,6 +216,7 @@ def generate_advanced_insights(vendas, metas, modelos, filtro_periodo=None, filt
     
     return insights_data
 
+@profiled('insights')
 def generate_narrative(insights_data):
     """
     Gera uma narrativa em linguagem natural com base nos insights.
@@ -406,29 +354,20 @@ def generate_narrative(insights_data):
     
     return narrativa
 
+@profiled('insights')
 def generate_ticket_insights(vendas, filtro_periodo=None, filtro_categorias=None, filtro_canais=None):
     """
     Gera insights específicos sobre o ticket médio.
     """
-    # Aplicar filtros se fornecidos
-    df = vendas.copy()
-    if filtro_periodo:
-        data_inicio, data_fim = filtro_periodo
-        df = df[(df['data_venda'] >= data_inicio) & (df['data_venda'] <= data_fim)]
-    
-    if filtro_categorias:
-        df = df[df['categoria'].isin(filtro_categorias)]
-    
-    if filtro_canais:
-        df = df[df['canal_venda'].isin(filtro_canais)]
+    # Calcular ticket médio por período a partir dos pré-agregados, já com os filtros aplicados
+    ticket_periodo = rollup_vendas(vendas, ['periodo'], filtro_periodo, filtro_categorias, filtro_canais)
     
     # Calcular ticket médio atual
-    ticket_medio_atual = df['preco_venda'].mean()
+    quantidade_total = ticket_periodo['id_venda'].sum()
+    ticket_medio_atual = ticket_periodo['preco_venda'].sum() / quantidade_total if quantidade_total > 0 else np.nan
     
-    # Calcular ticket médio por período
-    ticket_periodo = df.groupby('periodo').agg({
-        'preco_venda': 'mean'
-    }).reset_index()
+    ticket_periodo['preco_venda'] = ticket_periodo['preco_venda'] / ticket_periodo['id_venda']
+    ticket_periodo = ticket_periodo[['periodo', 'preco_venda']]
     
     ticket_periodo.columns = ['periodo', 'ticket_medio']
     
@@ -442,9 +381,9 @@ def generate_ticket_insights(vendas, filtro_periodo=None, filtro_categorias=None
         variacao_percentual = 0
     
     # Calcular ticket médio por categoria
-    ticket_categoria = df.groupby('categoria').agg({
-        'preco_venda': 'mean'
-    }).reset_index()
+    ticket_categoria = rollup_vendas(vendas, ['categoria'], filtro_periodo, filtro_categorias, filtro_canais)
+    ticket_categoria['preco_venda'] = ticket_categoria['preco_venda'] / ticket_categoria['id_venda']
+    ticket_categoria = ticket_categoria[['categoria', 'preco_venda']]
     
     ticket_categoria.columns = ['categoria', 'ticket_medio']
     
@@ -480,6 +419,7 @@ def generate_ticket_insights(vendas, filtro_periodo=None, filtro_categorias=None
     
     return insights
 
+@profiled('insights')
 def generate_strategic_recommendations(insights_data):
     """
     Gera recomendações estratégicas com base nos insights.
@@ -0,0 +1,160 @@
+import threading
+import weakref
+
+import numpy as np
+import pandas as pd
+
+# Índices bitmap das vendas: para cada valor de `categoria`, `canal_venda`, `modelo` e `campanha`,
+# um vetor de bits empacotado (1 bit por linha, `np.packbits`) marcando as linhas com esse valor.
+# Filtros de várias escolhas viram OR dos bitmaps dos valores e AND entre colunas, sobre n/8 bytes,
+# e a quantidade de linhas selecionadas sai da contagem de bits, sem comparar textos linha a linha.
+
+COLUNAS_BITMAP = ['categoria', 'canal_venda', 'modelo', 'campanha']
+
+# id do DataFrame -> (referência fraca, índice)
+_indices = {}
+_lock = threading.Lock()
+
+
+def _codificar(coluna):
+    # Códigos inteiros (-1 para nulos) e os valores correspondentes a cada código
+    if isinstance(coluna.dtype, pd.CategoricalDtype):
+        return coluna.cat.codes.to_numpy(), coluna.cat.categories
+    return pd.factorize(coluna, sort=True)
+
+
+def build_bitmap_index(vendas, colunas=COLUNAS_BITMAP):
+    """
+    Monta os bitmaps de cada valor das `colunas` de `vendas`.
+
+    Retorna um dicionário com `linhas` (quantidade de linhas) e, por coluna, `codigos` (valor ->
+    linha da matriz) e `bitmaps` (matriz uint8 com uma linha de bits empacotados por valor).
+    """
+    indice = {'linhas': len(vendas)}
+
+    for coluna in colunas:
+        codigos, valores = _codificar(vendas[coluna])
+        bitmaps = np.empty((len(valores), (len(vendas) + 7) // 8), dtype=np.uint8)
+        for codigo in range(len(valores)):
+            bitmaps[codigo] = np.packbits(codigos == codigo)
+        indice[coluna] = {'codigos': {valor: codigo for codigo, valor in enumerate(valores)}, 'bitmaps': bitmaps}
+
+    return indice
+
+
+def _descartar_indice(id_frame):
+    with _lock:
+        _indices.pop(id_frame, None)
+
+
+def registered_bitmap_index(vendas):
+    """
+    Retorna o índice bitmap já montado para `vendas`, ou None.
+    """
+    with _lock:
+        entrada = _indices.get(id(vendas))
+    if entrada is None or entrada[0]() is not vendas or entrada[1]['linhas'] != len(vendas):
+        return None
+    return entrada[1]
+
+
+def _registrar(vendas, indice):
+    with _lock:
+        novo_frame = id(vendas) not in _indices
+        _indices[id(vendas)] = (weakref.ref(vendas), indice)
+    if novo_frame:
+        weakref.finalize(vendas, _descartar_indice, id(vendas))
+
+
+def get_bitmap_index(vendas):
+    """
+    Retorna o índice bitmap de `vendas`, montando-o apenas na primeira chamada para esse DataFrame.
+    """
+    indice = registered_bitmap_index(vendas)
+    if indice is not None:
+        return indice
+
+    indice = build_bitmap_index(vendas)
+    _registrar(vendas, indice)
+    return indice
+
+
+def append_bitmap_index(vendas, anteriores, novas):
+    """
+    Registra para `vendas` (`anteriores` seguidas de `novas`) o índice bitmap de `anteriores`
+    estendido com as linhas novas, sem remontar os bitmaps da tabela inteira.
+
+    Se `anteriores` ainda não tinha índice, nada é feito (ele será montado na primeira consulta).
+    """
+    anterior = registered_bitmap_index(anteriores)
+    if anterior is None:
+        return
+
+    linhas = anterior['linhas'] + len(novas)
+    inicio, deslocamento = divmod(anterior['linhas'], 8)
+    indice = {'linhas': linhas}
+
+    for coluna, dados in anterior.items():
+        if coluna == 'linhas':
+            continue
+
+        # Códigos das linhas novas nas linhas da matriz anterior; valores novos ganham linhas ao final
+        codigos_valores = dict(dados['codigos'])
+        codigos_novas, valores_novas = _codificar(novas[coluna])
+        traducao = np.array(
+            [codigos_valores.setdefault(valor, len(codigos_valores)) for valor in valores_novas] + [-1], dtype=np.int64
+        )
+        codigos_novas = traducao[codigos_novas]
+
+        bitmaps = np.zeros((len(codigos_valores), (linhas + 7) // 8), dtype=np.uint8)
+        bitmaps[:len(dados['bitmaps']), :dados['bitmaps'].shape[1]] = dados['bitmaps']
+
+        # As linhas novas começam no bit `deslocamento` do byte `inicio` (os bits de preenchimento
+        # do último byte anterior são 0, então basta um OR)
+        alinhados = np.concatenate([np.full(deslocamento, -1, dtype=np.int64), codigos_novas])
+        for codigo in np.unique(codigos_novas[codigos_novas >= 0]):
+            np.bitwise_or(bitmaps[codigo, inicio:], np.packbits(alinhados == codigo), out=bitmaps[codigo, inicio:])
+
+        indice[coluna] = {'codigos': codigos_valores, 'bitmaps': bitmaps}
+
+    _registrar(vendas, indice)
+
+
+def filter_bitmap(indice, filtros):
+    """
+    Bitmap das linhas que atendem a todos os `filtros` (coluna -> valores aceitos): OR dos bitmaps
+    dos valores de cada coluna e AND entre as colunas. Retorna None se nenhum filtro se aplica.
+
+    Valores inexistentes na coluna não selecionam linhas; listas vazias ou None equivalem a "sem filtro".
+    """
+    resultado = None
+
+    for coluna, valores in filtros.items():
+        if not valores:
+            continue
+
+        dados = indice[coluna]
+        codigos = {dados['codigos'][valor] for valor in valores if valor in dados['codigos']}
+
+        selecao = np.zeros(dados['bitmaps'].shape[1], dtype=np.uint8)
+        for codigo in codigos:
+            np.bitwise_or(selecao, dados['bitmaps'][codigo], out=selecao)
+
+        resultado = selecao if resultado is None else np.bitwise_and(resultado, selecao, out=resultado)
+
+    return resultado
+
+
+def bitmap_mask(bits, linhas):
+    """
+    Converte um bitmap em uma máscara booleana de `linhas` posições.
+    """
+    return np.unpackbits(bits, count=linhas).view(bool)
+
+
+def bitmap_contains(bits, posicoes):
+    """
+    Indica, para cada posição de linha em `posicoes`, se ela está selecionada no bitmap.
+    """
+    posicoes = np.asarray(posicoes)
+    return ((bits[posicoes >> 3] >> (7 - (posicoes & 7)).astype(np.uint8)) & 1).astype(bool)
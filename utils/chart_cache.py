@@ -0,0 +1,164 @@
+import functools
+import inspect
+import os
+import sys
+import threading
+import weakref
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+from utils.filter_engine import normalize_filters
+
+# Limites do cache de gráficos: quantidade de entradas e memória estimada (DASHBOARD_CACHE_GRAFICOS_MB)
+MAX_GRAFICOS_EM_CACHE = 128
+MAX_BYTES_GRAFICOS = int(float(os.environ.get('DASHBOARD_CACHE_GRAFICOS_MB', '64')) * 1024 * 1024)
+
+# Bytes atribuídos a cada figura além dos dados dos traces (layout, template e anotações)
+BYTES_LAYOUT_FIGURA = 2048
+
+PARAMETROS_FILTRO = ('filtro_periodo', 'filtro_categorias', 'filtro_canais')
+
+# chave -> (referências fracas dos DataFrames, resultado, bytes estimados)
+_cache_graficos = OrderedDict()
+_bytes_em_cache = 0
+_lock = threading.Lock()
+
+
+def _bytes_traces(valor):
+    # Soma os arrays numpy (nbytes) e os textos dos dados dos traces; demais valores contam 8 bytes
+    if isinstance(valor, np.ndarray):
+        return int(valor.nbytes)
+    if isinstance(valor, str):
+        return len(valor)
+    if isinstance(valor, dict):
+        return sum(_bytes_traces(item) for item in valor.values())
+    if isinstance(valor, (tuple, list)):
+        return sum(_bytes_traces(item) for item in valor)
+    return 8
+
+
+def estimate_bytes(objeto):
+    """
+    Estima a memória ocupada por um resultado do chart_factory (figuras, DataFrames e escalares).
+    """
+    if isinstance(objeto, pd.DataFrame):
+        return int(objeto.memory_usage(deep=True).sum())
+    if isinstance(objeto, pd.Series):
+        return int(objeto.memory_usage(deep=True))
+    if isinstance(objeto, go.Figure):
+        # Dados dos traces lidos sem cópia (`to_plotly_json` copiaria a figura inteira) e uma
+        # parcela fixa para o layout
+        return _bytes_traces(objeto._data) + BYTES_LAYOUT_FIGURA
+    if isinstance(objeto, np.ndarray):
+        return int(objeto.nbytes)
+    if isinstance(objeto, (tuple, list)):
+        return sum(estimate_bytes(item) for item in objeto)
+    if isinstance(objeto, dict):
+        return sum(estimate_bytes(item) for item in objeto.values())
+    return sys.getsizeof(objeto)
+
+
+def _versao_dados(argumentos):
+    # A "versão" dos dados é a identidade dos DataFrames recebidos (um DataFrame novo, como o
+    # produzido por um acréscimo de vendas, é outra versão)
+    return tuple((nome, id(valor)) for nome, valor in argumentos.items() if isinstance(valor, pd.DataFrame))
+
+
+def _remover(chave):
+    # Chamado com o lock adquirido
+    global _bytes_em_cache
+    entrada = _cache_graficos.pop(chave, None)
+    if entrada is not None:
+        _bytes_em_cache -= entrada[2]
+
+
+def _usa_frame(chave, id_frame):
+    return any(id_existente == id_frame for _, id_existente in chave[1])
+
+
+def _descartar_frame(id_frame):
+    # Remove os gráficos de um DataFrame que foi coletado pelo garbage collector
+    with _lock:
+        for chave in [chave for chave in _cache_graficos if _usa_frame(chave, id_frame)]:
+            _remover(chave)
+
+
+def memoize_chart(funcao):
+    """
+    Memoriza uma função `create_*` pela chave (função, filtros normalizados, versão dos dados).
+
+    As entradas são descartadas na ordem LRU quando o cache passa de MAX_GRAFICOS_EM_CACHE
+    entradas ou de MAX_BYTES_GRAFICOS bytes estimados. Figuras e DataFrames retornados são
+    compartilhados entre reruns e NÃO devem ser modificados.
+    """
+    assinatura = inspect.signature(funcao)
+
+    @functools.wraps(funcao)
+    def envoltorio(*args, **kwargs):
+        global _bytes_em_cache
+
+        argumentos = assinatura.bind(*args, **kwargs)
+        argumentos.apply_defaults()
+        argumentos = argumentos.arguments
+
+        outros = tuple(
+            (nome, valor) for nome, valor in argumentos.items()
+            if nome not in PARAMETROS_FILTRO and not isinstance(valor, pd.DataFrame)
+        )
+        chave = (
+            funcao.__qualname__,
+            _versao_dados(argumentos),
+            normalize_filters(*(argumentos.get(nome) for nome in PARAMETROS_FILTRO)),
+            outros
+        )
+        frames = [valor for valor in argumentos.values() if isinstance(valor, pd.DataFrame)]
+
+        with _lock:
+            entrada = _cache_graficos.get(chave)
+            if entrada is not None and all(referencia() is frame for referencia, frame in zip(entrada[0], frames)):
+                _cache_graficos.move_to_end(chave)
+                return entrada[1]
+
+        resultado = funcao(*args, **kwargs)
+        tamanho = estimate_bytes(resultado)
+
+        # Resultados maiores que o cache inteiro não são guardados
+        if tamanho > MAX_BYTES_GRAFICOS:
+            return resultado
+
+        with _lock:
+            _remover(chave)
+            for frame in frames:
+                if not any(_usa_frame(existente, id(frame)) for existente in _cache_graficos):
+                    weakref.finalize(frame, _descartar_frame, id(frame))
+
+            _cache_graficos[chave] = ([weakref.ref(frame) for frame in frames], resultado, tamanho)
+            _bytes_em_cache += tamanho
+
+            while len(_cache_graficos) > MAX_GRAFICOS_EM_CACHE or _bytes_em_cache > MAX_BYTES_GRAFICOS:
+                _remover(next(iter(_cache_graficos)))
+
+        return resultado
+
+    return envoltorio
+
+
+def chart_cache_info():
+    """
+    Retorna a quantidade de entradas e os bytes estimados ocupados pelo cache de gráficos.
+    """
+    with _lock:
+        return {'entradas': len(_cache_graficos), 'bytes': _bytes_em_cache}
+
+
+def clear_chart_cache():
+    """
+    Esvazia o cache de gráficos.
+    """
+    global _bytes_em_cache
+    with _lock:
+        _cache_graficos.clear()
+        _bytes_em_cache = 0
@@ -0,0 +1,194 @@
+import os
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+# Redução das figuras antes de irem ao navegador: séries longas são reamostradas no servidor (LTTB)
+# para um orçamento de pontos, traços com muitos pontos passam a WebGL e os números são arredondados.
+
+# Pontos por série enviados ao navegador (~2x a largura em pixels de um gráfico em tela cheia)
+ORCAMENTO_PONTOS = int(os.environ.get('DASHBOARD_ORCAMENTO_PONTOS', '2000'))
+
+# A partir de quantos pontos um traço de dispersão/linha é desenhado com WebGL (Scattergl) em vez de SVG
+LIMIAR_WEBGL = 1000
+
+# Algarismos significativos mantidos nos números das figuras (nunca menos que os centavos)
+ALGARISMOS_SIGNIFICATIVOS = 6
+CASAS_DECIMAIS_MINIMAS = 2
+
+# Atributos com um valor por ponto, reamostrados junto com x e y
+ATRIBUTOS_POR_PONTO = ('text', 'hovertext', 'customdata', 'ids')
+ATRIBUTOS_MARCADOR_POR_PONTO = ('size', 'color', 'symbol', 'opacity')
+
+# Propriedades aceitas pelo Scattergl (as do Scatter que ele não tem são descartadas na conversão)
+_PROPRIEDADES_SCATTERGL = set(go.Scattergl()._valid_props) | {'type'}
+_PROPRIEDADES_LINHA_SCATTERGL = set(go.scattergl.Line()._valid_props)
+
+
+def lttb(x, y, limite):
+    """
+    Largest-Triangle-Three-Buckets: índices de até `limite` pontos que preservam a forma da série.
+
+    Mantém o primeiro e o último ponto e, de cada balde intermediário, o ponto que forma o maior
+    triângulo com o ponto escolhido no balde anterior e a média do balde seguinte.
+    """
+    n = len(y)
+    if limite >= n or limite < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype='float64')
+    y = np.asarray(y, dtype='float64')
+    validos = np.isfinite(y)
+    y_valido = np.where(validos, y, 0.0)
+
+    # Baldes dos pontos intermediários (o último ponto é o balde final) e a média (x, y) de cada um,
+    # calculadas de uma vez; com `limite < n`, os baldes nunca ficam vazios
+    inicios = np.append(np.linspace(1, n - 1, limite - 1).astype('int64'), n - 1)
+    contagens = np.maximum(np.diff(np.append(inicios, n)), 1)
+
+    media_x = np.add.reduceat(x, inicios) / contagens
+    quantidade_y = np.add.reduceat(validos.astype('float64'), inicios)
+    media_y = np.add.reduceat(y_valido, inicios) / np.maximum(quantidade_y, 1)
+
+    indices = np.empty(limite, dtype='int64')
+    indices[0], indices[-1] = 0, n - 1
+
+    anterior = 0
+    for balde in range(limite - 2):
+        inicio, fim = inicios[balde], max(inicios[balde + 1], inicios[balde] + 1)
+        proximo_y = media_y[balde + 1] if quantidade_y[balde + 1] else y_valido[anterior]
+
+        area = np.abs(
+            (x[anterior] - media_x[balde + 1]) * (y_valido[inicio:fim] - y_valido[anterior])
+            - (x[anterior] - x[inicio:fim]) * (proximo_y - y_valido[anterior])
+        )
+        area[~validos[inicio:fim]] = -1.0
+        anterior = inicio + int(np.argmax(area))
+        indices[balde + 1] = anterior
+
+    return indices
+
+
+def _eixo_numerico(x):
+    # Posição numérica dos pontos no eixo x para o cálculo das áreas (datas em segundos, textos em ordem)
+    valores = np.asarray(x)
+    if np.issubdtype(valores.dtype, np.datetime64):
+        return valores.astype('datetime64[s]').astype('float64')
+    if np.issubdtype(valores.dtype, np.number):
+        return valores.astype('float64')
+
+    try:
+        return pd.to_datetime(valores).to_numpy().astype('datetime64[s]').astype('float64')
+    except (ValueError, TypeError):
+        return np.arange(len(valores), dtype='float64')
+
+
+def round_values(valores):
+    """
+    Arredonda um array de floats para ALGARISMOS_SIGNIFICATIVOS (no mínimo CASAS_DECIMAIS_MINIMAS casas).
+
+    Arrays não numéricos (textos, datas) são devolvidos sem alteração.
+    """
+    array = np.asarray(valores)
+    if not np.issubdtype(array.dtype, np.floating) or array.size == 0:
+        return valores
+
+    maior = np.nanmax(np.abs(array)) if not np.isnan(array).all() else 0
+    casas = CASAS_DECIMAIS_MINIMAS
+    if maior > 0:
+        casas = max(casas, ALGARISMOS_SIGNIFICATIVOS - 1 - int(np.floor(np.log10(maior))))
+
+    return np.round(array, casas)
+
+
+def _datas_compactas(valores):
+    # Datas sem horário viram "AAAA-MM-DD" (em vez de "AAAA-MM-DDT00:00:00" no JSON)
+    array = np.asarray(valores)
+    if not np.issubdtype(array.dtype, np.datetime64) and pd.api.types.infer_dtype(array, skipna=True) not in ('datetime', 'datetime64'):
+        return valores
+
+    datas = pd.DatetimeIndex(array)
+    if (datas == datas.normalize()).all():
+        return np.asarray(datas.strftime('%Y-%m-%d'), dtype=object)
+    return valores
+
+
+def _por_ponto(valor, n):
+    return valor is not None and not isinstance(valor, str) and np.ndim(valor) >= 1 and len(valor) == n
+
+
+def _para_scattergl(propriedades):
+    # Mantém só as propriedades que o Scattergl aceita (ex.: sem `line.shape='spline'` nem `stackgroup`)
+    propriedades = {chave: valor for chave, valor in propriedades.items() if chave in _PROPRIEDADES_SCATTERGL}
+    if isinstance(propriedades.get('line'), dict):
+        propriedades['line'] = {chave: valor for chave, valor in propriedades['line'].items() if chave in _PROPRIEDADES_LINHA_SCATTERGL}
+        if propriedades['line'].get('shape') not in (None, 'linear', 'hv', 'vh', 'hvh', 'vhv'):
+            del propriedades['line']['shape']
+
+    propriedades['type'] = 'scattergl'
+    return propriedades
+
+
+def _reduzir_traco(traco, orcamento_pontos):
+    # Reamostra e arredonda um traço de dispersão/linha; retorna as propriedades e a quantidade de pontos
+    propriedades = dict(traco)
+    x, y = propriedades.get('x'), propriedades.get('y')
+
+    if y is None or np.ndim(y) != 1:
+        return propriedades, 0
+
+    n = len(y)
+    if x is None:
+        x = np.arange(n)
+
+    if n > orcamento_pontos:
+        indices = lttb(_eixo_numerico(x), y, orcamento_pontos)
+
+        for atributo in ('x', 'y') + ATRIBUTOS_POR_PONTO:
+            if _por_ponto(propriedades.get(atributo), n):
+                propriedades[atributo] = np.asarray(propriedades[atributo])[indices]
+
+        if isinstance(propriedades.get('marker'), dict):
+            marcador = propriedades['marker'] = dict(propriedades['marker'])
+            for atributo in ATRIBUTOS_MARCADOR_POR_PONTO:
+                if _por_ponto(marcador.get(atributo), n):
+                    marcador[atributo] = np.asarray(marcador[atributo])[indices]
+
+        n = len(indices)
+
+    for atributo in ('x', 'y', 'customdata'):
+        if propriedades.get(atributo) is not None:
+            propriedades[atributo] = _datas_compactas(round_values(propriedades[atributo]))
+
+    return propriedades, n
+
+
+def optimize_traces(tracos, orcamento_pontos=ORCAMENTO_PONTOS, limiar_webgl=LIMIAR_WEBGL):
+    """
+    Prepara traços em dicionário (com a chave `type`) para o navegador: reamostra com LTTB as séries
+    acima de `orcamento_pontos`, passa para WebGL (Scattergl) os traços que continuam acima de
+    `limiar_webgl` pontos e arredonda os números.
+
+    Retorna novos dicionários; os recebidos não são alterados.
+    """
+    otimizados = []
+
+    for traco in tracos:
+        tipo = traco.get('type', 'scatter')
+
+        if tipo not in ('scatter', 'scattergl'):
+            traco = dict(traco)
+            for atributo in ('x', 'y', 'z'):
+                if traco.get(atributo) is not None:
+                    traco[atributo] = round_values(traco[atributo])
+            otimizados.append(traco)
+            continue
+
+        propriedades, pontos = _reduzir_traco(traco, orcamento_pontos)
+        if tipo == 'scatter' and pontos > limiar_webgl:
+            propriedades = _para_scattergl(propriedades)
+
+        otimizados.append(propriedades)
+
+    return otimizados
@@ -0,0 +1,140 @@
+import plotly.graph_objects as go
+import plotly.io as pio
+
+from utils.chart_decimation import optimize_traces
+
+# Tema neon do dashboard, registrado uma vez como template do Plotly ("neon"): fontes, cores,
+# fundos, grade, legenda e margens ficam no template e cada figura descreve só o que é seu
+# (dados, títulos e o que difere do tema).
+
+# Paleta neon
+PRETO = '#0D0D0D'
+CIANO = '#00FFFF'
+LARANJA = '#FF5F1F'
+BRANCO = '#F8F8FF'
+ROXO = '#9933FF'
+VERDE = '#33FF99'
+
+FUNDO_TRANSPARENTE = 'rgba(13, 13, 13, 0.0)'
+GRADE = 'rgba(248, 248, 255, 0.1)'
+GRADE_CIANO = 'rgba(0, 255, 255, 0.1)'
+
+FONTE_TITULO = 'Orbitron'
+FONTE_TEXTO = 'Montserrat'
+
+# Títulos de gráficos em meia largura (duas colunas) são menores
+TAMANHO_TITULO = 24
+TAMANHO_TITULO_COLUNA = 20
+
+CORES_CATEGORIAS = {
+    'SUV': CIANO,
+    'Sedan': LARANJA,
+    'Hatch': BRANCO,
+    'Pickup': ROXO,
+    'Elétrico': VERDE
+}
+
+CORES_CANAIS = {
+    'Showroom': CIANO,
+    'Online': LARANJA,
+    'Concessionária': BRANCO,
+    'Parceiro': ROXO
+}
+
+# Escalas de cor: laranja -> branco -> ciano (margens) e do fundo até a cor cheia (mapas de calor)
+ESCALA_MARGEM = [
+    [0, 'rgba(255, 95, 31, 0.7)'],
+    [0.5, 'rgba(248, 248, 255, 0.7)'],
+    [1, 'rgba(0, 255, 255, 0.7)']
+]
+
+ESCALA_CIANO = [
+    [0, 'rgba(13, 13, 13, 0.7)'],
+    [0.2, 'rgba(0, 255, 255, 0.3)'],
+    [0.4, 'rgba(0, 255, 255, 0.5)'],
+    [0.6, 'rgba(0, 255, 255, 0.7)'],
+    [0.8, 'rgba(0, 255, 255, 0.9)'],
+    [1, CIANO]
+]
+
+ESCALA_LARANJA = [
+    [0, 'rgba(13, 13, 13, 0.7)'],
+    [0.2, 'rgba(255, 95, 31, 0.3)'],
+    [0.4, 'rgba(255, 95, 31, 0.5)'],
+    [0.6, 'rgba(255, 95, 31, 0.7)'],
+    [0.8, 'rgba(255, 95, 31, 0.9)'],
+    [1, LARANJA]
+]
+
+# Legenda centralizada abaixo do gráfico (gráficos de pizza)
+LEGENDA_ABAIXO = dict(orientation='h', yanchor='bottom', y=-0.2, xanchor='center', x=0.5)
+
+NOME_TEMA = 'neon'
+
+TEMA_NEON = go.layout.Template(layout=dict(
+    font=dict(family=FONTE_TEXTO, color=BRANCO),
+    title=dict(y=0.95, x=0.5, xanchor='center', yanchor='top', font=dict(family=FONTE_TITULO, size=TAMANHO_TITULO)),
+    paper_bgcolor=FUNDO_TRANSPARENTE,
+    plot_bgcolor=FUNDO_TRANSPARENTE,
+    colorway=[CIANO, LARANJA, BRANCO, ROXO, VERDE],
+    legend=dict(orientation='h', yanchor='bottom', y=1.02, xanchor='right', x=1),
+    margin=dict(l=20, r=20, t=80, b=20),
+    hoverlabel=dict(bgcolor=PRETO, bordercolor=CIANO, font=dict(family=FONTE_TEXTO, color=BRANCO)),
+    xaxis=dict(showgrid=True, gridcolor=GRADE, zeroline=False),
+    yaxis=dict(showgrid=True, gridcolor=GRADE, zeroline=False),
+    annotationdefaults=dict(
+        showarrow=True, arrowhead=2, arrowcolor=LARANJA, arrowsize=1, arrowwidth=2,
+        bgcolor='rgba(13, 13, 13, 0.7)', bordercolor=LARANJA, borderwidth=2, borderpad=4,
+        font=dict(family=FONTE_TITULO, color=BRANCO)
+    )
+))
+
+pio.templates[NOME_TEMA] = TEMA_NEON
+
+# O st.plotly_chart (com theme=None) preenche fonte e fundos com os do Streamlit quando a própria
+# figura não os define, então eles vão também no layout de cada figura
+LAYOUT_BASE = {
+    'font': {'family': FONTE_TEXTO, 'color': BRANCO},
+    'paper_bgcolor': FUNDO_TRANSPARENTE,
+    'plot_bgcolor': FUNDO_TRANSPARENTE
+}
+
+
+def neon_axis(titulo=None, cor=None, grade=True, cor_grade=None, **opcoes):
+    """
+    Eixo no tema neon com só o que difere do template: título, cor do texto e da grade.
+
+    `opcoes` são outras propriedades do eixo (ex.: `overlaying`, `side`, `range`, `tickvals`).
+    """
+    eixo = dict(opcoes)
+
+    if titulo is not None:
+        eixo['title'] = {'text': titulo}
+    if cor is not None:
+        eixo.setdefault('title', {})['font'] = {'color': cor}
+        eixo['tickfont'] = {'color': cor}
+
+    if not grade:
+        eixo['showgrid'] = False
+    elif cor_grade is not None:
+        eixo['gridcolor'] = cor_grade
+
+    return eixo
+
+
+def build_figure(tracos, titulo=None, altura=500, tamanho_titulo=None, **layout):
+    """
+    Monta uma figura no tema neon a partir de traços em dicionário (com a chave `type`).
+
+    `layout` traz só o que difere do tema (eixos de `neon_axis`, `hovermode`, `barmode`...). Os
+    traços passam por `optimize_traces` (reamostragem, WebGL e arredondamento) e a figura é
+    construída e validada de uma vez, em vez de traço a traço e atualização a atualização.
+    """
+    layout = {'template': TEMA_NEON, **LAYOUT_BASE, 'height': altura, **layout}
+
+    if titulo is not None:
+        layout['title'] = {'text': titulo}
+        if tamanho_titulo is not None:
+            layout['title']['font'] = {'size': tamanho_titulo}
+
+    return go.Figure({'data': optimize_traces(tracos), 'layout': layout})
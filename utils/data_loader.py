@@ -0,0 +1,599 @@
+import hashlib
+import io
+import json
+import logging
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from utils.bitmap_index import append_bitmap_index
+from utils.olap_cube import append_pre_aggregates, fold_pre_aggregates, register_pre_aggregates, register_sql_backend
+from utils.profiler import profiled
+from utils.result_cache import register_data_version
+from utils.single_flight import single_flight
+from utils.sql_backend import SalesDatabase, resolve_engine
+
+logger = logging.getLogger(__name__)
+
+CAMINHO_VENDAS = 'data/vendas.csv'
+DIRETORIO_CACHE = 'data/.cache'
+
+# Incrementar sempre que a preparação do DataFrame ou o formato do cache mudarem, para invalidar os caches existentes
+VERSAO_PREPARACAO = 3
+
+# Esquema compacto das colunas do DataFrame de vendas preparado
+ESQUEMA_VENDAS = {
+    'modelo': 'category',
+    'categoria': 'category',
+    'canal_venda': 'category',
+    'campanha': 'category',
+    'periodo': 'category',
+    'periodo_codigo': 'int16',
+    'hora': 'int8',
+    'dia_semana': 'int8'
+}
+
+# Tipos fixos na leitura do CSV: `campanha` fica vazia em meses inteiros, e sem o tipo explícito o
+# pandas infere float nesses trechos e texto nos demais (DtypeWarning e colunas mistas em arquivos grandes)
+TIPOS_CSV = {'campanha': 'object'}
+
+# Colunas monetárias que podem ser reduzidas a float32 quando isso não altera nenhum centavo
+COLUNAS_MONETARIAS = ['preco_venda', 'custo', 'lucro']
+
+# Ativa a tentativa de float32 nas colunas monetárias (DASHBOARD_FLOAT32=1)
+DINHEIRO_FLOAT32 = os.environ.get('DASHBOARD_FLOAT32', '0') == '1'
+
+# Leitura em blocos para arquivos maiores que a memória (DASHBOARD_STREAMING=1): só os agregados
+# e, opcionalmente, uma amostra das linhas (DASHBOARD_AMOSTRA, fração entre 0 e 1) ficam em memória
+MODO_STREAMING = os.environ.get('DASHBOARD_STREAMING', '0') == '1'
+FRACAO_AMOSTRA = float(os.environ.get('DASHBOARD_AMOSTRA', '0'))
+LINHAS_POR_BLOCO = 500_000
+
+# Backend SQL embutido (DASHBOARD_SQL=sqlite, duckdb ou auto): as vendas ficam em um banco em
+# data/.cache e filtros e agrupamentos são feitos em SQL, sem a tabela em memória
+BACKEND_SQL = os.environ.get('DASHBOARD_SQL', '')
+
+# Bytes finais do trecho já lido que identificam um CSV que apenas recebeu linhas novas
+BYTES_ASSINATURA = 64 * 1024
+
+# Segmentos de acréscimo mantidos no cache antes de ele ser regravado em um único arquivo
+MAX_SEGMENTOS_CACHE = 8
+
+# Vendas mantidas em memória por `load_vendas_incremental`: (DataFrame, byte lido, mtime, assinatura)
+_vendas_em_memoria = {}
+_lock_incremental = threading.Lock()
+
+# Bancos abertos por `load_vendas_sql`: (caminho, motor) -> (DataFrame vazio, banco, origem, (tamanho, mtime))
+_vendas_sql = {}
+
+
+def apply_compact_schema(vendas, dinheiro_float32=False):
+    """
+    Aplica o esquema compacto (categóricas, inteiros pequenos e, opcionalmente, float32 exato).
+
+    Retorna o DataFrame convertido e um relatório com o uso de memória antes e depois.
+    """
+    bytes_antes = int(vendas.memory_usage(deep=True).sum())
+
+    for coluna, tipo in ESQUEMA_VENDAS.items():
+        vendas[coluna] = vendas[coluna].astype(tipo)
+
+    colunas_float32 = []
+    if dinheiro_float32:
+        for coluna in COLUNAS_MONETARIAS:
+            valores = vendas[coluna].to_numpy()
+            reduzidos = valores.astype('float32')
+
+            # Só converte se todos os valores continuarem idênticos ao centavo
+            if np.array_equal(np.round(reduzidos.astype('float64'), 2), np.round(valores, 2), equal_nan=True):
+                vendas[coluna] = reduzidos
+                colunas_float32.append(coluna)
+
+    bytes_depois = int(vendas.memory_usage(deep=True).sum())
+
+    relatorio = {
+        'bytes_antes': bytes_antes,
+        'bytes_depois': bytes_depois,
+        'bytes_economizados': bytes_antes - bytes_depois,
+        'colunas_float32': colunas_float32
+    }
+
+    logger.info(
+        'Esquema compacto aplicado: %.1f MB -> %.1f MB (%.1f MB economizados; float32 em %s)',
+        bytes_antes / 1e6, bytes_depois / 1e6, (bytes_antes - bytes_depois) / 1e6,
+        ', '.join(colunas_float32) or 'nenhuma coluna'
+    )
+
+    return vendas, relatorio
+
+
+def prepare_vendas(vendas, dinheiro_float32=False):
+    """
+    Deriva as colunas de data usadas pelo dashboard e aplica o esquema compacto.
+
+    Retorna o DataFrame preparado e o relatório de memória de `apply_compact_schema`.
+    """
+    return apply_compact_schema(_derivar_colunas(vendas), dinheiro_float32)
+
+
+def _derivar_colunas(vendas):
+    vendas['data_venda'] = pd.to_datetime(vendas['data_venda'])
+    vendas['periodo'] = vendas['data_venda'].dt.strftime('%Y-%m')
+
+    # Código inteiro do período (meses desde o ano 0), ordenado como o período
+    vendas['periodo_codigo'] = vendas['data_venda'].dt.year * 12 + vendas['data_venda'].dt.month - 1
+
+    # Hora e dia da semana para as análises por horário
+    vendas['hora'] = vendas['data_venda'].dt.hour
+    vendas['dia_semana'] = vendas['data_venda'].dt.dayofweek
+
+    return vendas
+
+
+def _hash_arquivo(caminho, tamanho_bloco=8 * 1024 * 1024):
+    sha256 = hashlib.sha256()
+    with open(caminho, 'rb') as arquivo:
+        for bloco in iter(lambda: arquivo.read(tamanho_bloco), b''):
+            sha256.update(bloco)
+    return sha256.hexdigest()
+
+
+def _assinatura(caminho, deslocamento):
+    # Cabeçalho + últimos bytes antes de `deslocamento`: muda se o trecho já lido for reescrito
+    sha256 = hashlib.sha256()
+    with open(caminho, 'rb') as arquivo:
+        sha256.update(arquivo.readline())
+        inicio = max(0, deslocamento - BYTES_ASSINATURA)
+        arquivo.seek(inicio)
+        sha256.update(arquivo.read(deslocamento - inicio))
+    return sha256.hexdigest()
+
+
+def _versao_dados(caminho, deslocamento, *detalhes):
+    # Versão das vendas lidas até `deslocamento`: a mesma em todos os processos que leram o mesmo
+    # trecho do mesmo arquivo com a mesma preparação (chave do cache de resultados compartilhado)
+    estado = os.stat(caminho)
+    origem = (os.path.realpath(caminho), deslocamento, estado.st_mtime_ns, _assinatura(caminho, deslocamento))
+    return hashlib.sha256(repr(origem + (VERSAO_PREPARACAO,) + detalhes).encode()).hexdigest()
+
+
+def _ler_acrescimo(caminho, deslocamento, dinheiro_float32):
+    # Lê só as linhas completas gravadas após `deslocamento`; retorna (linhas preparadas, novo deslocamento)
+    with open(caminho, 'rb') as arquivo:
+        cabecalho = arquivo.readline()
+        arquivo.seek(deslocamento)
+        acrescimo = arquivo.read()
+
+    # Uma linha ainda sem quebra de linha pode estar sendo gravada: fica para a próxima leitura
+    fim = acrescimo.rfind(b'\n') + 1
+    if fim == 0:
+        return None, deslocamento
+
+    novas = pd.read_csv(io.BytesIO(cabecalho + acrescimo[:fim]), dtype=TIPOS_CSV)
+    return prepare_vendas(novas, dinheiro_float32)[0], deslocamento + fim
+
+
+def concat_vendas(partes):
+    """
+    Concatena DataFrames de vendas preparados, unindo (e ordenando) as categorias das colunas categóricas.
+    """
+    def categorias(parte, coluna):
+        # Uma coluna só com nulos tem categorias vazias de outro tipo, o que impede a união
+        valores = parte[coluna]
+        return valores.cat.set_categories(pd.Index([], dtype=object)) if valores.cat.categories.empty else valores
+
+    categoricas = {
+        coluna: union_categoricals([categorias(parte, coluna) for parte in partes], sort_categories=True)
+        for coluna, tipo in ESQUEMA_VENDAS.items() if tipo == 'category'
+    }
+
+    vendas = pd.concat([parte.drop(columns=list(categoricas)) for parte in partes], ignore_index=True)
+    return vendas.assign(**categoricas)[partes[0].columns]
+
+
+def _caminhos_cache(caminho_csv):
+    nome = os.path.splitext(os.path.basename(caminho_csv))[0]
+    return (
+        os.path.join(DIRETORIO_CACHE, f'{nome}.feather'),
+        os.path.join(DIRETORIO_CACHE, f'{nome}.manifest.json')
+    )
+
+
+def _ler_manifesto(caminho_manifesto):
+    try:
+        with open(caminho_manifesto, encoding='utf-8') as arquivo:
+            return json.load(arquivo)
+    except (OSError, ValueError):
+        return None
+
+
+def _gravar_manifesto(caminho_manifesto, manifesto):
+    temporario = caminho_manifesto + '.tmp'
+    with open(temporario, 'w', encoding='utf-8') as arquivo:
+        json.dump(manifesto, arquivo, indent=2)
+    os.replace(temporario, caminho_manifesto)
+
+
+def _gravar_feather(vendas, caminho_feather):
+    # Arrow IPC sem compressão e em um único lote, para ser mapeado sem cópia por `_mapear_feather`.
+    # Temporário por processo: vários workers podem publicar o mesmo cache ao mesmo tempo
+    temporario = f'{caminho_feather}.{os.getpid()}.tmp'
+    vendas.to_feather(temporario, compression='uncompressed', chunksize=max(len(vendas), 1))
+    os.replace(temporario, caminho_feather)
+
+
+def _mapear_feather(caminho_feather):
+    # As colunas numéricas e de datas apontam direto para as páginas do arquivo mapeado (somente
+    # leitura), que o sistema operacional compartilha entre todos os processos que o mapeiam.
+    # Substituir o arquivo (os.replace) não afeta quem já o mapeou
+    import pyarrow.feather
+
+    return pyarrow.feather.read_table(caminho_feather, memory_map=True).to_pandas(split_blocks=True)
+
+
+def _ler_segmentos(manifesto):
+    # O cache é o arquivo base seguido dos segmentos de linhas acrescentadas depois dele (com
+    # segmentos, a concatenação faz uma cópia própria do processo; ela volta a ser mapeada quando
+    # os segmentos são unidos em um único arquivo por `_anexar_ao_cache`)
+    partes = [_mapear_feather(os.path.join(DIRETORIO_CACHE, nome)) for nome in manifesto['segmentos']]
+    return partes[0] if len(partes) == 1 else concat_vendas(partes)
+
+
+def _remover_segmentos(nomes):
+    for nome in nomes:
+        try:
+            os.remove(os.path.join(DIRETORIO_CACHE, nome))
+        except OSError:
+            pass
+
+
+def _anexar_ao_cache(caminho, manifesto, vendas, novas, deslocamento, estado):
+    # Grava só as linhas novas como um segmento (ou regrava tudo quando há segmentos demais) e
+    # retorna as vendas a manter em memória: o arquivo regravado, mapeado no lugar da cópia
+    # concatenada, ou a própria `vendas` quando só um segmento foi acrescentado
+    caminho_feather, caminho_manifesto = _caminhos_cache(caminho)
+    segmentos_antigos = manifesto['segmentos']
+
+    if len(segmentos_antigos) >= MAX_SEGMENTOS_CACHE:
+        _gravar_feather(vendas, caminho_feather)
+        segmentos = [os.path.basename(caminho_feather)]
+        vendas = _mapear_feather(caminho_feather)
+    else:
+        nome = os.path.basename(caminho_feather).replace('.feather', f'.{deslocamento}.feather')
+        _gravar_feather(novas, os.path.join(DIRETORIO_CACHE, nome))
+        segmentos = segmentos_antigos + [nome]
+
+    manifesto.update({
+        'segmentos': segmentos,
+        'tamanho': deslocamento,
+        'mtime_ns': estado.st_mtime_ns,
+        'assinatura': _assinatura(caminho, deslocamento),
+        # O hash do arquivo inteiro não é recalculado nos acréscimos
+        'sha256': None
+    })
+    _gravar_manifesto(caminho_manifesto, manifesto)
+    _remover_segmentos(set(segmentos_antigos) - set(segmentos))
+    return vendas
+
+
+def _carregar(caminho, usar_cache, dinheiro_float32):
+    # Retorna as vendas preparadas e o byte do CSV até onde elas foram lidas
+    try:
+        import pyarrow  # noqa: F401  (necessário para ler e gravar Feather)
+    except ImportError:
+        usar_cache = False
+
+    estado = os.stat(caminho)
+
+    if not usar_cache:
+        return prepare_vendas(pd.read_csv(caminho, dtype=TIPOS_CSV), dinheiro_float32)[0], estado.st_size
+
+    caminho_feather, caminho_manifesto = _caminhos_cache(caminho)
+    manifesto = _ler_manifesto(caminho_manifesto)
+    sha256 = None
+
+    if (
+        manifesto is not None
+        and manifesto.get('versao_preparacao') == VERSAO_PREPARACAO
+        and manifesto.get('dinheiro_float32') == dinheiro_float32
+        and manifesto.get('segmentos')
+        and all(os.path.exists(os.path.join(DIRETORIO_CACHE, nome)) for nome in manifesto['segmentos'])
+    ):
+        tamanho = manifesto.get('tamanho')
+
+        if tamanho == estado.st_size:
+            if manifesto.get('mtime_ns') == estado.st_mtime_ns:
+                return _ler_segmentos(manifesto), tamanho
+
+            # mtime alterado (ex.: cópia ou `touch`): conferir o conteúdo antes de reconstruir
+            sha256 = _hash_arquivo(caminho)
+            if manifesto.get('sha256') == sha256:
+                manifesto['mtime_ns'] = estado.st_mtime_ns
+                try:
+                    _gravar_manifesto(caminho_manifesto, manifesto)
+                except OSError:
+                    pass
+                return _ler_segmentos(manifesto), tamanho
+
+        elif tamanho < estado.st_size and manifesto.get('assinatura') == _assinatura(caminho, tamanho):
+            # O CSV só recebeu linhas novas: ler apenas o trecho acrescentado
+            vendas = _ler_segmentos(manifesto)
+            novas, deslocamento = _ler_acrescimo(caminho, tamanho, dinheiro_float32)
+            if novas is None:
+                return vendas, tamanho
+
+            vendas = concat_vendas([vendas, novas])
+            try:
+                vendas = _anexar_ao_cache(caminho, manifesto, vendas, novas, deslocamento, estado)
+            except OSError:
+                pass
+            return vendas, deslocamento
+
+    if sha256 is None:
+        sha256 = _hash_arquivo(caminho)
+    vendas, relatorio = prepare_vendas(pd.read_csv(caminho, dtype=TIPOS_CSV), dinheiro_float32)
+
+    # Falhas de escrita (ex.: diretório somente leitura) apenas desativam o cache. Gravado o cache,
+    # as vendas lidas do CSV dão lugar ao arquivo mapeado, compartilhado com os demais processos
+    try:
+        os.makedirs(DIRETORIO_CACHE, exist_ok=True)
+        _gravar_feather(vendas, caminho_feather)
+        vendas = _mapear_feather(caminho_feather)
+        _gravar_manifesto(caminho_manifesto, {
+            'origem': caminho,
+            'versao_preparacao': VERSAO_PREPARACAO,
+            'dinheiro_float32': dinheiro_float32,
+            'memoria': relatorio,
+            'segmentos': [os.path.basename(caminho_feather)],
+            'tamanho': estado.st_size,
+            'mtime_ns': estado.st_mtime_ns,
+            'assinatura': _assinatura(caminho, estado.st_size),
+            'sha256': sha256
+        })
+        if manifesto is not None:
+            _remover_segmentos(set(manifesto.get('segmentos', [])) - {os.path.basename(caminho_feather)})
+    except OSError:
+        pass
+
+    return vendas, estado.st_size
+
+
+@profiled('carga')
+def load_vendas(caminho=CAMINHO_VENDAS, usar_cache=True, dinheiro_float32=DINHEIRO_FLOAT32):
+    """
+    Carrega o DataFrame de vendas já preparado, usando um cache colunar (Feather) quando possível.
+
+    O cache é válido enquanto o CSV tiver o mesmo mtime e tamanho registrados no manifesto; se só o
+    mtime mudar, o hash SHA-256 do conteúdo decide se o CSV de fato foi alterado. Se o CSV apenas
+    cresceu (o trecho já lido continua igual), só as linhas novas são lidas e gravadas como um
+    segmento extra do cache.
+
+    O cache é lido por memory map e sem cópia nas colunas numéricas e de datas: vários processos
+    (ex.: servidores Streamlit atrás de um balanceador) compartilham a mesma memória, e o DataFrame
+    retornado é somente leitura nessas colunas.
+    """
+    # Sessões e processos que carregam o mesmo CSV ao mesmo tempo (ex.: logo após a atualização dos
+    # dados) esperam uma única reconstrução do cache; os demais processos depois só o mapeiam
+    vendas, deslocamento = single_flight(
+        'carga', (os.path.abspath(caminho), usar_cache, dinheiro_float32),
+        lambda: _carregar(caminho, usar_cache, dinheiro_float32), entre_processos=usar_cache
+    )
+    register_data_version(vendas, _versao_dados(caminho, deslocamento, dinheiro_float32))
+    return vendas
+
+
+def clear_vendas_cache(caminho=CAMINHO_VENDAS):
+    """
+    Remove o cache colunar (manifesto e segmentos Feather) de um CSV de vendas e as vendas mantidas em memória.
+    """
+    caminho_feather, caminho_manifesto = _caminhos_cache(caminho)
+    manifesto = _ler_manifesto(caminho_manifesto) or {}
+
+    with _lock_incremental:
+        _vendas_em_memoria.pop(caminho, None)
+
+    _remover_segmentos(set(manifesto.get('segmentos', [])) | {os.path.basename(caminho_feather)})
+    try:
+        os.remove(caminho_manifesto)
+    except OSError:
+        pass
+
+
+@profiled('carga')
+def load_vendas_incremental(caminho=CAMINHO_VENDAS, dinheiro_float32=DINHEIRO_FLOAT32):
+    """
+    Mantém as vendas em memória e, a cada chamada, incorpora apenas as linhas acrescentadas ao CSV.
+
+    Sem mudanças no arquivo, devolve o mesmo DataFrame ao custo de um `os.stat`. Se o CSV só cresceu,
+    lê a partir do último byte processado e soma as linhas novas à tabela, ao cache em disco, aos
+    pré-agregados e ao índice bitmap já construídos; qualquer outra alteração recarrega tudo pelo cache colunar, como
+    `load_vendas` (e com a mesma execução única por CSV entre sessões e processos).
+    """
+    with _lock_incremental:
+        estado = os.stat(caminho)
+        anterior = _vendas_em_memoria.get(caminho)
+
+        if anterior is not None:
+            vendas, deslocamento, mtime_ns, assinatura = anterior
+
+            if estado.st_size == deslocamento and estado.st_mtime_ns == mtime_ns:
+                return vendas
+
+            if estado.st_size > deslocamento and _assinatura(caminho, deslocamento) == assinatura:
+                novas, novo_deslocamento = _ler_acrescimo(caminho, deslocamento, dinheiro_float32)
+
+                if novas is not None:
+                    atualizadas = concat_vendas([vendas, novas])
+
+                    manifesto = _ler_manifesto(_caminhos_cache(caminho)[1])
+                    if (
+                        manifesto is not None
+                        and manifesto.get('versao_preparacao') == VERSAO_PREPARACAO
+                        and manifesto.get('dinheiro_float32') == dinheiro_float32
+                        and manifesto.get('tamanho') == deslocamento
+                    ):
+                        try:
+                            atualizadas = _anexar_ao_cache(caminho, manifesto, atualizadas, novas, novo_deslocamento, estado)
+                        except OSError:
+                            pass
+
+                    append_pre_aggregates(atualizadas, vendas, novas)
+                    append_bitmap_index(atualizadas, vendas, novas)
+
+                    logger.info('%d vendas novas incorporadas de %s', len(novas), caminho)
+                    vendas = atualizadas
+                    register_data_version(vendas, _versao_dados(caminho, novo_deslocamento, dinheiro_float32))
+
+                _vendas_em_memoria[caminho] = (
+                    vendas, novo_deslocamento, estado.st_mtime_ns, _assinatura(caminho, novo_deslocamento)
+                )
+                return vendas
+
+        vendas, deslocamento = single_flight(
+            'carga', (os.path.abspath(caminho), True, dinheiro_float32),
+            lambda: _carregar(caminho, True, dinheiro_float32), entre_processos=True
+        )
+        register_data_version(vendas, _versao_dados(caminho, deslocamento, dinheiro_float32))
+        _vendas_em_memoria[caminho] = (vendas, deslocamento, estado.st_mtime_ns, _assinatura(caminho, deslocamento))
+
+        return vendas
+
+
+@profiled('carga')
+def load_vendas_streaming(caminho=CAMINHO_VENDAS, linhas_por_bloco=LINHAS_POR_BLOCO,
+                          fracao_amostra=FRACAO_AMOSTRA, semente=42, dinheiro_float32=DINHEIRO_FLOAT32):
+    """
+    Lê o CSV em blocos, somando cada bloco ao cubo e às agregações diárias sem manter a tabela.
+
+    Retorna a amostra das linhas (vazia quando `fracao_amostra` é 0), já com o cubo e as agregações
+    diárias de TODAS as vendas registrados nela; `rollup_vendas` sobre a amostra responde pelo arquivo
+    inteiro, com o filtro de datas valendo em dias completos.
+    """
+    gerador = np.random.default_rng(semente)
+    amostras = []
+    tamanho = os.path.getsize(caminho)
+
+    def blocos():
+        for bloco in pd.read_csv(caminho, dtype=TIPOS_CSV, chunksize=linhas_por_bloco):
+            bloco = _derivar_colunas(bloco).astype(ESQUEMA_VENDAS)
+
+            if fracao_amostra > 0:
+                amostras.append(bloco[gerador.random(len(bloco)) < fracao_amostra])
+            elif not amostras:
+                amostras.append(bloco.iloc[:0])
+
+            logger.debug('Bloco de %d vendas agregado', len(bloco))
+            yield bloco
+
+    cubo, diario = fold_pre_aggregates(blocos())
+
+    # Concatenar sem categorias e reaplicar o esquema para unificar as categorias dos blocos
+    amostra = pd.concat(
+        [bloco.astype({coluna: object for coluna, tipo in ESQUEMA_VENDAS.items() if tipo == 'category'})
+         for bloco in amostras],
+        ignore_index=True
+    )
+    amostra, _ = apply_compact_schema(amostra, dinheiro_float32)
+
+    register_pre_aggregates(amostra, cubo, diario)
+    # As consultas respondem pelo arquivo inteiro; a amostra depende da fração e da semente
+    register_data_version(amostra, _versao_dados(caminho, tamanho, dinheiro_float32, 'streaming', fracao_amostra, semente))
+    logger.info('Leitura em blocos concluída: %d vendas agregadas, amostra de %d linhas',
+                int(cubo['cubo']['id_venda'].sum()), len(amostra))
+
+    return amostra
+
+
+def _origem_csv(caminho, tamanho, estado):
+    # Trecho do CSV refletido no banco SQL (e a preparação usada), gravado no próprio banco
+    return {
+        'tamanho': tamanho,
+        'mtime_ns': estado.st_mtime_ns,
+        'assinatura': _assinatura(caminho, tamanho),
+        'versao_preparacao': VERSAO_PREPARACAO
+    }
+
+
+def _atualizar_banco(caminho, banco, estado, linhas_por_bloco):
+    # Deixa o banco igual ao CSV: nada, só as linhas acrescentadas (SQLite) ou o banco refeito
+    origem = banco.read_origin()
+
+    if (
+        origem is not None
+        and origem.get('versao_preparacao') == VERSAO_PREPARACAO
+        and origem['tamanho'] <= estado.st_size
+        and origem['assinatura'] == _assinatura(caminho, origem['tamanho'])
+    ):
+        if origem['tamanho'] == estado.st_size and origem['mtime_ns'] == estado.st_mtime_ns:
+            return origem
+
+        # O CSV só cresceu: no SQLite, acrescentar apenas as linhas novas
+        if origem['tamanho'] < estado.st_size and banco.motor == 'sqlite':
+            novas, deslocamento = _ler_acrescimo(caminho, origem['tamanho'], False)
+            if novas is None:
+                return origem
+
+            nova_origem = _origem_csv(caminho, deslocamento, estado)
+            if banco.append(novas, nova_origem, origem):
+                logger.info('%d vendas novas acrescentadas ao banco %s', len(novas), banco.current_file())
+                return nova_origem
+
+    def blocos():
+        for bloco in pd.read_csv(caminho, dtype=TIPOS_CSV, chunksize=linhas_por_bloco):
+            yield _derivar_colunas(bloco).astype(ESQUEMA_VENDAS)
+
+    origem = _origem_csv(caminho, estado.st_size, estado)
+    banco.rebuild(blocos(), origem)
+    logger.info('Banco %s criado a partir de %s', banco.current_file(), caminho)
+
+    return origem
+
+
+def _vendas_do_banco(caminho, banco):
+    # DataFrame vazio com o esquema das vendas preparadas e as categorias existentes no banco
+    vendas = prepare_vendas(pd.read_csv(caminho, dtype=TIPOS_CSV, nrows=0))[0]
+    for coluna, tipo in ESQUEMA_VENDAS.items():
+        if tipo == 'category':
+            vendas[coluna] = vendas[coluna].cat.set_categories(banco.distinct_values(coluna))
+    return vendas
+
+
+@profiled('carga')
+def load_vendas_sql(caminho=CAMINHO_VENDAS, motor=BACKEND_SQL or 'auto', linhas_por_bloco=LINHAS_POR_BLOCO):
+    """
+    Mantém as vendas em um banco local (SQLite, ou DuckDB) em DIRETORIO_CACHE e retorna um DataFrame
+    vazio com o esquema delas, cujas consultas (`rollup_vendas`, `rollup_marginals`) vão ao banco.
+
+    O banco é criado em blocos, sem carregar o CSV inteiro. Se o CSV só cresceu, as linhas novas são
+    acrescentadas (no DuckDB, o banco é refeito); qualquer outra alteração refaz o banco. Sem mudanças
+    no arquivo, devolve o mesmo DataFrame. Vários processos podem compartilhar o mesmo banco.
+    """
+    motor = resolve_engine(motor)
+    nome = os.path.splitext(os.path.basename(caminho))[0]
+
+    with _lock_incremental:
+        estado = os.stat(caminho)
+        anterior = _vendas_sql.get((caminho, motor))
+
+        if anterior is not None and anterior[3] == (estado.st_size, estado.st_mtime_ns):
+            return anterior[0]
+
+        banco = anterior[1] if anterior is not None else SalesDatabase(DIRETORIO_CACHE, nome, motor)
+        # Um processo por vez atualiza o banco; os demais encontram a origem já atualizada
+        origem = single_flight(
+            'banco_sql', (os.path.abspath(caminho), motor),
+            lambda: _atualizar_banco(caminho, banco, estado, linhas_por_bloco), entre_processos=True
+        )
+
+        if anterior is not None and anterior[2] == origem:
+            vendas = anterior[0]
+        else:
+            vendas = _vendas_do_banco(caminho, banco)
+            register_sql_backend(vendas, banco)
+            register_data_version(vendas, _versao_dados(caminho, origem['tamanho'], 'sql'))
+
+        _vendas_sql[(caminho, motor)] = (vendas, banco, origem, (estado.st_size, estado.st_mtime_ns))
+        return vendas
@@ -0,0 +1,189 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.filter_engine import normalize_filters
+from utils.profiler import current_profile, finish_profile, start_profile
+from utils.report_exporter import export_to_pdf, export_to_ppt
+
+logger = logging.getLogger(__name__)
+
+# Formatos de exportação: função geradora, extensão e tipo MIME do arquivo
+FORMATOS_EXPORTACAO = {
+    'pdf': (export_to_pdf, 'pdf', 'application/pdf'),
+    'pptx': (export_to_ppt, 'pptx', 'application/vnd.openxmlformats-officedocument.presentationml.presentation')
+}
+
+# Artefatos prontos ficam em disco e são reaproveitados por qualquer sessão (e entre reinícios)
+DIRETORIO_ARTEFATOS = 'data/.cache/exports'
+MAX_ARTEFATOS = 64
+
+# Exportações executadas ao mesmo tempo; as demais aguardam na fila
+MAX_EXPORTACOES_SIMULTANEAS = 2
+
+# Incrementar quando o conteúdo dos relatórios mudar, para não servir artefatos antigos
+VERSAO_EXPORTACAO = 1
+
+ESTADOS_ATIVOS = ('na_fila', 'executando')
+
+_executor = ThreadPoolExecutor(max_workers=MAX_EXPORTACOES_SIMULTANEAS, thread_name_prefix='exportacao')
+_jobs = {}
+_lock = threading.Lock()
+
+
+class ExportCancelled(Exception):
+    """
+    Interrompe uma exportação cancelada por todos os interessados.
+    """
+
+
+class ExportJob:
+    """
+    Estado de uma exportação: andamento, resultado e quantas sessões aguardam por ela.
+    """
+
+    def __init__(self, chave, formato, filtros, perfilar=False):
+        self.chave = chave
+        self.formato = formato
+        self.filtros = filtros
+        self.estado = 'na_fila'
+        self.progresso = 0.0
+        self.etapa = 'Aguardando na fila'
+        self.caminho = None
+        self.erro = None
+        self.interessados = 1
+        self.future = None
+        # Medição da exportação (quando pedida por uma execução com medição ativa) e seu Chrome Trace
+        self.perfilar = perfilar
+        self.perfil = None
+        self.caminho_trace = None
+        self._cancelar = threading.Event()
+
+    @property
+    def mime(self):
+        return FORMATOS_EXPORTACAO[self.formato][2]
+
+    def atualizar(self, fracao, etapa):
+        # Chamado pela função de exportação a cada etapa; é o ponto onde o cancelamento tem efeito
+        if self._cancelar.is_set():
+            raise ExportCancelled()
+        self.progresso = fracao
+        self.etapa = etapa
+
+    def read_bytes(self):
+        with open(self.caminho, 'rb') as arquivo:
+            return arquivo.read()
+
+
+def _chave_exportacao(formato, insights_data, filtros):
+    # O relatório depende só dos insights e dos filtros, então a chave serve entre sessões e reinícios
+    conteudo = json.dumps(
+        [VERSAO_EXPORTACAO, formato, filtros, insights_data],
+        sort_keys=True,
+        default=str
+    )
+    return hashlib.sha256(conteudo.encode('utf-8')).hexdigest()
+
+
+def _caminho_artefato(chave, formato):
+    return os.path.join(DIRETORIO_ARTEFATOS, f'{chave}.{FORMATOS_EXPORTACAO[formato][1]}')
+
+
+def _limitar_artefatos():
+    # Remove os artefatos mais antigos além de MAX_ARTEFATOS
+    try:
+        caminhos = [os.path.join(DIRETORIO_ARTEFATOS, nome) for nome in os.listdir(DIRETORIO_ARTEFATOS)]
+        caminhos.sort(key=os.path.getmtime, reverse=True)
+        for caminho in caminhos[MAX_ARTEFATOS:]:
+            os.remove(caminho)
+    except OSError:
+        pass
+
+
+def _limitar_jobs():
+    # Chamado com o lock adquirido: esquece os jobs já encerrados mais antigos
+    encerrados = [chave for chave, job in _jobs.items() if job.estado not in ESTADOS_ATIVOS]
+    for chave in encerrados[:max(0, len(_jobs) - MAX_ARTEFATOS)]:
+        del _jobs[chave]
+
+
+def _executar(job, insights_data):
+    exportar = FORMATOS_EXPORTACAO[job.formato][0]
+    perfil = start_profile(f'exportação {job.formato}', job.perfilar)
+
+    try:
+        job.estado = 'executando'
+        buffer = exportar(None, None, insights_data, *job.filtros, progresso=job.atualizar)
+
+        caminho = _caminho_artefato(job.chave, job.formato)
+        os.makedirs(DIRETORIO_ARTEFATOS, exist_ok=True)
+        temporario = caminho + '.tmp'
+        with open(temporario, 'wb') as arquivo:
+            arquivo.write(buffer.getvalue())
+        os.replace(temporario, caminho)
+        _limitar_artefatos()
+
+        job.caminho = caminho
+        job.progresso, job.etapa = 1.0, 'Concluído'
+        job.estado = 'concluido'
+    except ExportCancelled:
+        job.estado = 'cancelado'
+    except Exception as erro:
+        logger.exception('Falha ao exportar %s', job.formato)
+        job.erro = str(erro)
+        job.estado = 'erro'
+    finally:
+        if perfil is not None:
+            finish_profile(perfil)
+            job.caminho_trace = perfil.write_trace()
+            job.perfil = perfil
+
+
+def submit_export(formato, insights_data, filtro_periodo=None, filtro_categorias=None, filtro_canais=None):
+    """
+    Enfileira a exportação (`'pdf'` ou `'pptx'`) e retorna o `ExportJob` que a acompanha.
+
+    Pedidos idênticos (mesmo formato, filtros e insights) compartilham o mesmo job, e artefatos já
+    gerados são servidos direto do disco, sem nova exportação.
+    """
+    filtros = normalize_filters(filtro_periodo, filtro_categorias, filtro_canais)
+    chave = _chave_exportacao(formato, insights_data, filtros)
+
+    with _lock:
+        job = _jobs.get(chave)
+        if job is not None and (job.estado in ESTADOS_ATIVOS or job.estado == 'concluido' and os.path.exists(job.caminho)):
+            job.interessados += 1
+            return job
+
+        job = ExportJob(chave, formato, filtros, perfilar=current_profile() is not None)
+        _jobs[chave] = job
+        _limitar_jobs()
+
+        caminho = _caminho_artefato(chave, formato)
+        if os.path.exists(caminho):
+            job.caminho = caminho
+            job.progresso, job.etapa = 1.0, 'Concluído'
+            job.estado = 'concluido'
+            return job
+
+        job.future = _executor.submit(_executar, job, insights_data)
+
+    return job
+
+
+def cancel_export(job):
+    """
+    Retira o interesse de uma sessão no job; a exportação só é interrompida quando ninguém mais a aguarda.
+    """
+    with _lock:
+        job.interessados -= 1
+        if job.interessados > 0 or job.estado not in ESTADOS_ATIVOS:
+            return
+
+        job._cancelar.set()
+        if job.future is not None and job.future.cancel():
+            job.estado = 'cancelado'
+        _jobs.pop(job.chave, None)
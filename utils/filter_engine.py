@@ -0,0 +1,104 @@
+import threading
+import weakref
+from collections import OrderedDict
+
+import pandas as pd
+
+from utils.bitmap_index import bitmap_mask, filter_bitmap, registered_bitmap_index
+from utils.profiler import profiled
+
+# Máscaras dos filtros da sidebar e resultados memorizados por combinação de filtros. A visão
+# filtrada compartilhada por gráficos, insights e abas (um recorte da tabela por combinação de
+# filtros) foi substituída pelos pré-agregados do `olap_cube`, que respondem às mesmas consultas
+# sem materializar as linhas filtradas; ficaram a máscara, usada nas consultas que ainda leem
+# linhas, e o cache de resultados caros por filtro.
+
+# Quantidade máxima de resultados (combinações de filtros) mantidos em memória
+MAX_FILTROS_EM_CACHE = 32
+
+_cache_resultados = OrderedDict()
+_lock = threading.Lock()
+
+
+def normalize_filters(filtro_periodo=None, filtro_categorias=None, filtro_canais=None):
+    """
+    Converte os filtros da sidebar em uma chave imutável (listas vazias equivalem a "sem filtro").
+    """
+    periodo = tuple(pd.Timestamp(data) for data in filtro_periodo) if filtro_periodo else None
+    categorias = tuple(sorted(filtro_categorias)) if filtro_categorias else None
+    canais = tuple(sorted(filtro_canais)) if filtro_canais else None
+
+    return periodo, categorias, canais
+
+
+@profiled('filtro')
+def build_filter_mask(vendas, filtro_periodo=None, filtro_categorias=None, filtro_canais=None):
+    """
+    Monta a máscara booleana combinada dos filtros, ou None quando nenhum filtro se aplica.
+
+    Se `vendas` tem um índice bitmap montado (`get_bitmap_index`), categorias e canais são
+    filtrados pelos bitmaps em vez de comparar os valores linha a linha.
+    """
+    mascara = None
+
+    if filtro_periodo:
+        data_inicio, data_fim = filtro_periodo
+        mascara = (vendas['data_venda'] >= data_inicio) & (vendas['data_venda'] <= data_fim)
+
+    indice = registered_bitmap_index(vendas) if filtro_categorias or filtro_canais else None
+    if indice is not None:
+        bits = filter_bitmap(indice, {'categoria': filtro_categorias, 'canal_venda': filtro_canais})
+        mascara_bitmap = pd.Series(bitmap_mask(bits, len(vendas)), index=vendas.index)
+        return mascara_bitmap if mascara is None else mascara & mascara_bitmap
+
+    if filtro_categorias:
+        mascara_categorias = vendas['categoria'].isin(filtro_categorias)
+        mascara = mascara_categorias if mascara is None else mascara & mascara_categorias
+
+    if filtro_canais:
+        mascara_canais = vendas['canal_venda'].isin(filtro_canais)
+        mascara = mascara_canais if mascara is None else mascara & mascara_canais
+
+    return mascara
+
+
+def _descartar_frame(id_frame):
+    # Remove os resultados de um DataFrame que foi coletado pelo garbage collector
+    with _lock:
+        for chave in [chave for chave in _cache_resultados if chave[0] == id_frame]:
+            del _cache_resultados[chave]
+
+
+def _guardar(chave, vendas, valor):
+    # Chamado com o lock adquirido
+    if not any(existente[0] == id(vendas) for existente in _cache_resultados):
+        weakref.finalize(vendas, _descartar_frame, id(vendas))
+
+    _cache_resultados[chave] = (weakref.ref(vendas), valor)
+    _cache_resultados.move_to_end(chave)
+
+    while len(_cache_resultados) > MAX_FILTROS_EM_CACHE:
+        _cache_resultados.popitem(last=False)
+
+
+def get_filter_result(vendas, nome, calcular, filtro_periodo=None, filtro_categorias=None, filtro_canais=None):
+    """
+    Retorna `calcular()` memorizado por DataFrame de vendas, `nome` e combinação de filtros.
+
+    Usado para resultados caros derivados dos filtros (ex.: os insights), que assim só são
+    recalculados quando os filtros ou os dados mudam. O resultado NÃO deve ser modificado.
+    """
+    chave = (id(vendas), nome) + normalize_filters(filtro_periodo, filtro_categorias, filtro_canais)
+
+    with _lock:
+        entrada = _cache_resultados.get(chave)
+        if entrada is not None and entrada[0]() is vendas:
+            _cache_resultados.move_to_end(chave)
+            return entrada[1]
+
+    resultado = calcular()
+
+    with _lock:
+        _guardar(chave, vendas, resultado)
+
+    return resultado
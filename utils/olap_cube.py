@@ -0,0 +1,601 @@
+import os
+import threading
+import weakref
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from utils.bitmap_index import bitmap_contains, filter_bitmap, registered_bitmap_index
+from utils.filter_engine import build_filter_mask, normalize_filters
+from utils.profiler import profiled
+from utils.result_cache import cache_result
+from utils.single_flight import AUSENTE, single_flight
+
+# Dimensões e métricas mantidas no cubo pré-agregado
+DIMENSOES_CUBO = ['periodo', 'categoria', 'canal_venda', 'modelo', 'hora', 'dia_semana']
+METRICAS_CUBO = ['id_venda', 'preco_venda', 'custo', 'lucro']
+
+# Dimensões das agregações diárias (somas de prefixo por dia para cada combinação)
+DIMENSOES_DIARIAS = ['categoria', 'canal_venda', 'modelo']
+DIMENSOES_DIA = ['dia', 'periodo', 'dia_semana'] + DIMENSOES_DIARIAS
+
+# Agregação diária por horário (sem modelo, que não é filtro nem dimensão das análises por hora)
+DIMENSOES_DIA_HORA = ['dia', 'periodo', 'dia_semana', 'hora', 'categoria', 'canal_venda']
+
+# Nomes dos dias da semana na ordem de `dt.dayofweek` (0 = segunda-feira)
+NOMES_DIAS_SEMANA = ['Segunda-feira', 'Terça-feira', 'Quarta-feira', 'Quinta-feira', 'Sexta-feira', 'Sábado', 'Domingo']
+
+# Agregação incremental (DASHBOARD_INCREMENTAL): quando a seleção de categorias ou canais muda
+# por um único valor, só a contribuição desse valor é consultada e somada ou subtraída do resultado
+# anterior. Compensa quando o custo da consulta cresce com as linhas selecionadas (backend SQL);
+# nos pré-agregados em memória, a consulta do delta custa o mesmo que a completa. `auto` ativa só
+# com backend SQL; `1` sempre; `0` nunca.
+AGREGACAO_INCREMENTAL = os.environ.get('DASHBOARD_INCREMENTAL', 'auto')
+
+# Estados mantidos para a agregação incremental: quantidade máxima (LRU) e de deltas seguidos
+# sobre um mesmo estado antes de recalculá-lo por inteiro (limita o acúmulo de arredondamentos)
+MAX_ESTADOS_INCREMENTAIS = 64
+MAX_DELTAS_ENCADEADOS = 16
+
+# Combinações de filtros lembradas por consulta (dimensões e período)
+ESTADOS_POR_CONSULTA = 4
+
+_pre_agregados = {}
+_lock = threading.Lock()
+
+# (id das vendas, consulta, dimensões, período) -> (referência fraca, [(categorias, canais, resultado, deltas)])
+_estados_incrementais = OrderedDict()
+
+
+def _agregar_linhas(df, dimensoes):
+    # Soma e contagem das vendas por `dimensoes`, derivando o dia da semana quando necessário
+    chaves = []
+    for dimensao in dimensoes:
+        if dimensao == 'dia_semana' and 'dia_semana' not in df.columns:
+            chaves.append(df['data_venda'].dt.dayofweek.rename('dia_semana'))
+        elif dimensao == 'dia' and 'dia' not in df.columns:
+            chaves.append(df['data_venda'].dt.normalize().rename('dia'))
+        else:
+            chaves.append(df[dimensao])
+
+    return df.groupby(chaves, observed=True).agg(
+        id_venda=('id_venda', 'count'),
+        preco_venda=('preco_venda', 'sum'),
+        custo=('custo', 'sum'),
+        lucro=('lucro', 'sum')
+    ).reset_index()
+
+
+def _montar_cubo(cubo, linhas_por_periodo):
+    return {
+        'cubo': cubo,
+        'periodos': sorted(cubo['periodo'].unique()),
+        'linhas_por_periodo': linhas_por_periodo
+    }
+
+
+def _inicio_por_dia(tabela, dias):
+    # Posição da primeira linha de cada dia na tabela ordenada por dia (mais o fim da tabela)
+    indice_dia = (tabela['dia'] - dias[0]).dt.days.to_numpy() if len(dias) else np.array([], dtype=int)
+    return indice_dia, np.searchsorted(indice_dia, np.arange(len(dias) + 1))
+
+
+def _montar_diario(diario, diario_hora, linhas_por_dia):
+    if diario.empty:
+        dias = pd.DatetimeIndex([])
+    else:
+        dias = pd.date_range(diario['dia'].iloc[0], diario['dia'].iloc[-1], freq='D')
+
+    agrupamento = diario.groupby(DIMENSOES_DIARIAS, observed=True)
+    combinacoes = agrupamento.size().reset_index()[DIMENSOES_DIARIAS]
+    codigos = agrupamento.ngroup().to_numpy()
+    indice_dia, inicio_por_dia = _inicio_por_dia(diario, dias)
+
+    prefixo = np.zeros((len(dias) + 1, len(combinacoes), len(METRICAS_CUBO)))
+    prefixo[indice_dia + 1, codigos] = diario[METRICAS_CUBO].to_numpy(dtype='float64')
+    np.cumsum(prefixo, axis=0, out=prefixo)
+
+    return {
+        'diario': diario,
+        'diario_hora': diario_hora,
+        'dias': dias,
+        'inicio_por_dia': inicio_por_dia,
+        'inicio_por_dia_hora': _inicio_por_dia(diario_hora, dias)[1],
+        'combinacoes': combinacoes,
+        'prefixo': prefixo,
+        'linhas_por_dia': linhas_por_dia
+    }
+
+
+@profiled('agregacao')
+def build_cube(vendas):
+    """
+    Pré-agrega as vendas por período × categoria × canal × modelo × hora × dia da semana.
+
+    Também guarda as posições das linhas de cada período, usadas para tratar com exatidão
+    os meses cortados pelo filtro de datas.
+    """
+    return _montar_cubo(
+        _agregar_linhas(vendas, DIMENSOES_CUBO),
+        vendas.groupby('periodo', observed=True).indices
+    )
+
+
+@profiled('agregacao')
+def build_daily_aggregates(vendas):
+    """
+    Pré-agrega as vendas por dia × categoria × canal × modelo, com somas de prefixo por dia.
+
+    `prefixo[i]` acumula as métricas de todos os dias anteriores a `dias[i]`, de modo que o total
+    de qualquer intervalo de dias completos sai de uma subtração. `diario_hora` guarda as mesmas
+    vendas por dia × hora × categoria × canal, para as análises por horário. As posições das linhas
+    de cada dia permitem ler da tabela apenas os dias de borda cortados pelo filtro.
+    """
+    return _montar_diario(
+        _agregar_linhas(vendas, DIMENSOES_DIA),
+        _agregar_linhas(vendas, DIMENSOES_DIA_HORA),
+        vendas.groupby(vendas['data_venda'].dt.normalize()).indices
+    )
+
+
+def _acumular(acumulado, parcial, dimensoes):
+    # Soma um agregado parcial ao acumulado (as métricas são todas aditivas)
+    if acumulado is None:
+        return parcial
+
+    base = pd.concat([acumulado, parcial], ignore_index=True)
+    return base.groupby(dimensoes, observed=True)[METRICAS_CUBO].sum().reset_index()
+
+
+def _como_categorias(tabela):
+    # Blocos com categorias diferentes viram `object` ao serem concatenados
+    for coluna in ['periodo'] + DIMENSOES_DIARIAS:
+        if coluna in tabela.columns:
+            tabela[coluna] = tabela[coluna].astype(object).astype('category')
+    return tabela
+
+
+def fold_pre_aggregates(blocos):
+    """
+    Constrói o cubo e as agregações diárias somando blocos de vendas já preparados, um de cada vez.
+
+    Só os agregados ficam em memória, então a tabela completa nunca precisa caber na RAM. Como não
+    há posições de linhas, os dias de borda cortados pelo filtro de datas (e, no cubo, os meses
+    cortados) ficam de fora das consultas: o filtro passa a valer em dias completos.
+    """
+    cubo = diario = diario_hora = None
+
+    for bloco in blocos:
+        cubo = _acumular(cubo, _agregar_linhas(bloco, DIMENSOES_CUBO), DIMENSOES_CUBO)
+        diario = _acumular(diario, _agregar_linhas(bloco, DIMENSOES_DIA), DIMENSOES_DIA)
+        diario_hora = _acumular(diario_hora, _agregar_linhas(bloco, DIMENSOES_DIA_HORA), DIMENSOES_DIA_HORA)
+
+    if cubo is None:
+        raise ValueError('Nenhum bloco de vendas para agregar')
+
+    return (
+        _montar_cubo(_como_categorias(cubo), {}),
+        _montar_diario(_como_categorias(diario), _como_categorias(diario_hora), {})
+    )
+
+
+def _descartar_pre_agregados(id_frame):
+    with _lock:
+        for cache in (_pre_agregados, _estados_incrementais):
+            for chave in [chave for chave in cache if chave[0] == id_frame]:
+                del cache[chave]
+
+
+def _registrar(vendas, nome, resultado):
+    with _lock:
+        novo_frame = not any(chave[0] == id(vendas) for chave in _pre_agregados)
+        _pre_agregados[(id(vendas), nome)] = (weakref.ref(vendas), resultado)
+    if novo_frame:
+        weakref.finalize(vendas, _descartar_pre_agregados, id(vendas))
+
+
+def _registrado(vendas, nome):
+    with _lock:
+        entrada = _pre_agregados.get((id(vendas), nome))
+    return entrada[1] if entrada is not None and entrada[0]() is vendas else None
+
+
+def _obter_pre_agregado(vendas, nome, construir):
+    # Constrói cada pré-agregado apenas uma vez por DataFrame de vendas; sessões simultâneas
+    # esperam pela mesma construção
+    def consultar():
+        resultado = _registrado(vendas, nome)
+        return AUSENTE if resultado is None else resultado
+
+    def calcular():
+        resultado = construir(vendas)
+        _registrar(vendas, nome, resultado)
+        return resultado
+
+    return single_flight('pre_agregados', (id(vendas), nome), calcular, consultar)
+
+
+def register_pre_aggregates(vendas, cubo, diario):
+    """
+    Associa a `vendas` um cubo e agregações diárias construídos externamente (ex.: por blocos).
+
+    `vendas` pode ser apenas uma amostra ou um DataFrame vazio com as mesmas colunas: as consultas
+    passam a ser respondidas pelos agregados registrados.
+    """
+    _registrar(vendas, 'cubo', cubo)
+    _registrar(vendas, 'diario', diario)
+
+
+def register_sql_backend(vendas, banco):
+    """
+    Associa a `vendas` (um DataFrame vazio com o esquema das vendas) um `SalesDatabase`: as
+    consultas passam a ser feitas no banco, com os filtros e agrupamentos em SQL.
+    """
+    _registrar(vendas, 'sql', banco)
+
+
+def _unir_posicoes(posicoes, novas_posicoes, deslocamento):
+    # Posições das linhas novas vêm depois das `deslocamento` linhas já existentes
+    unidas = dict(posicoes)
+    for chave, indices in novas_posicoes.items():
+        indices = indices + deslocamento
+        unidas[chave] = np.concatenate([unidas[chave], indices]) if chave in unidas else indices
+    return unidas
+
+
+def append_pre_aggregates(vendas, anteriores, novas):
+    """
+    Registra para `vendas` (`anteriores` seguidas de `novas`) os pré-agregados já construídos de
+    `anteriores` somados aos das linhas novas, sem reagregar a tabela inteira.
+
+    Pré-agregados que `anteriores` ainda não tinha serão construídos na primeira consulta.
+    """
+    with _lock:
+        entradas = {
+            nome: entrada[1] for (id_frame, nome), entrada in _pre_agregados.items()
+            if id_frame == id(anteriores) and entrada[0]() is anteriores
+        }
+
+    if 'cubo' in entradas:
+        cubo = entradas['cubo']
+        _registrar(vendas, 'cubo', _montar_cubo(
+            _como_categorias(_acumular(cubo['cubo'], _agregar_linhas(novas, DIMENSOES_CUBO), DIMENSOES_CUBO)),
+            _unir_posicoes(cubo['linhas_por_periodo'], novas.groupby('periodo', observed=True).indices, len(anteriores))
+        ))
+
+    if 'diario' in entradas:
+        diario = entradas['diario']
+        _registrar(vendas, 'diario', _montar_diario(
+            _como_categorias(_acumular(diario['diario'], _agregar_linhas(novas, DIMENSOES_DIA), DIMENSOES_DIA)),
+            _como_categorias(_acumular(
+                diario['diario_hora'], _agregar_linhas(novas, DIMENSOES_DIA_HORA), DIMENSOES_DIA_HORA
+            )),
+            _unir_posicoes(
+                diario['linhas_por_dia'], novas.groupby(novas['data_venda'].dt.normalize()).indices, len(anteriores)
+            )
+        ))
+
+
+def get_cube(vendas):
+    """
+    Retorna o cubo de `vendas`, construindo-o apenas na primeira chamada para esse DataFrame.
+    """
+    return _obter_pre_agregado(vendas, 'cubo', build_cube)
+
+
+def get_daily_aggregates(vendas):
+    """
+    Retorna as agregações diárias de `vendas`, construindo-as apenas na primeira chamada.
+    """
+    return _obter_pre_agregado(vendas, 'diario', build_daily_aggregates)
+
+
+def _classificar_periodos(periodos, filtro_periodo):
+    # Separa os meses cobertos inteiramente pelo filtro dos meses cortados por ele
+    data_inicio, data_fim = filtro_periodo
+    completos, parciais = [], []
+
+    for periodo in periodos:
+        inicio = pd.Timestamp(periodo)
+        fim = inicio + pd.offsets.MonthBegin(1) - pd.Timedelta(1, 'ns')
+
+        if inicio >= data_inicio and fim <= data_fim:
+            completos.append(periodo)
+        elif inicio <= data_fim and fim >= data_inicio:
+            parciais.append(periodo)
+
+    return completos, parciais
+
+
+def _classificar_dias(dias, filtro_periodo):
+    # Retorna o intervalo [i0, i1) de dias completos em `dias` e os dias de borda cortados pelo filtro
+    data_inicio, data_fim = filtro_periodo
+
+    if data_inicio > data_fim:
+        return 0, 0, []
+
+    inicio_completo = data_inicio.ceil('D')
+    fim_completo = (data_fim + pd.Timedelta(1, 'ns')).floor('D')
+
+    bordas = sorted({
+        dia for dia in (data_inicio.floor('D'), data_fim.floor('D'))
+        if not inicio_completo <= dia < fim_completo
+    })
+
+    if inicio_completo >= fim_completo:
+        return 0, 0, bordas
+
+    return dias.searchsorted(inicio_completo), dias.searchsorted(fim_completo), bordas
+
+
+def _linhas_de_borda(vendas, posicoes_por_chave, chaves, filtros):
+    # Lê da tabela apenas as linhas das chaves de borda e aplica os filtros exatos
+    posicoes = [posicoes_por_chave[chave] for chave in chaves if chave in posicoes_por_chave]
+    if not posicoes:
+        return None
+    posicoes = np.sort(np.concatenate(posicoes))
+
+    # Com índice bitmap, categorias e canais descartam posições antes de ler as linhas
+    indice = registered_bitmap_index(vendas)
+    bits = filter_bitmap(indice, {'categoria': filtros[1], 'canal_venda': filtros[2]}) if indice is not None else None
+    if bits is not None:
+        posicoes = posicoes[bitmap_contains(bits, posicoes)]
+        filtros = (filtros[0], None, None)
+
+    borda = vendas.iloc[posicoes]
+    return borda[build_filter_mask(borda, *filtros)]
+
+
+def _filtrar_dimensoes(df, filtro_categorias, filtro_canais):
+    mascara = build_filter_mask(df, None, filtro_categorias, filtro_canais)
+    return df if mascara is None else df[mascara]
+
+
+def _rollup_cubo(vendas, dimensoes, filtros):
+    # Meses completos saem do cubo; meses cortados pelo filtro de datas, da tabela
+    filtro_periodo, filtro_categorias, filtro_canais = filtros
+    cubo = get_cube(vendas)
+
+    fatia = cubo['cubo']
+    partes = []
+
+    if filtro_periodo:
+        completos, parciais = _classificar_periodos(cubo['periodos'], filtro_periodo)
+        fatia = fatia[fatia['periodo'].isin(completos)]
+
+        borda = _linhas_de_borda(vendas, cubo['linhas_por_periodo'], parciais, filtros)
+        if borda is not None:
+            partes.append(_agregar_linhas(borda, dimensoes))
+
+    return [_filtrar_dimensoes(fatia, filtro_categorias, filtro_canais)] + partes
+
+
+def _rollup_diario(vendas, dimensoes, filtros):
+    # Dias completos saem das agregações diárias; apenas os dias de borda vêm da tabela
+    filtro_periodo, filtro_categorias, filtro_canais = filtros
+    agregados = get_daily_aggregates(vendas)
+
+    if filtro_periodo:
+        i0, i1, bordas = _classificar_dias(agregados['dias'], filtro_periodo)
+    else:
+        i0, i1, bordas = 0, len(agregados['dias']), []
+
+    if set(dimensoes) <= set(DIMENSOES_DIARIAS):
+        # Totais do intervalo por subtração das somas de prefixo
+        fatia = agregados['combinacoes'].copy()
+        fatia[METRICAS_CUBO] = agregados['prefixo'][i1] - agregados['prefixo'][i0]
+        fatia = fatia[fatia['id_venda'] > 0.5]
+    elif 'hora' in dimensoes:
+        inicio_por_dia = agregados['inicio_por_dia_hora']
+        fatia = agregados['diario_hora'].iloc[inicio_por_dia[i0]:inicio_por_dia[i1]]
+    else:
+        inicio_por_dia = agregados['inicio_por_dia']
+        fatia = agregados['diario'].iloc[inicio_por_dia[i0]:inicio_por_dia[i1]]
+
+    partes = [_filtrar_dimensoes(fatia, filtro_categorias, filtro_canais)]
+
+    borda = _linhas_de_borda(vendas, agregados['linhas_por_dia'], bordas, filtros)
+    if borda is not None:
+        partes.append(_agregar_linhas(borda, dimensoes))
+
+    return partes
+
+
+def _partes_rollup(vendas, dimensoes, filtros):
+    # Com backend SQL, o banco agrega; as dimensões voltam com os tipos (e categorias) de `vendas`
+    banco = _registrado(vendas, 'sql')
+    if banco is not None:
+        parte = banco.rollup(dimensoes, filtros)
+        return [parte.astype({dimensao: vendas[dimensao].dtype for dimensao in dimensoes if dimensao in vendas.columns})]
+
+    # O cubo mensal não tem o dia: `dia` sempre sai das agregações diárias
+    if 'dia' in dimensoes or filtros[0] and not {'hora', 'modelo'} <= set(dimensoes):
+        return _rollup_diario(vendas, dimensoes, filtros)
+    return _rollup_cubo(vendas, dimensoes, filtros)
+
+
+def _diferenca_unica(anteriores, atuais):
+    # (valor, sinal) quando `atuais` é `anteriores` com um valor a mais (+1) ou a menos (-1)
+    if anteriores is None or atuais is None:
+        return None
+
+    anteriores, atuais = set(anteriores), set(atuais)
+    if len(atuais) == len(anteriores) + 1 and anteriores < atuais:
+        return (atuais - anteriores).pop(), 1
+    if len(atuais) == len(anteriores) - 1 and atuais < anteriores:
+        return (anteriores - atuais).pop(), -1
+    return None
+
+
+def _filtros_delta(estado, filtros):
+    # Filtros que selecionam só a contribuição de um valor acrescentado ou retirado de uma das
+    # listas (categorias ou canais), com a outra lista igual; None se a mudança não for essa
+    filtro_periodo, filtro_categorias, filtro_canais = filtros
+    categorias, canais = estado
+
+    if canais == filtro_canais:
+        diferenca = _diferenca_unica(categorias, filtro_categorias)
+        if diferenca is not None:
+            return (filtro_periodo, (diferenca[0],), filtro_canais), diferenca[1]
+
+    if categorias == filtro_categorias:
+        diferenca = _diferenca_unica(canais, filtro_canais)
+        if diferenca is not None:
+            return (filtro_periodo, filtro_categorias, (diferenca[0],)), diferenca[1]
+
+    return None
+
+
+def _combinar_agregados(anterior, delta, sinal, dimensoes):
+    # Soma (ou subtrai) a contribuição do delta e descarta os grupos que ficaram sem vendas
+    delta = delta.copy()
+    delta[METRICAS_CUBO] = delta[METRICAS_CUBO] * sinal
+
+    base = pd.concat([anterior, delta], ignore_index=True)
+    resultado = base.groupby(list(dimensoes), observed=True)[METRICAS_CUBO].sum().reset_index()
+    return resultado[resultado['id_venda'] > 0].reset_index(drop=True)
+
+
+def _copiar(resultado):
+    if isinstance(resultado, dict):
+        return {chave: valor.copy() for chave, valor in resultado.items()}
+    return resultado.copy()
+
+
+def _consultar_incremental(vendas, nome, dimensoes, filtros, calcular, combinar):
+    """
+    Executa `calcular(vendas, dimensoes, filtros)` aproveitando o resultado de uma combinação de
+    filtros anterior da mesma consulta (dimensões e período): quando categorias ou canais mudaram
+    por um único valor, só a contribuição desse valor é agregada e somada ou subtraída.
+    """
+    if AGREGACAO_INCREMENTAL == '0' or AGREGACAO_INCREMENTAL == 'auto' and _registrado(vendas, 'sql') is None:
+        return calcular(vendas, dimensoes, filtros)
+
+    chave = (id(vendas), nome, tuple(dimensoes), filtros[0])
+
+    with _lock:
+        entrada = _estados_incrementais.get(chave)
+        estados = list(entrada[1]) if entrada is not None and entrada[0]() is vendas else []
+
+    resultado = None
+    for categorias, canais, anterior, deltas in reversed(estados):
+        if (categorias, canais) == filtros[1:]:
+            resultado, deltas = anterior, deltas
+            break
+
+        delta = _filtros_delta((categorias, canais), filtros) if deltas < MAX_DELTAS_ENCADEADOS else None
+        if delta is not None:
+            resultado, deltas = combinar(anterior, calcular(vendas, dimensoes, delta[0]), delta[1]), deltas + 1
+            break
+
+    if resultado is None:
+        resultado, deltas = calcular(vendas, dimensoes, filtros), 0
+
+    with _lock:
+        estados = [estado for estado in estados if estado[:2] != filtros[1:]]
+        estados.append(filtros[1:] + (resultado, deltas))
+        _estados_incrementais[chave] = (weakref.ref(vendas), estados[-ESTADOS_POR_CONSULTA:])
+        _estados_incrementais.move_to_end(chave)
+
+        while len(_estados_incrementais) > MAX_ESTADOS_INCREMENTAIS:
+            _estados_incrementais.popitem(last=False)
+
+    # Os consumidores modificam os resultados (colunas derivadas): o estado guardado fica intacto
+    return _copiar(resultado)
+
+
+def _calcular_rollup(vendas, dimensoes, filtros):
+    partes = _partes_rollup(vendas, dimensoes, filtros)
+
+    base = pd.concat(partes, ignore_index=True) if len(partes) > 1 else partes[0]
+    resultado = base.groupby(list(dimensoes), observed=True)[METRICAS_CUBO].sum().reset_index()
+    resultado['id_venda'] = resultado['id_venda'].round().astype('int64')
+
+    return resultado
+
+
+@profiled('agregacao')
+@cache_result
+def rollup_vendas(vendas, dimensoes, filtro_periodo=None, filtro_categorias=None, filtro_canais=None):
+    """
+    Agrega as vendas filtradas pelas `dimensoes` informadas a partir dos pré-agregados.
+
+    Retorna as colunas das dimensões seguidas de `id_venda` (quantidade), `preco_venda`, `custo`
+    e `lucro` (somas). Com filtro de datas, as dimensões são respondidas pelas agregações diárias
+    (lendo da tabela só os dias de borda), exceto `hora` junto com `modelo`, que vem do cubo mensal.
+    A dimensão `dia` (data sem horário) é sempre respondida pelas agregações diárias. Com um backend
+    SQL registrado (`register_sql_backend`), filtros e agrupamentos são feitos no banco. Os resultados
+    ficam também no cache de resultados em disco, compartilhado pelos processos do host.
+
+    Na agregação incremental (AGREGACAO_INCREMENTAL), quando a seleção de categorias ou de canais
+    difere de uma consulta anterior por um único valor, só a contribuição desse valor é agregada e
+    somada ou subtraída do resultado anterior.
+    """
+    filtros = normalize_filters(filtro_periodo, filtro_categorias, filtro_canais)
+    return _consultar_incremental(
+        vendas, 'rollup', dimensoes, filtros, _calcular_rollup,
+        lambda anterior, delta, sinal: _combinar_agregados(anterior, delta, sinal, dimensoes)
+    )
+
+
+def _codificar(coluna):
+    # Códigos inteiros (ordenados como no groupby) e os valores correspondentes a cada código
+    if isinstance(coluna.dtype, pd.CategoricalDtype):
+        return coluna.cat.codes.to_numpy(), coluna.cat.categories
+    return pd.factorize(coluna, sort=True)
+
+
+def _calcular_marginais(vendas, dimensoes, filtros):
+    # Com filtro de datas, `hora` e `modelo` juntos forçariam o cubo mensal: consultar em separado
+    if filtros[0] and {'hora', 'modelo'} <= set(dimensoes):
+        grupos = [[dimensao for dimensao in dimensoes if dimensao != 'hora'], ['hora']]
+    else:
+        grupos = [list(dimensoes)]
+
+    resultado = {}
+    for grupo in grupos:
+        partes = _partes_rollup(vendas, grupo, filtros)
+        base = pd.concat(partes, ignore_index=True) if len(partes) > 1 else partes[0]
+        metricas = base[METRICAS_CUBO].to_numpy(dtype='float64')
+
+        for dimensao in grupo:
+            codigos, valores = _codificar(base[dimensao])
+            somas = np.column_stack([
+                np.bincount(codigos, weights=metricas[:, i], minlength=len(valores))
+                for i in range(len(METRICAS_CUBO))
+            ]) if len(codigos) else np.zeros((len(valores), len(METRICAS_CUBO)))
+
+            # Apenas os grupos com vendas, como no groupby com observed=True
+            presentes = somas[:, 0] > 0.5
+            if isinstance(base[dimensao].dtype, pd.CategoricalDtype):
+                chaves = pd.Categorical.from_codes(np.flatnonzero(presentes), dtype=base[dimensao].dtype)
+            else:
+                chaves = np.asarray(valores)[presentes]
+
+            agregado = pd.DataFrame(somas[presentes], columns=METRICAS_CUBO)
+            agregado.insert(0, dimensao, chaves)
+            agregado['id_venda'] = agregado['id_venda'].round().astype('int64')
+            resultado[dimensao] = agregado
+
+    return resultado
+
+
+@profiled('agregacao')
+@cache_result
+def rollup_marginals(vendas, dimensoes, filtro_periodo=None, filtro_categorias=None, filtro_canais=None):
+    """
+    Agrega as vendas filtradas por cada uma das `dimensoes` separadamente, em uma única passada.
+
+    Retorna um dicionário dimensão -> DataFrame no formato de `rollup_vendas(vendas, [dimensao], ...)`.
+    A fatia dos pré-agregados é montada uma vez e cada dimensão é reduzida com `np.bincount` sobre
+    códigos inteiros, em vez de um `groupby` por dimensão. Também usa a agregação incremental de
+    `rollup_vendas`.
+    """
+    filtros = normalize_filters(filtro_periodo, filtro_categorias, filtro_canais)
+    return _consultar_incremental(
+        vendas, 'marginais', dimensoes, filtros, _calcular_marginais,
+        lambda anterior, delta, sinal: {
+            dimensao: _combinar_agregados(anterior[dimensao], delta[dimensao], sinal, [dimensao]) for dimensao in anterior
+        }
+    )
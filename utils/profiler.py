@@ -0,0 +1,259 @@
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+import weakref
+from contextlib import contextmanager
+
+# Medição de desempenho por execução (rerun) do dashboard: tempo e pico de memória de cada etapa
+# instrumentada (carga, filtros, agregações, gráficos, insights, serialização e exportações).
+#
+# Ativada por DASHBOARD_PERFIL=1 ou pelo parâmetro `?perfil=1` na URL. Sem medição ativa, as
+# funções instrumentadas custam só uma leitura de ContextVar a mais por chamada.
+
+PERFIL_ATIVO = os.environ.get('DASHBOARD_PERFIL', '0') == '1'
+
+# Cada medição gera um arquivo no formato Chrome Trace (chrome://tracing, Perfetto, speedscope)
+DIRETORIO_TRACES = 'data/.cache/perfil'
+MAX_TRACES = 50
+
+_perfil_atual = contextvars.ContextVar('perfil_atual', default=None)
+
+# O tracemalloc é global ao processo: fica ligado enquanto houver alguma medição em andamento
+_medicoes_com_memoria = 0
+_lock = threading.Lock()
+
+
+class Span:
+    """
+    Uma etapa medida: nome, categoria, início e duração (segundos) e pico de memória alocada (bytes).
+    """
+
+    __slots__ = ('nome', 'categoria', 'inicio', 'duracao', 'duracao_filhos', 'profundidade', 'memoria_base',
+                 'memoria_pico')
+
+    def __init__(self, nome, categoria, inicio, profundidade, memoria_base):
+        self.nome = nome
+        self.categoria = categoria
+        self.inicio = inicio
+        self.duracao = None
+        self.duracao_filhos = 0.0
+        self.profundidade = profundidade
+        self.memoria_base = memoria_base
+        self.memoria_pico = memoria_base
+
+
+class RerunProfile:
+    """
+    Etapas medidas durante uma execução, na ordem em que terminaram.
+
+    O pico de memória de cada etapa inclui o das etapas internas a ela; com várias medições
+    simultâneas no mesmo processo, os picos de memória são aproximados.
+    """
+
+    def __init__(self, nome):
+        self.nome = nome
+        self.inicio = time.perf_counter()
+        self.inicio_epoca = time.time()
+        self.duracao = None
+        self.thread = threading.get_ident()
+        self.spans = []
+        self._pilha = []
+        self._desligar_memoria = lambda: None
+
+    def abrir(self, nome, categoria):
+        base = 0
+        if tracemalloc.is_tracing():
+            base, pico = tracemalloc.get_traced_memory()
+            if self._pilha:
+                self._pilha[-1].memoria_pico = max(self._pilha[-1].memoria_pico, pico)
+            tracemalloc.reset_peak()
+
+        span = Span(nome, categoria, time.perf_counter() - self.inicio, len(self._pilha), base)
+        self._pilha.append(span)
+        return span
+
+    def fechar(self, span):
+        span.duracao = time.perf_counter() - self.inicio - span.inicio
+
+        if tracemalloc.is_tracing():
+            span.memoria_pico = max(span.memoria_pico, tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+
+        self._pilha.remove(span)
+        if self._pilha:
+            pai = self._pilha[-1]
+            pai.duracao_filhos += span.duracao
+            pai.memoria_pico = max(pai.memoria_pico, span.memoria_pico)
+
+        self.spans.append(span)
+
+    def summary(self):
+        """
+        Resume as etapas por (categoria, nome): chamadas, tempo total e próprio (sem as etapas internas)
+        em milissegundos e o maior pico de memória em MB, da etapa mais lenta para a mais rápida.
+        """
+        resumo = {}
+        for span in self.spans:
+            linha = resumo.setdefault((span.categoria, span.nome), {
+                'categoria': span.categoria, 'etapa': span.nome, 'chamadas': 0,
+                'total_ms': 0.0, 'proprio_ms': 0.0, 'pico_mb': 0.0
+            })
+            linha['chamadas'] += 1
+            linha['total_ms'] += span.duracao * 1000
+            linha['proprio_ms'] += (span.duracao - span.duracao_filhos) * 1000
+            linha['pico_mb'] = max(linha['pico_mb'], (span.memoria_pico - span.memoria_base) / 1e6)
+
+        return sorted(resumo.values(), key=lambda linha: linha['proprio_ms'], reverse=True)
+
+    def to_chrome_trace(self):
+        """
+        Converte a medição em eventos do formato Chrome Trace (tempos em microssegundos).
+        """
+        pid = os.getpid()
+        eventos = [{'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': self.thread, 'args': {'name': self.nome}}]
+
+        if self.duracao is not None:
+            eventos.append({
+                'name': self.nome, 'cat': 'rerun', 'ph': 'X', 'pid': pid, 'tid': self.thread,
+                'ts': 0, 'dur': round(self.duracao * 1e6, 1)
+            })
+
+        for span in sorted(self.spans, key=lambda span: (span.inicio, span.profundidade)):
+            eventos.append({
+                'name': span.nome, 'cat': span.categoria, 'ph': 'X', 'pid': pid, 'tid': self.thread,
+                'ts': round(span.inicio * 1e6, 1), 'dur': round(span.duracao * 1e6, 1),
+                'args': {'pico_memoria_mb': round((span.memoria_pico - span.memoria_base) / 1e6, 3)}
+            })
+
+        return {'traceEvents': eventos, 'displayTimeUnit': 'ms', 'otherData': {'inicio': self.inicio_epoca}}
+
+    def write_trace(self, diretorio=DIRETORIO_TRACES):
+        """
+        Grava a medição como Chrome Trace em `diretorio`, mantendo só os MAX_TRACES arquivos mais recentes.
+
+        Retorna o caminho do arquivo, ou None se não foi possível gravá-lo.
+        """
+        nome = time.strftime('%Y%m%d-%H%M%S', time.localtime(self.inicio_epoca))
+        caminho = os.path.join(diretorio, f'{nome}-{os.getpid()}-{self.thread}.json')
+
+        try:
+            os.makedirs(diretorio, exist_ok=True)
+            with open(caminho, 'w', encoding='utf-8') as arquivo:
+                json.dump(self.to_chrome_trace(), arquivo, ensure_ascii=False)
+
+            arquivos = [os.path.join(diretorio, nome) for nome in os.listdir(diretorio) if nome.endswith('.json')]
+            arquivos.sort(key=os.path.getmtime, reverse=True)
+            for antigo in arquivos[MAX_TRACES:]:
+                os.remove(antigo)
+        except OSError:
+            return None
+
+        return caminho
+
+
+def _ligar_memoria():
+    global _medicoes_com_memoria
+    with _lock:
+        _medicoes_com_memoria += 1
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+
+def _desligar_memoria():
+    global _medicoes_com_memoria
+    with _lock:
+        _medicoes_com_memoria = max(0, _medicoes_com_memoria - 1)
+        if _medicoes_com_memoria == 0 and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+
+def start_profile(nome, ativo=True):
+    """
+    Inicia a medição da execução atual (thread/contexto) e a retorna; retorna None se `ativo` for falso.
+
+    Uma medição anterior deste contexto que não foi encerrada (ex.: interrompida por `st.rerun` ou
+    `st.stop`) é descartada antes. Uma medição abandonada em outro contexto (ex.: a thread da
+    execução terminou com uma exceção) desliga o rastreamento de memória ao ser coletada.
+    """
+    anterior = _perfil_atual.get()
+    if anterior is not None:
+        finish_profile(anterior)
+
+    if not ativo:
+        return None
+
+    _ligar_memoria()
+    perfil = RerunProfile(nome)
+    # Chamado uma única vez: por `finish_profile` ou, se ela não rodar, quando a medição for coletada
+    perfil._desligar_memoria = weakref.finalize(perfil, _desligar_memoria)
+    _perfil_atual.set(perfil)
+    return perfil
+
+
+def finish_profile(perfil):
+    """
+    Encerra a medição: fecha as etapas ainda abertas e desliga o rastreamento de memória. Chamar
+    de novo para a mesma medição não tem efeito.
+    """
+    if perfil.duracao is not None:
+        return
+
+    for span in reversed(list(perfil._pilha)):
+        perfil.fechar(span)
+    perfil.duracao = time.perf_counter() - perfil.inicio
+
+    if _perfil_atual.get() is perfil:
+        _perfil_atual.set(None)
+    perfil._desligar_memoria()
+
+
+def current_profile():
+    """
+    Retorna a medição ativa no contexto atual, ou None.
+    """
+    return _perfil_atual.get()
+
+
+@contextmanager
+def span(nome, categoria):
+    """
+    Mede o bloco como uma etapa da medição ativa (sem medição ativa, não faz nada).
+    """
+    perfil = _perfil_atual.get()
+    if perfil is None:
+        yield
+        return
+
+    etapa = perfil.abrir(nome, categoria)
+    try:
+        yield
+    finally:
+        perfil.fechar(etapa)
+
+
+def profiled(categoria, nome=None):
+    """
+    Decorador que mede cada chamada da função como uma etapa de `categoria`.
+    """
+    def decorador(funcao):
+        nome_etapa = nome or funcao.__name__
+
+        @functools.wraps(funcao)
+        def envoltorio(*args, **kwargs):
+            perfil = _perfil_atual.get()
+            if perfil is None:
+                return funcao(*args, **kwargs)
+
+            etapa = perfil.abrir(nome_etapa, categoria)
+            try:
+                return funcao(*args, **kwargs)
+            finally:
+                perfil.fechar(etapa)
+
+        return envoltorio
+
+    return decorador
@@ -0,0 +1,277 @@
+import io
+import re
+from datetime import datetime
+
+from utils.ai_insights import generate_narrative, generate_strategic_recommendations
+from utils.profiler import profiled
+
+
+def _avancar(progresso, fracao, etapa):
+    # Informa o andamento da exportação a quem a acompanha (ex.: a fila de exportações)
+    if progresso is not None:
+        progresso(fracao, etapa)
+
+# Função para exportar para PDF
+@profiled('exportacao')
+def export_to_pdf(vendas, metas, insights_data, filtro_periodo=None, filtro_categorias=None, filtro_canais=None, progresso=None):
+    _avancar(progresso, 0.0, 'Montando o cabeçalho')
+    
+    # Importado só aqui: quem não exporta não paga o custo de importar o fpdf
+    from fpdf import FPDF
+    
+    pdf = FPDF()
+    pdf.add_page()
+    
+    # Configurar fonte
+    pdf.add_font('Montserrat', '', 'assets/fonts/Montserrat-Regular.ttf', uni=True)
+    pdf.add_font('Montserrat', 'B', 'assets/fonts/Montserrat-Bold.ttf', uni=True)
+    
+    # Título
+    pdf.set_font('Montserrat', 'B', 24)
+    pdf.set_text_color(0, 255, 255)
+    pdf.cell(0, 20, 'Dashboard Analítico de Vendas de Veículos', 0, 1, 'C')
+    
+    # Subtítulo
+    pdf.set_font('Montserrat', '', 14)
+    pdf.set_text_color(255, 95, 31)
+    
+    # Período
+    if filtro_periodo:
+        data_inicio, data_fim = filtro_periodo
+        periodo_texto = f"Período: {data_inicio.strftime('%d/%m/%Y')} a {data_fim.strftime('%d/%m/%Y')}"
+    else:
+        periodo_texto = "Período: Todos os dados"
+    
+    pdf.cell(0, 10, periodo_texto, 0, 1, 'C')
+    
+    # Filtros aplicados
+    pdf.set_font('Montserrat', '', 10)
+    pdf.set_text_color(248, 248, 255)
+    
+    if filtro_categorias:
+        categorias_texto = f"Categorias: {', '.join(filtro_categorias)}"
+    else:
+        categorias_texto = "Categorias: Todas"
+    
+    if filtro_canais:
+        canais_texto = f"Canais: {', '.join(filtro_canais)}"
+    else:
+        canais_texto = "Canais: Todos"
+    
+    pdf.cell(0, 8, categorias_texto, 0, 1, 'C')
+    pdf.cell(0, 8, canais_texto, 0, 1, 'C')
+    
+    pdf.ln(10)
+    
+    _avancar(progresso, 0.2, 'Escrevendo o resumo dos dados')
+    
+    # Resumo dos dados
+    pdf.set_font('Montserrat', 'B', 16)
+    pdf.set_text_color(0, 255, 255)
+    pdf.cell(0, 10, 'Resumo dos Dados', 0, 1, 'L')
+    
+    pdf.set_font('Montserrat', '', 12)
+    pdf.set_text_color(248, 248, 255)
+    
+    # Criar tabela de resumo
+    resumo = [
+        ["Faturamento Total", f"R$ {insights_data['resumo_geral']['faturamento_total']:,.2f}"],
+        ["Total de Vendas", f"{insights_data['resumo_geral']['total_vendas']:,}"],
+        ["Lucro Total", f"R$ {insights_data['resumo_geral']['lucro_total']:,.2f}"],
+        ["Margem Média", f"{insights_data['resumo_geral']['margem_media']:.2f}%"],
+        ["Atingimento de Metas", f"{insights_data['metas']['atingimento_medio']:.1f}%"]
+    ]
+    
+    col_width = 95
+    row_height = 10
+    
+    for row in resumo:
+        pdf.cell(col_width, row_height, row[0], 1, 0, 'L')
+        pdf.cell(col_width, row_height, row[1], 1, 1, 'R')
+    
+    pdf.ln(10)
+    
+    _avancar(progresso, 0.4, 'Gerando os insights')
+    
+    # Insights principais
+    pdf.set_font('Montserrat', 'B', 16)
+    pdf.set_text_color(0, 255, 255)
+    pdf.cell(0, 10, 'Insights Principais', 0, 1, 'L')
+    
+    pdf.set_font('Montserrat', '', 12)
+    pdf.set_text_color(248, 248, 255)
+    
+    # Extrair texto limpo dos insights (remover tags HTML)
+    narrativa = generate_narrative(insights_data)
+    narrativa_limpa = re.sub('<.*?>', '', narrativa)
+    
+    # Quebrar texto em linhas
+    pdf.multi_cell(0, 8, narrativa_limpa)
+    
+    pdf.ln(10)
+    
+    _avancar(progresso, 0.6, 'Gerando as recomendações')
+    
+    # Recomendações estratégicas
+    pdf.set_font('Montserrat', 'B', 16)
+    pdf.set_text_color(0, 255, 255)
+    pdf.cell(0, 10, 'Recomendações Estratégicas', 0, 1, 'L')
+    
+    pdf.set_font('Montserrat', '', 12)
+    pdf.set_text_color(248, 248, 255)
+    
+    # Extrair texto limpo das recomendações (remover tags HTML)
+    recomendacoes = generate_strategic_recommendations(insights_data)
+    recomendacoes_limpas = re.sub('<.*?>', '', recomendacoes)
+    
+    # Quebrar texto em linhas
+    pdf.multi_cell(0, 8, recomendacoes_limpas)
+    
+    # Rodapé
+    pdf.set_y(-15)
+    pdf.set_font('Montserrat', 'I', 8)
+    pdf.set_text_color(248, 248, 255)
+    pdf.cell(0, 10, f'Gerado em {datetime.now().strftime("%d/%m/%Y %H:%M:%S")}', 0, 0, 'C')
+    
+    _avancar(progresso, 0.8, 'Gravando o PDF')
+    
+    # Retornar PDF como buffer
+    pdf_buffer = io.BytesIO()
+    pdf.output(pdf_buffer)
+    pdf_buffer.seek(0)
+    
+    return pdf_buffer
+
+# Função para exportar para PowerPoint
+@profiled('exportacao')
+def export_to_ppt(vendas, metas, insights_data, filtro_periodo=None, filtro_categorias=None, filtro_canais=None, progresso=None):
+    _avancar(progresso, 0.0, 'Criando o slide de título')
+    
+    # Importado só aqui: quem não exporta não paga o custo de importar o python-pptx
+    from pptx import Presentation
+    from pptx.dml.color import RGBColor
+    from pptx.util import Inches, Pt
+    
+    # Criar apresentação
+    prs = Presentation()
+    
+    # Slide de título
+    slide_layout = prs.slide_layouts[0]  # Layout de título
+    slide = prs.slides.add_slide(slide_layout)
+    
+    # Configurar título
+    title = slide.shapes.title
+    title.text = "Dashboard Analítico de Vendas de Veículos"
+    title.text_frame.paragraphs[0].font.color.rgb = RGBColor(0, 255, 255)
+    title.text_frame.paragraphs[0].font.size = Pt(44)
+    
+    # Configurar subtítulo
+    subtitle = slide.placeholders[1]
+    
+    # Período
+    if filtro_periodo:
+        data_inicio, data_fim = filtro_periodo
+        periodo_texto = f"Período: {data_inicio.strftime('%d/%m/%Y')} a {data_fim.strftime('%d/%m/%Y')}"
+    else:
+        periodo_texto = "Período: Todos os dados"
+    
+    # Filtros aplicados
+    if filtro_categorias:
+        categorias_texto = f"Categorias: {', '.join(filtro_categorias)}"
+    else:
+        categorias_texto = "Categorias: Todas"
+    
+    if filtro_canais:
+        canais_texto = f"Canais: {', '.join(filtro_canais)}"
+    else:
+        canais_texto = "Canais: Todos"
+    
+    subtitle.text = f"{periodo_texto}\n{categorias_texto}\n{canais_texto}"
+    subtitle.text_frame.paragraphs[0].font.color.rgb = RGBColor(255, 95, 31)
+    subtitle.text_frame.paragraphs[0].font.size = Pt(24)
+    
+    _avancar(progresso, 0.2, 'Criando o slide de resumo')
+    
+    # Slide de resumo
+    slide_layout = prs.slide_layouts[1]  # Layout de título e conteúdo
+    slide = prs.slides.add_slide(slide_layout)
+    
+    # Configurar título
+    title = slide.shapes.title
+    title.text = "Resumo dos Dados"
+    title.text_frame.paragraphs[0].font.color.rgb = RGBColor(0, 255, 255)
+    title.text_frame.paragraphs[0].font.size = Pt(40)
+    
+    # Criar tabela de resumo
+    x, y, cx, cy = Inches(1), Inches(2), Inches(8), Inches(3)
+    shape = slide.shapes.add_table(6, 2, x, y, cx, cy)
+    table = shape.table
+    
+    # Cabeçalho
+    table.cell(0, 0).text = "Métrica"
+    table.cell(0, 1).text = "Valor"
+    
+    # Dados
+    table.cell(1, 0).text = "Faturamento Total"
+    table.cell(1, 1).text = f"R$ {insights_data['resumo_geral']['faturamento_total']:,.2f}"
+    
+    table.cell(2, 0).text = "Total de Vendas"
+    table.cell(2, 1).text = f"{insights_data['resumo_geral']['total_vendas']:,}"
+    
+    table.cell(3, 0).text = "Lucro Total"
+    table.cell(3, 1).text = f"R$ {insights_data['resumo_geral']['lucro_total']:,.2f}"
+    
+    table.cell(4, 0).text = "Margem Média"
+    table.cell(4, 1).text = f"{insights_data['resumo_geral']['margem_media']:.2f}%"
+    
+    table.cell(5, 0).text = "Atingimento de Metas"
+    table.cell(5, 1).text = f"{insights_data['metas']['atingimento_medio']:.1f}%"
+    
+    _avancar(progresso, 0.4, 'Criando o slide de insights')
+    
+    # Slide de insights
+    slide_layout = prs.slide_layouts[1]  # Layout de título e conteúdo
+    slide = prs.slides.add_slide(slide_layout)
+    
+    # Configurar título
+    title = slide.shapes.title
+    title.text = "Insights Principais"
+    title.text_frame.paragraphs[0].font.color.rgb = RGBColor(0, 255, 255)
+    title.text_frame.paragraphs[0].font.size = Pt(40)
+    
+    # Extrair texto limpo dos insights (remover tags HTML)
+    narrativa = generate_narrative(insights_data)
+    narrativa_limpa = re.sub('<.*?>', '', narrativa)
+    
+    # Adicionar texto
+    content = slide.placeholders[1]
+    content.text = narrativa_limpa
+    
+    _avancar(progresso, 0.6, 'Criando o slide de recomendações')
+    
+    # Slide de recomendações
+    slide_layout = prs.slide_layouts[1]  # Layout de título e conteúdo
+    slide = prs.slides.add_slide(slide_layout)
+    
+    # Configurar título
+    title = slide.shapes.title
+    title.text = "Recomendações Estratégicas"
+    title.text_frame.paragraphs[0].font.color.rgb = RGBColor(0, 255, 255)
+    title.text_frame.paragraphs[0].font.size = Pt(40)
+    
+    # Extrair texto limpo das recomendações (remover tags HTML)
+    recomendacoes = generate_strategic_recommendations(insights_data)
+    recomendacoes_limpas = re.sub('<.*?>', '', recomendacoes)
+    
+    # Adicionar texto
+    content = slide.placeholders[1]
+    content.text = recomendacoes_limpas
+    
+    _avancar(progresso, 0.8, 'Gravando a apresentação')
+    
+    # Retornar PPT como buffer
+    ppt_buffer = io.BytesIO()
+    prs.save(ppt_buffer)
+    ppt_buffer.seek(0)
+    
+    return ppt_buffer
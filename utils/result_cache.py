@@ -0,0 +1,267 @@
+import copy
+import functools
+import hashlib
+import inspect
+import logging
+import os
+import pickle
+import sqlite3
+import threading
+import time
+import weakref
+import zlib
+from collections import OrderedDict
+
+import pandas as pd
+
+from utils.filter_engine import normalize_filters
+from utils.single_flight import AUSENTE, single_flight
+
+logger = logging.getLogger(__name__)
+
+# Cache de resultados em disco compartilhado por todos os processos do host (vários servidores
+# Streamlit atrás de um balanceador, workers de exportação, scripts): agregações e insights ficam
+# em um SQLite, pela chave (função, versão dos dados, filtros normalizados, demais argumentos).
+
+CAMINHO_CACHE_RESULTADOS = os.environ.get('DASHBOARD_CACHE_RESULTADOS', 'data/.cache/resultados.sqlite')
+
+# Limite do arquivo (DASHBOARD_CACHE_RESULTADOS_MB; 0 desativa o cache): acima dele, as entradas
+# acessadas há mais tempo são descartadas
+MAX_BYTES_RESULTADOS = int(float(os.environ.get('DASHBOARD_CACHE_RESULTADOS_MB', '256')) * 1024 * 1024)
+
+# Incrementar sempre que o formato de algum resultado memorizado mudar, para invalidar o cache
+VERSAO_RESULTADOS = 1
+
+# Espera máxima (s) por outro processo que esteja gravando no cache
+ESPERA_BLOQUEIO = 5.0
+
+# Intervalo mínimo (s) entre duas atualizações do último acesso de uma mesma entrada: evita uma
+# gravação a cada leitura sem alterar a ordem LRU de forma relevante
+INTERVALO_ACESSO = 60.0
+
+# Resultados mais recentes mantidos também em memória, na frente do SQLite: acertos no mesmo
+# processo só copiam o resultado, sem hash, leitura, descompressão nem trava
+MAX_RESULTADOS_EM_MEMORIA = 64
+
+PARAMETROS_FILTRO = ('filtro_periodo', 'filtro_categorias', 'filtro_canais')
+
+# (função, versões dos dados, filtros, demais argumentos) -> resultado (nunca entregue sem cópia)
+_memoria = OrderedDict()
+
+# id do DataFrame -> (referência fraca, versão dos dados)
+_versoes = {}
+_lock = threading.Lock()
+
+# Uma conexão por thread (e por processo, já que os workers podem ser criados por fork)
+_conexoes = threading.local()
+
+
+def _descartar_versao(id_frame):
+    with _lock:
+        _versoes.pop(id_frame, None)
+
+
+def register_data_version(vendas, versao):
+    """
+    Associa a um DataFrame a sua versão dos dados: um texto igual em todos os processos que leram
+    os mesmos dados (ex.: derivado do arquivo de origem e do trecho lido).
+    """
+    with _lock:
+        novo_frame = id(vendas) not in _versoes
+        _versoes[id(vendas)] = (weakref.ref(vendas), versao)
+    if novo_frame:
+        weakref.finalize(vendas, _descartar_versao, id(vendas))
+
+
+def data_version(df):
+    """
+    Retorna a versão dos dados de um DataFrame: a registrada por `register_data_version` ou, na
+    falta dela, um hash do conteúdo (calculado uma vez por DataFrame, que NÃO deve ser modificado).
+    """
+    with _lock:
+        entrada = _versoes.get(id(df))
+        if entrada is not None and entrada[0]() is df:
+            return entrada[1]
+
+    sha256 = hashlib.sha256(repr((list(df.columns), [str(tipo) for tipo in df.dtypes])).encode())
+    sha256.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    versao = sha256.hexdigest()
+
+    register_data_version(df, versao)
+    return versao
+
+
+def _conexao(caminho):
+    # Conexão desta thread com o SQLite, criando o arquivo e a tabela na primeira vez
+    chave = (os.getpid(), caminho)
+    conexoes = getattr(_conexoes, 'abertas', None)
+    if conexoes is None:
+        conexoes = _conexoes.abertas = {}
+
+    conexao = conexoes.get(chave)
+    if conexao is None:
+        diretorio = os.path.dirname(caminho)
+        if diretorio:
+            os.makedirs(diretorio, exist_ok=True)
+
+        # Autocommit: as gravações abrem a própria transação (BEGIN IMMEDIATE)
+        conexao = sqlite3.connect(caminho, timeout=ESPERA_BLOQUEIO, isolation_level=None)
+        conexao.execute('PRAGMA journal_mode=WAL')
+        conexao.execute('PRAGMA synchronous=NORMAL')
+        conexao.execute(
+            'CREATE TABLE IF NOT EXISTS resultados ('
+            'chave TEXT PRIMARY KEY, valor BLOB NOT NULL, bytes INTEGER NOT NULL, acesso REAL NOT NULL)'
+        )
+        conexao.execute('CREATE INDEX IF NOT EXISTS resultados_acesso ON resultados (acesso)')
+        conexoes[chave] = conexao
+
+    return conexao
+
+
+def _ler(caminho, chave):
+    conexao = _conexao(caminho)
+    linha = conexao.execute('SELECT valor, acesso FROM resultados WHERE chave = ?', (chave,)).fetchone()
+    if linha is None:
+        return None
+
+    agora = time.time()
+    if agora - linha[1] > INTERVALO_ACESSO:
+        conexao.execute('UPDATE resultados SET acesso = ? WHERE chave = ?', (agora, chave))
+
+    return linha[0]
+
+
+def _gravar(caminho, chave, valor, max_bytes):
+    conexao = _conexao(caminho)
+    conexao.execute('BEGIN IMMEDIATE')
+    try:
+        conexao.execute(
+            'INSERT OR REPLACE INTO resultados (chave, valor, bytes, acesso) VALUES (?, ?, ?, ?)',
+            (chave, valor, len(valor), time.time())
+        )
+        # Mantém as entradas acessadas mais recentemente que cabem em `max_bytes`
+        conexao.execute(
+            'DELETE FROM resultados WHERE chave IN ('
+            'SELECT chave FROM (SELECT chave, SUM(bytes) OVER (ORDER BY acesso DESC, chave) AS acumulado '
+            'FROM resultados) WHERE acumulado > ?)',
+            (max_bytes,)
+        )
+        conexao.execute('COMMIT')
+    except BaseException:
+        conexao.execute('ROLLBACK')
+        raise
+
+
+def _normalizar(valor):
+    # Listas e conjuntos de argumentos viram tuplas (mesma representação para o mesmo conteúdo)
+    if isinstance(valor, (list, tuple)):
+        return tuple(_normalizar(item) for item in valor)
+    if isinstance(valor, (set, frozenset)):
+        return tuple(sorted(valor))
+    return valor
+
+
+def cache_result(funcao):
+    """
+    Memoriza uma função de agregação ou de insights no cache de resultados em disco.
+
+    A chave é (função, versão dos dados de cada DataFrame, filtros normalizados, demais argumentos);
+    o resultado é guardado serializado (pickle comprimido) e cada acerto devolve uma cópia nova.
+    Os MAX_RESULTADOS_EM_MEMORIA resultados usados mais recentemente também ficam em memória, e
+    os seus acertos não chegam ao disco.
+    Pedidos simultâneos do mesmo resultado, no processo ou em outros processos do host, esperam um
+    único cálculo (`single_flight`) e depois leem o resultado do cache (ou, no mesmo processo, uma
+    cópia do resultado calculado, se ele não pôde ser guardado). Erros de leitura ou gravação
+    do cache (ex.: disco cheio ou somente leitura) apenas fazem a função ser executada normalmente.
+    """
+    assinatura = inspect.signature(funcao)
+    nome = f'{funcao.__module__}.{funcao.__qualname__}'
+
+    @functools.wraps(funcao)
+    def envoltorio(*args, **kwargs):
+        if MAX_BYTES_RESULTADOS <= 0:
+            return funcao(*args, **kwargs)
+
+        argumentos = assinatura.bind(*args, **kwargs)
+        argumentos.apply_defaults()
+        argumentos = argumentos.arguments
+
+        versoes = tuple(
+            (parametro, data_version(valor)) for parametro, valor in argumentos.items() if isinstance(valor, pd.DataFrame)
+        )
+        outros = tuple(
+            (parametro, _normalizar(valor)) for parametro, valor in argumentos.items()
+            if parametro not in PARAMETROS_FILTRO and not isinstance(valor, pd.DataFrame)
+        )
+        filtros = normalize_filters(*(argumentos.get(parametro) for parametro in PARAMETROS_FILTRO))
+
+        chave_memoria = (nome, versoes, filtros, outros)
+        with _lock:
+            guardado = _memoria.get(chave_memoria, AUSENTE)
+            if guardado is not AUSENTE:
+                _memoria.move_to_end(chave_memoria)
+        if guardado is not AUSENTE:
+            return copy.deepcopy(guardado)
+
+        chave = hashlib.sha256(repr((VERSAO_RESULTADOS,) + chave_memoria).encode()).hexdigest()
+
+        def consultar():
+            try:
+                valor = _ler(CAMINHO_CACHE_RESULTADOS, chave)
+                if valor is not None:
+                    return pickle.loads(zlib.decompress(valor))
+            except (sqlite3.Error, OSError, zlib.error, pickle.UnpicklingError, EOFError, AttributeError, ImportError) as erro:
+                logger.warning('Cache de resultados indisponível para leitura (%s): %s', nome, erro)
+            return AUSENTE
+
+        def calcular():
+            resultado = funcao(*args, **kwargs)
+
+            try:
+                valor = zlib.compress(pickle.dumps(resultado, protocol=pickle.HIGHEST_PROTOCOL), 1)
+                # Resultados maiores que o cache inteiro não são guardados
+                if len(valor) <= MAX_BYTES_RESULTADOS:
+                    _gravar(CAMINHO_CACHE_RESULTADOS, chave, valor, MAX_BYTES_RESULTADOS)
+            except (sqlite3.Error, OSError, pickle.PicklingError) as erro:
+                logger.warning('Cache de resultados indisponível para gravação (%s): %s', nome, erro)
+
+            return resultado
+
+        # Na partida a frio, sessões e processos que pedem o mesmo resultado esperam um único cálculo
+        # (resultados que não couberam no cache são entregues por cópia a quem esperou no processo)
+        resultado = single_flight(funcao.__name__, chave, calcular, consultar, entre_processos=True, copiar=copy.deepcopy)
+
+        guardado = copy.deepcopy(resultado)
+        with _lock:
+            _memoria[chave_memoria] = guardado
+            _memoria.move_to_end(chave_memoria)
+            while len(_memoria) > MAX_RESULTADOS_EM_MEMORIA:
+                _memoria.popitem(last=False)
+
+        return resultado
+
+    return envoltorio
+
+
+def result_cache_info(caminho=CAMINHO_CACHE_RESULTADOS):
+    """
+    Retorna a quantidade de entradas e os bytes (comprimidos) ocupados pelo cache de resultados.
+    """
+    try:
+        entradas, total = _conexao(caminho).execute('SELECT COUNT(*), COALESCE(SUM(bytes), 0) FROM resultados').fetchone()
+    except (sqlite3.Error, OSError):
+        return {'entradas': 0, 'bytes': 0}
+    return {'entradas': entradas, 'bytes': total}
+
+
+def clear_result_cache(caminho=CAMINHO_CACHE_RESULTADOS):
+    """
+    Esvazia o cache de resultados (de todos os processos que o compartilham) e os resultados
+    mantidos em memória por este processo.
+    """
+    with _lock:
+        _memoria.clear()
+    try:
+        _conexao(caminho).execute('DELETE FROM resultados')
+    except (sqlite3.Error, OSError):
+        pass
@@ -0,0 +1,200 @@
+import contextlib
+import hashlib
+import os
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows: sem travas entre processos, só dentro do processo
+    fcntl = None
+
+# Proteção contra avalanches na partida a frio (ex.: dezenas de sessões reexecutando juntas logo
+# após a atualização dos dados): pedidos simultâneos da mesma chave esperam uma única execução em
+# andamento em vez de repetirem o mesmo cálculo em paralelo.
+#
+# Dentro do processo, o primeiro pedido de uma chave calcula e os demais esperam por ele. Entre
+# processos (vários servidores Streamlit no mesmo host), a execução é feita com uma trava de
+# registro (fcntl) em um arquivo comum, e quem esperou confere o cache de novo antes de calcular.
+
+CAMINHO_TRAVAS = 'data/.cache/travas.lock'
+
+# Espera máxima (s) por uma execução em andamento; passado esse tempo, o pedido calcula sozinho
+ESPERA_MAXIMA = 300.0
+
+# Intervalo (s) entre as tentativas de obter a trava entre processos
+INTERVALO_TRAVA = 0.05
+
+# Bytes do arquivo de travas sobre os quais as chaves são distribuídas (cada chave trava 1 byte)
+POSICOES_TRAVA = 2**31 - 1
+
+# Valor de `consultar` quando o resultado ainda não está no cache
+AUSENTE = object()
+
+_em_voo = {}
+_metricas = {}
+_lock = threading.Lock()
+
+# Arquivo de travas aberto por processo (os workers podem ser criados por fork)
+_arquivo_travas = {}
+
+
+class _Voo:
+    # Execução em andamento de uma chave: quem espera é liberado pelo evento
+    def __init__(self):
+        self.evento = threading.Event()
+        self.resultado = AUSENTE
+        self.erro = None
+        self.esperando = 0
+
+
+def _contar(grupo, metrica, valor=1):
+    with _lock:
+        metricas = _metricas.setdefault(grupo, {'acertos': 0, 'faltas': 0, 'esperas': 0, 'espera_s': 0.0})
+        metricas[metrica] += valor
+
+
+def _descritor_travas():
+    # Chamado com o lock adquirido
+    descritor = _arquivo_travas.get(os.getpid())
+    if descritor is None:
+        diretorio = os.path.dirname(CAMINHO_TRAVAS)
+        if diretorio:
+            os.makedirs(diretorio, exist_ok=True)
+        descritor = _arquivo_travas[os.getpid()] = os.open(CAMINHO_TRAVAS, os.O_RDWR | os.O_CREAT, 0o644)
+    return descritor
+
+
+@contextlib.contextmanager
+def _trava_entre_processos(grupo, chave):
+    # Trava 1 byte do arquivo comum, na posição dada pelo hash da chave. Retorna (no `as`) se foi
+    # preciso esperar por outro processo. Sem fcntl, ou se o arquivo não puder ser aberto, não trava
+    if fcntl is None:
+        yield False
+        return
+
+    posicao = int(hashlib.sha256(repr((grupo, chave)).encode()).hexdigest()[:16], 16) % POSICOES_TRAVA
+    try:
+        with _lock:
+            descritor = _descritor_travas()
+    except OSError:
+        yield False
+        return
+
+    esperou, limite = False, time.monotonic() + ESPERA_MAXIMA
+    travado = False
+    while not travado:
+        try:
+            fcntl.lockf(descritor, fcntl.LOCK_EX | fcntl.LOCK_NB, 1, posicao)
+            travado = True
+        except OSError:
+            esperou = True
+            if time.monotonic() >= limite:
+                break
+            time.sleep(INTERVALO_TRAVA)
+
+    try:
+        yield esperou
+    finally:
+        if travado:
+            fcntl.lockf(descritor, fcntl.LOCK_UN, 1, posicao)
+
+
+def single_flight(grupo, chave, calcular, consultar=None, entre_processos=False, copiar=None):
+    """
+    Retorna `calcular()` garantindo uma única execução simultânea por (`grupo`, `chave`).
+
+    `consultar()` (opcional) lê o resultado de um cache, devolvendo AUSENTE quando não o encontra:
+    é chamado antes de calcular e de novo depois de cada espera, de modo que quem esperou recebe
+    a sua própria cópia do cache; com `copiar`, se o resultado não chegou ao cache (ex.: grande
+    demais para ser guardado), quem esperou no mesmo processo recebe `copiar(resultado)` em vez de
+    calcular de novo. Sem `consultar`, quem esperou recebe o mesmo objeto calculado (ou a mesma
+    exceção). Com `entre_processos`, a execução também é exclusiva entre os processos do host. As métricas do grupo (`single_flight_stats`) contam acertos no cache, faltas
+    (execuções de `calcular`) e esperas por outra execução.
+    """
+    acerto_direto = True
+
+    while True:
+        if consultar is not None:
+            resultado = consultar()
+            if resultado is not AUSENTE:
+                if acerto_direto:
+                    _contar(grupo, 'acertos')
+                return resultado
+
+        with _lock:
+            voo = _em_voo.get((grupo, chave))
+            lider = voo is None
+            if lider:
+                voo = _em_voo[(grupo, chave)] = _Voo()
+            else:
+                voo.esperando += 1
+
+        if lider:
+            break
+
+        acerto_direto = False
+        inicio = time.perf_counter()
+        concluido = voo.evento.wait(ESPERA_MAXIMA)
+        _contar(grupo, 'esperas')
+        _contar(grupo, 'espera_s', time.perf_counter() - inicio)
+
+        if not concluido:
+            # Execução travada ou lenta demais: calcular sem esperar mais
+            _contar(grupo, 'faltas')
+            return calcular()
+        if consultar is None:
+            if voo.erro is not None:
+                raise voo.erro
+            return voo.resultado
+        if copiar is not None and voo.resultado is not AUSENTE:
+            resultado = consultar()
+            return resultado if resultado is not AUSENTE else copiar(voo.resultado)
+
+    try:
+        trava = _trava_entre_processos(grupo, chave) if entre_processos else contextlib.nullcontext(False)
+        inicio = time.perf_counter()
+        with trava as esperou:
+            if esperou:
+                _contar(grupo, 'esperas')
+                _contar(grupo, 'espera_s', time.perf_counter() - inicio)
+
+            # Outro processo pode ter calculado enquanto esta trava era esperada
+            resultado = consultar() if consultar is not None and esperou else AUSENTE
+            if resultado is AUSENTE:
+                _contar(grupo, 'faltas')
+                resultado = calcular()
+    except BaseException as erro:
+        voo.erro = erro
+        raise
+    else:
+        voo.resultado = resultado
+        return resultado
+    finally:
+        with _lock:
+            del _em_voo[(grupo, chave)]
+            esperando = voo.esperando
+        if consultar is not None and copiar is not None and esperando and voo.erro is None:
+            # Cópia feita antes de o resultado chegar a quem o pediu (que pode modificá-lo); quem
+            # esperou copia dela de novo
+            try:
+                voo.resultado = copiar(resultado)
+            except Exception:
+                voo.resultado = AUSENTE
+        voo.evento.set()
+
+
+def single_flight_stats():
+    """
+    Retorna as métricas de cada grupo: `acertos`, `faltas`, `esperas` e `espera_s` (tempo total esperado).
+    """
+    with _lock:
+        return {grupo: dict(metricas) for grupo, metricas in _metricas.items()}
+
+
+def reset_single_flight_stats():
+    """
+    Zera as métricas de todos os grupos.
+    """
+    with _lock:
+        _metricas.clear()
@@ -0,0 +1,296 @@
+import json
+import os
+import sqlite3
+import threading
+import uuid
+
+import pandas as pd
+
+# Backend SQL embutido para vendas maiores que a memória: as vendas ficam em um banco local
+# (SQLite, ou DuckDB quando instalado) e os filtros e agrupamentos de `rollup_vendas` viram um
+# SELECT ... WHERE ... GROUP BY, de modo que só os resultados agregados chegam ao Python.
+
+MOTORES = ('sqlite', 'duckdb')
+
+# Colunas da tabela `vendas`: datas em nanossegundos desde 1970 (comparadas direto com
+# `pd.Timestamp.value`) e o dia em dias desde 1970
+COLUNAS_BANCO = {
+    'id_venda': 'BIGINT',
+    'data_venda': 'BIGINT',
+    'dia': 'INTEGER',
+    'periodo': 'TEXT',
+    'hora': 'INTEGER',
+    'dia_semana': 'INTEGER',
+    'modelo': 'TEXT',
+    'categoria': 'TEXT',
+    'canal_venda': 'TEXT',
+    'campanha': 'TEXT',
+    'preco_venda': 'DOUBLE',
+    'custo': 'DOUBLE',
+    'lucro': 'DOUBLE'
+}
+
+# Índices do SQLite: intervalo de datas e as colunas dos filtros e agrupamentos mais comuns
+COLUNAS_INDICE = ['data_venda', 'categoria', 'canal_venda', 'modelo']
+
+# Dimensões que podem ser agrupadas no banco
+DIMENSOES_BANCO = ['periodo', 'dia', 'hora', 'dia_semana', 'modelo', 'categoria', 'canal_venda', 'campanha']
+
+NANOSSEGUNDOS_POR_DIA = 86_400 * 10**9
+
+
+def resolve_engine(motor):
+    """
+    Retorna o motor a usar: `duckdb` ou `sqlite`; `auto` escolhe o DuckDB quando ele está instalado.
+    """
+    if motor == 'auto':
+        try:
+            import duckdb  # noqa: F401
+        except ImportError:
+            return 'sqlite'
+        return 'duckdb'
+
+    if motor not in MOTORES:
+        raise ValueError(f'Motor SQL desconhecido: {motor!r} (use {", ".join(MOTORES)} ou auto)')
+    return motor
+
+
+def _conectar(caminho, motor, somente_leitura):
+    if motor == 'duckdb':
+        import duckdb
+        return duckdb.connect(caminho, read_only=somente_leitura)
+
+    # Autocommit: as gravações abrem a própria transação (BEGIN IMMEDIATE)
+    conexao = sqlite3.connect(caminho, timeout=30, isolation_level=None)
+    conexao.execute('PRAGMA journal_mode=WAL')
+    return conexao
+
+
+def _linhas_banco(vendas):
+    # Converte vendas preparadas para as colunas da tabela (categorias como texto, nulos como None)
+    datas = vendas['data_venda']
+    linhas = pd.DataFrame({
+        'id_venda': vendas['id_venda'].astype('int64'),
+        'data_venda': datas.astype('int64'),
+        'dia': datas.dt.normalize().astype('int64') // NANOSSEGUNDOS_POR_DIA,
+        'periodo': vendas['periodo'].astype(object),
+        'hora': vendas['hora'].astype('int64'),
+        'dia_semana': vendas['dia_semana'].astype('int64'),
+        'modelo': vendas['modelo'].astype(object),
+        'categoria': vendas['categoria'].astype(object),
+        'canal_venda': vendas['canal_venda'].astype(object),
+        'campanha': vendas['campanha'].astype(object),
+        'preco_venda': vendas['preco_venda'].astype('float64'),
+        'custo': vendas['custo'].astype('float64'),
+        'lucro': vendas['lucro'].astype('float64')
+    })
+    for coluna in ('periodo', 'modelo', 'categoria', 'canal_venda', 'campanha'):
+        linhas[coluna] = linhas[coluna].where(linhas[coluna].notna(), None)
+    return linhas
+
+
+def _inserir(conexao, motor, vendas):
+    linhas = _linhas_banco(vendas)
+
+    if motor == 'duckdb':
+        conexao.register('bloco_vendas', linhas)
+        conexao.execute('INSERT INTO vendas SELECT * FROM bloco_vendas')
+        conexao.unregister('bloco_vendas')
+        return
+
+    marcadores = ', '.join('?' for _ in COLUNAS_BANCO)
+    conexao.executemany(f'INSERT INTO vendas VALUES ({marcadores})', linhas.itertuples(index=False, name=None))
+
+
+def _gravar_origem(conexao, origem):
+    conexao.execute('DELETE FROM origem')
+    conexao.execute('INSERT INTO origem VALUES (?)', [json.dumps(origem)])
+
+
+def _criar_banco(caminho, blocos, origem, motor):
+    conexao = _conectar(caminho, motor, False)
+    try:
+        colunas = ', '.join(f'{coluna} {tipo}' for coluna, tipo in COLUNAS_BANCO.items())
+        conexao.execute(f'CREATE TABLE vendas ({colunas})')
+        conexao.execute('CREATE TABLE origem (dados TEXT)')
+
+        if motor == 'sqlite':
+            conexao.execute('BEGIN')
+        for bloco in blocos:
+            _inserir(conexao, motor, bloco)
+        _gravar_origem(conexao, origem)
+        if motor == 'sqlite':
+            conexao.execute('COMMIT')
+
+            # O DuckDB filtra intervalos pelos mínimos e máximos de cada grupo de linhas (zonemaps);
+            # os índices ART dele não aceleram agregações, então só o SQLite recebe índices
+            for coluna in COLUNAS_INDICE:
+                conexao.execute(f'CREATE INDEX vendas_{coluna} ON vendas ({coluna})')
+            conexao.execute('ANALYZE')
+            conexao.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+    finally:
+        conexao.close()
+
+
+def _remover_banco(caminho):
+    for arquivo in (caminho, caminho + '-wal', caminho + '-shm', caminho + '.wal'):
+        try:
+            os.remove(arquivo)
+        except OSError:
+            pass
+
+
+class SalesDatabase:
+    """
+    Banco local de vendas (`diretorio/nome.<geração>.<motor>`) consultado com filtros e agrupamentos em SQL.
+
+    Cada reconstrução gera um arquivo novo, publicado por um arquivo de referência
+    (`nome.<motor>.json`): um banco SQLite nunca é substituído por outro com o mesmo nome (o que
+    misturaria os arquivos -wal/-shm dos dois), e quem ainda lê a geração anterior continua com ela.
+    Cada thread usa a sua conexão, reaberta quando a referência aponta para outra geração.
+    """
+
+    def __init__(self, diretorio, nome, motor='sqlite'):
+        self.diretorio = diretorio
+        self.nome = nome
+        self.motor = motor
+        self.referencia = os.path.join(diretorio, f'{nome}.{motor}.json')
+        self._conexoes = threading.local()
+
+    def current_file(self):
+        """
+        Retorna o caminho da geração publicada do banco, ou None se ele ainda não foi criado.
+        """
+        try:
+            with open(self.referencia, encoding='utf-8') as arquivo:
+                return os.path.join(self.diretorio, json.load(arquivo)['arquivo'])
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def rebuild(self, blocos, origem):
+        """
+        Cria uma nova geração do banco a partir de `blocos` de vendas preparadas (com os índices da
+        tabela) e a publica; `origem` (tamanho, mtime e assinatura do CSV) fica gravada no banco.
+        """
+        anterior = self.current_file()
+        nome_arquivo = f'{self.nome}.{uuid.uuid4().hex[:12]}.{self.motor}'
+        caminho = os.path.join(self.diretorio, nome_arquivo)
+
+        os.makedirs(self.diretorio, exist_ok=True)
+        try:
+            _criar_banco(caminho, blocos, origem, self.motor)
+
+            temporario = f'{self.referencia}.{os.getpid()}.tmp'
+            with open(temporario, 'w', encoding='utf-8') as arquivo:
+                json.dump({'arquivo': nome_arquivo}, arquivo)
+            os.replace(temporario, self.referencia)
+        except BaseException:
+            _remover_banco(caminho)
+            raise
+
+        # Em sistemas POSIX, quem ainda tem a geração anterior aberta continua lendo dela
+        if anterior is not None:
+            _remover_banco(anterior)
+
+    def _conexao(self):
+        arquivo = self.current_file()
+        if arquivo is None:
+            raise FileNotFoundError(f'Banco de vendas não encontrado: {self.referencia}')
+
+        atual = getattr(self._conexoes, 'atual', None)
+        if atual is None or atual[0] != arquivo or atual[1] != os.getpid():
+            if atual is not None and atual[1] == os.getpid():
+                atual[2].close()
+            atual = self._conexoes.atual = (arquivo, os.getpid(), _conectar(arquivo, self.motor, self.motor == 'duckdb'))
+
+        return atual[2]
+
+    def _consultar(self, sql, parametros=()):
+        return self._conexao().execute(sql, list(parametros)).fetchall()
+
+    def read_origin(self):
+        """
+        Retorna a origem gravada no banco (tamanho, mtime e assinatura do CSV), ou None se não houver banco.
+        """
+        if self.current_file() is None:
+            return None
+        try:
+            linha = self._consultar('SELECT dados FROM origem')
+        except Exception:
+            # Arquivo incompleto ou de outro formato (os erros do SQLite e do DuckDB não têm base comum)
+            return None
+        return json.loads(linha[0][0]) if linha else None
+
+    def append(self, vendas, origem, origem_esperada):
+        """
+        Acrescenta vendas preparadas e atualiza a origem, desde que o banco ainda esteja em
+        `origem_esperada` (outro processo pode já ter feito o mesmo acréscimo). Só no SQLite.
+
+        Retorna True se o banco ficou em `origem`.
+        """
+        conexao = self._conexao()
+        conexao.execute('BEGIN IMMEDIATE')
+        try:
+            atual = json.loads(conexao.execute('SELECT dados FROM origem').fetchone()[0])
+            if atual == origem:
+                conexao.execute('ROLLBACK')
+                return True
+            if atual != origem_esperada:
+                conexao.execute('ROLLBACK')
+                return False
+
+            _inserir(conexao, self.motor, vendas)
+            _gravar_origem(conexao, origem)
+            conexao.execute('COMMIT')
+        except BaseException:
+            conexao.execute('ROLLBACK')
+            raise
+
+        return True
+
+    def distinct_values(self, coluna):
+        """
+        Valores distintos (não nulos) de uma coluna de texto, em ordem.
+        """
+        return [linha[0] for linha in self._consultar(
+            f'SELECT DISTINCT {coluna} FROM vendas WHERE {coluna} IS NOT NULL ORDER BY 1'
+        )]
+
+    def rollup(self, dimensoes, filtros):
+        """
+        Agrega no banco as vendas filtradas pelas `dimensoes`, no formato de `rollup_vendas`
+        (dimensões seguidas de `id_venda`, `preco_venda`, `custo` e `lucro`).
+
+        `filtros` é a tupla de `normalize_filters`. Grupos com alguma dimensão nula são descartados,
+        como no groupby do pandas. `dia` volta como data; as demais dimensões, como texto ou inteiro.
+        """
+        invalidas = [dimensao for dimensao in dimensoes if dimensao not in DIMENSOES_BANCO]
+        if invalidas:
+            raise ValueError(f'Dimensões não disponíveis no banco: {invalidas}')
+
+        filtro_periodo, filtro_categorias, filtro_canais = filtros
+        condicoes = [f'{dimensao} IS NOT NULL' for dimensao in dimensoes]
+        parametros = []
+
+        if filtro_periodo:
+            condicoes.append('data_venda BETWEEN ? AND ?')
+            parametros += [filtro_periodo[0].value, filtro_periodo[1].value]
+        for coluna, valores in (('categoria', filtro_categorias), ('canal_venda', filtro_canais)):
+            if valores:
+                condicoes.append(f"{coluna} IN ({', '.join('?' for _ in valores)})")
+                parametros += list(valores)
+
+        colunas = ', '.join(dimensoes)
+        linhas = self._consultar(
+            f'SELECT {colunas}, COUNT(*), SUM(preco_venda), SUM(custo), SUM(lucro) FROM vendas '
+            f"WHERE {' AND '.join(condicoes)} GROUP BY {colunas} ORDER BY {colunas}",
+            parametros
+        )
+
+        resultado = pd.DataFrame(linhas, columns=list(dimensoes) + ['id_venda', 'preco_venda', 'custo', 'lucro'])
+        if 'dia' in dimensoes:
+            resultado['dia'] = pd.to_datetime(resultado['dia'].astype('int64') * NANOSSEGUNDOS_POR_DIA)
+        resultado['id_venda'] = resultado['id_venda'].astype('int64')
+        resultado[['preco_venda', 'custo', 'lucro']] = resultado[['preco_venda', 'custo', 'lucro']].astype('float64')
+
+        return resultado
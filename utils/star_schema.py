@@ -0,0 +1,191 @@
+import threading
+import weakref
+
+import numpy as np
+import pandas as pd
+
+from utils.olap_cube import rollup_vendas
+
+# Dimensões das vendas em modelo estrela: modelo, categoria, canal, campanha e período com os seus
+# atributos (preços e custos de referência do catálogo, metas e campanhas do mês).
+#
+# Não há uma tabela fato própria: o papel dela fica com as colunas categóricas das vendas
+# preparadas e com os pré-agregados (`olap_cube`), que já agrupam por códigos inteiros. As chaves
+# das dimensões categóricas são esses códigos; a do período é `periodo_codigo` (meses desde o ano
+# 0), que também identifica meses sem vendas, como os das metas futuras.
+
+# Dimensões categóricas: nome da dimensão -> (coluna das vendas, chave da dimensão)
+DIMENSOES_ESTRELA = {
+    'modelo': ('modelo', 'modelo_id'),
+    'categoria': ('categoria', 'categoria_id'),
+    'canal': ('canal_venda', 'canal_id'),
+    'campanha': ('campanha', 'campanha_id')
+}
+
+# Diferença relativa máxima entre o preço médio de um código de modelo das vendas (ex.: "S-400")
+# e o `preco_base` do modelo do catálogo (modelos.csv) da mesma categoria para associá-los
+TOLERANCIA_PRECO_BASE = 0.15
+
+# (id das vendas, id das metas, id dos modelos) -> (referências fracas, modelo estrela)
+_estrelas = {}
+_lock = threading.Lock()
+
+
+def period_codes(periodos):
+    """
+    Converte períodos ("AAAA-MM", categóricos ou não) ou datas em `periodo_codigo` (ano * 12 + mês - 1).
+    """
+    if pd.api.types.is_datetime64_any_dtype(periodos):
+        datas = pd.DatetimeIndex(periodos)
+        return (datas.year * 12 + datas.month - 1).to_numpy(dtype='int64')
+
+    if isinstance(periodos.dtype, pd.CategoricalDtype):
+        # Só as categorias são interpretadas; cada linha é resolvida pelo seu código
+        codigos_categorias = np.append(period_codes(pd.Series(periodos.cat.categories.astype(str))), -1)
+        return codigos_categorias[periodos.cat.codes.to_numpy()]
+
+    texto = pd.Series(periodos, dtype=str).str
+    return (texto[:4].astype('int64') * 12 + texto[5:7].astype('int64') - 1).to_numpy()
+
+
+def match_catalog_models(vendas, modelos):
+    """
+    Associa cada código de modelo das vendas a um modelo do catálogo (`modelos.csv`).
+
+    Os nomes do catálogo ("Toyota Corolla") não aparecem nas vendas ("S-400"): a associação é uma
+    estimativa pelo preço. Os pares (código, modelo do catálogo da mesma categoria) cuja diferença
+    relativa entre o `preco_base` e o preço médio de venda do código não passa de
+    TOLERANCIA_PRECO_BASE são escolhidos do mais próximo para o mais distante, e cada código e cada
+    modelo do catálogo entram em no máximo um par. Retorna um DataFrame com `modelo`, `categoria`,
+    `nome_catalogo`, `preco_base` e `custo_base` (os três últimos nulos para códigos sem correspondente).
+    """
+    # Preço médio por modelo a partir dos pré-agregados (também no modo streaming e no banco SQL)
+    precos = rollup_vendas(vendas, ['modelo', 'categoria'])
+    precos = pd.DataFrame({
+        'modelo': precos['modelo'].astype(object),
+        'categoria': precos['categoria'].astype(object),
+        'preco_medio': precos['preco_venda'] / precos['id_venda']
+    })
+    catalogo = modelos.rename(columns={'modelo': 'nome_catalogo'})[['nome_catalogo', 'categoria', 'preco_base', 'custo_base']]
+
+    pares = precos.merge(catalogo.reset_index(names='linha_catalogo'), on='categoria')
+    pares['diferenca'] = (pares['preco_base'] - pares['preco_medio']).abs() / pares['preco_base']
+    pares = pares[pares['diferenca'] <= TOLERANCIA_PRECO_BASE].sort_values(['diferenca', 'modelo', 'linha_catalogo'])
+
+    # Atribuição gulosa pela menor diferença: códigos e modelos do catálogo já usados são ignorados
+    escolhidos, codigos_usados, catalogo_usado = [], set(), set()
+    for par in pares.itertuples():
+        if par.modelo not in codigos_usados and par.linha_catalogo not in catalogo_usado:
+            escolhidos.append(par.Index)
+            codigos_usados.add(par.modelo)
+            catalogo_usado.add(par.linha_catalogo)
+
+    associados = pares.loc[escolhidos, ['modelo', 'nome_catalogo', 'preco_base', 'custo_base']]
+    return precos[['modelo', 'categoria']].merge(associados, on='modelo', how='left')
+
+
+def _dimensao(coluna, chave, extras=()):
+    # Uma linha por categoria, na ordem dos códigos, seguida dos valores de `extras` que não são
+    # categorias de `coluna` (ex.: modelos que só aparecem nos pré-agregados do modo streaming)
+    categorias = list(coluna.cat.categories)
+    valores = categorias + [valor for valor in pd.unique(pd.Series(list(extras), dtype=object)) if valor not in set(categorias)]
+    return pd.DataFrame({chave: np.arange(len(valores), dtype='int32'), coluna.name: pd.Series(valores, dtype=object)})
+
+
+def _dimensao_periodo(vendas, metas):
+    codigos_vendas = period_codes(pd.Series(vendas['periodo'].cat.categories.astype(str)))
+    codigos_metas = period_codes(metas['periodo'])
+    codigos = np.union1d(codigos_vendas, codigos_metas).astype('int16')
+
+    periodo = pd.DataFrame({'periodo_codigo': codigos})
+    periodo['periodo'] = [f'{codigo // 12:04d}-{codigo % 12 + 1:02d}' for codigo in codigos]
+    periodo['dias_no_mes'] = pd.PeriodIndex(periodo['periodo'], freq='M').days_in_month
+
+    # Uma linha por mês (metas repetidas para o mesmo mês são somadas)
+    metas_por_codigo = metas.groupby(codigos_metas).agg(
+        meta_faturamento=('meta_faturamento', lambda metas_mes: metas_mes.sum(min_count=1)),
+        campanhas_ativas=('campanhas_ativas', 'first')
+    )
+    for coluna in ('meta_faturamento', 'campanhas_ativas'):
+        periodo[coluna] = metas_por_codigo[coluna].reindex(codigos).to_numpy()
+
+    return periodo.set_index('periodo_codigo')
+
+
+def build_star_schema(vendas, metas, modelos=None):
+    """
+    Monta o modelo estrela a partir das vendas preparadas, das metas e (opcionalmente) do catálogo.
+
+    Retorna um dicionário com as dimensões `modelo`, `categoria`, `canal`, `campanha` (chaves
+    `modelo_id`, `categoria_id`, `canal_id` e `campanha_id`, os códigos das colunas categóricas de
+    `vendas`) e `periodo` (indexada por `periodo_codigo`, com `meta_faturamento`,
+    `campanhas_ativas` e `dias_no_mes`). A dimensão de modelo traz a chave da categoria e, com o
+    catálogo, `nome_catalogo`, `preco_base` e `custo_base`.
+
+    As dimensões de modelo e categoria incluem, depois das categorias de `vendas`, os valores que
+    só existem nos pré-agregados (modo streaming); junções com resultados de `rollup_vendas` devem
+    ser feitas pelo valor, não pelo código.
+    """
+    # Modelos e categorias vêm também dos pré-agregados: no modo streaming, `vendas` é só uma
+    # amostra (possivelmente vazia) e as consultas respondem pelo arquivo inteiro
+    if modelos is not None:
+        associacoes = match_catalog_models(vendas, modelos)
+    else:
+        associacoes = rollup_vendas(vendas, ['modelo', 'categoria'])[['modelo', 'categoria']]
+    extras = {'modelo': associacoes['modelo'].astype(object), 'categoria': associacoes['categoria'].astype(object)}
+
+    estrela = {
+        nome: _dimensao(vendas[coluna], chave, extras.get(nome, ()))
+        for nome, (coluna, chave) in DIMENSOES_ESTRELA.items()
+    }
+
+    # Categoria de cada modelo (os códigos de modelo pertencem a uma única categoria) e, com o
+    # catálogo, os seus preços e custos de referência
+    modelo = estrela['modelo']
+    associacoes = associacoes.set_index(associacoes['modelo'].astype(object)).reindex(modelo['modelo'])
+    modelo['categoria_id'] = pd.Categorical(associacoes['categoria'], categories=estrela['categoria']['categoria']).codes
+    for coluna in associacoes.columns.drop(['modelo', 'categoria']):
+        modelo[coluna] = associacoes[coluna].to_numpy()
+
+    estrela['periodo'] = _dimensao_periodo(vendas, metas)
+    return estrela
+
+
+def _descartar_estrelas(id_frame):
+    with _lock:
+        for chave in [chave for chave in _estrelas if chave[0] == id_frame]:
+            del _estrelas[chave]
+
+
+def get_star_schema(vendas, metas, modelos=None):
+    """
+    Retorna o modelo estrela de (vendas, metas, modelos), montando-o apenas na primeira chamada
+    para esses DataFrames. O resultado é compartilhado e NÃO deve ser modificado.
+    """
+    frames = (vendas, metas, modelos)
+    chave = tuple(id(frame) for frame in frames)
+
+    with _lock:
+        entrada = _estrelas.get(chave)
+        if entrada is not None and all(
+            (referencia() if referencia is not None else None) is frame for referencia, frame in zip(entrada[0], frames)
+        ):
+            return entrada[1]
+
+    estrela = build_star_schema(vendas, metas, modelos)
+
+    with _lock:
+        novo_frame = not any(existente[0] == id(vendas) for existente in _estrelas)
+        _estrelas[chave] = (tuple(weakref.ref(frame) if frame is not None else None for frame in frames), estrela)
+    if novo_frame:
+        weakref.finalize(vendas, _descartar_estrelas, id(vendas))
+
+    return estrela
+
+
+def period_targets(estrela, periodos, colunas=('meta_faturamento',)):
+    """
+    Atributos da dimensão de período (`colunas`) para cada período ou data de `periodos`, na mesma
+    ordem, por junção pela chave inteira `periodo_codigo` (nulos para meses fora da dimensão).
+    """
+    return estrela['periodo'].reindex(period_codes(periodos))[list(colunas)].reset_index(drop=True)